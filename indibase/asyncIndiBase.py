@@ -0,0 +1,418 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+#       #   #  #   #   #    #
+#      ##  ##  #  ##  #    #
+#     # # # #  # # # #    #  #
+#    #  ##  #  ##  ##    ######
+#   #   #   #  #   #       #
+#
+# Python-based Tool for interaction with the 10micron mounts
+# GUI with PyQT5 for python
+# Python  v3.7.4
+
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import asyncio
+import collections
+import logging
+# external packages
+# local import
+from indibase.loggerMW import CustomLogger
+from indibase import indiXML
+from indibase.indiCore import ClientCore, CommandHandle
+from indibase.indiBlob import encodeBlob, sourceSize
+
+
+class Command(CommandHandle):
+    """
+    Command is the handle of a command sent with requestNewText, requestNewNumber or
+    requestNewSwitch. it could be awaited and gives back the final state, when the
+    device acknowledged the command or the timeout of the property passed. many
+    commands could be outstanding at the same time.
+
+        >>> state = await indiClient.requestNewNumber(...)
+
+    """
+
+    __all__ = ['Command',
+               ]
+
+    def __init__(self,
+                 deviceName='',
+                 propertyName='',
+                 timeout=0,
+                 client=None,
+                 ):
+        super().__init__(deviceName=deviceName,
+                         propertyName=propertyName,
+                         timeout=timeout,
+                         client=client)
+
+        loop = asyncio.get_event_loop()
+        self.future = loop.create_future()
+        self.timer = loop.call_later(timeout, self._handleTimeout)
+
+    def __await__(self):
+        return self.future.__await__()
+
+    def _resolve(self, state):
+        """
+        _resolve finishes the command and the future.
+
+        :param state: final state
+        :return: True if the command was finished by this call
+        """
+
+        if not super()._resolve(state):
+            return False
+        self.timer.cancel()
+        if not self.future.done():
+            self.future.set_result(state)
+        return True
+
+
+class Client(ClientCore):
+    """
+    Client implements an INDI Base Client for INDI servers on top of asyncio streams,
+    so no Qt application is needed. parsing and the devices dict are shared with the
+    Qt client in ClientCore. the events have the names of the signals of the Qt client
+    and are delivered to callbacks or through async iterators. connecting, disconnecting
+    and uploading blobs are coroutines, all other methods are the same as in the Qt
+    client.
+
+        >>> indiClient = Client(
+        >>>                     host=host
+        >>>                     )
+        >>> await indiClient.connectServer()
+        >>> async for signal, args in indiClient.events('newNumber'):
+        >>>     pass
+
+    """
+
+    __all__ = ['Client',
+               'connectServer',
+               'disconnectServer',
+               'connect',
+               'disconnect',
+               'events',
+               'drain',
+               'requestNewText',
+               'requestNewNumber',
+               'requestNewSwitch',
+               'startBlob',
+               'sendOneBlob',
+               'finishBlob',
+               ]
+
+    logger = logging.getLogger(__name__)
+    log = CustomLogger(logger, {})
+
+    # size of the chunks read from the stream
+    READ_SIZE = 2 ** 16
+
+    def __init__(self,
+                 host=None,
+                 engine='etree',
+                 ):
+        super().__init__(host=host, engine=engine)
+
+        self.reader = None
+        self.writer = None
+        self.readTask = None
+        self.blobUpload = False
+        self.callbacks = collections.defaultdict(list)
+        self.queues = []
+
+    def connect(self, signal, callback):
+        """
+        connect registers a callback for an event. the callback gets the same arguments
+        as the slot of the corresponding signal of the Qt client.
+
+        :param signal: name of the event, eg: newNumber
+        :param callback: callable
+        :return: success for test purpose
+        """
+
+        self.callbacks[signal].append(callback)
+        return True
+
+    def disconnect(self, signal, callback):
+        """
+        disconnect removes a callback for an event.
+
+        :param signal: name of the event, eg: newNumber
+        :param callback: callable
+        :return: success
+        """
+
+        if callback not in self.callbacks[signal]:
+            return False
+        self.callbacks[signal].remove(callback)
+        return True
+
+    async def events(self, *signals):
+        """
+        events is an async iterator over the events of the client. the events are
+        queued from the moment the iteration starts. without signals given, all
+        events are delivered.
+
+        :param signals: names of the events to be delivered
+        :return: async iterator of event name and arguments
+        """
+
+        queue = asyncio.Queue()
+        entry = (queue, frozenset(signals))
+        self.queues.append(entry)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.queues.remove(entry)
+
+    def _createCommand(self, deviceName='', propertyName='', timeout=0):
+        """
+        _createCommand creates the handle of a command, which could be awaited.
+
+        :param deviceName: name string of INDI device
+        :param propertyName: name string of device property
+        :param timeout: timeout in seconds
+        :return: handle
+        """
+
+        return Command(deviceName=deviceName,
+                       propertyName=propertyName,
+                       timeout=timeout,
+                       client=self)
+
+    def _emit(self, signal, *args):
+        """
+        _emit calls the callbacks of the event and puts it into the queues of the
+        running async iterators.
+
+        :param signal: name of the event
+        :param args: arguments of the event
+        :return: nothing
+        """
+
+        for callback in list(self.callbacks.get(signal, [])):
+            try:
+                callback(*args)
+            except Exception as e:
+                self.log.error(f'Callback for [{signal}] failed: {e}')
+
+        for queue, signals in self.queues:
+            if not signals or signal in signals:
+                queue.put_nowait((signal, args))
+
+    async def connectServer(self):
+        """
+        connectServer starts the link to the indi server and the task, which reads
+        and parses the received data.
+
+        :return: success
+        """
+
+        if self._host is None:
+            return False
+        if len(self._host) != 2:
+            return False
+        if self.connected:
+            return True
+
+        try:
+            connection = asyncio.open_connection(*self._host)
+            self.reader, self.writer = await asyncio.wait_for(
+                connection, self.CONNECTION_TIMEOUT / 1000)
+        except (OSError, asyncio.TimeoutError) as e:
+            self.log.warning(f'INDI client connection fault, error: {e}')
+            return False
+
+        self.connectionMade()
+        self.readTask = asyncio.ensure_future(self._readStream())
+        return True
+
+    async def disconnectServer(self, deviceName=''):
+        """
+        disconnectServer drops the connection to the indi server.
+
+        :param deviceName: name string of INDI device
+        :return: success
+        """
+
+        self.connectionLost(deviceName)
+        if self.readTask is not None:
+            self.readTask.cancel()
+            self.readTask = None
+        self._closeStream()
+        return True
+
+    def _closeStream(self):
+        """
+        _closeStream closes the stream to the indi server. a running blob upload and
+        the commands held back by it are dropped.
+
+        :return: nothing
+        """
+
+        self.blobUpload = False
+        self.outgoing.clear()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    async def _readStream(self):
+        """
+        _readStream feeds the received data to the receive engine as long as the
+        connection is open. if the server drops the connection, the client cleans up
+        like after disconnectServer.
+
+        :return: nothing
+        """
+
+        while True:
+            try:
+                data = await self.reader.read(self.READ_SIZE)
+            except OSError as e:
+                self.log.error(f'INDI client connection fault, error: {e}')
+                break
+            if not data:
+                break
+            try:
+                self.parser.feed(data)
+            except Exception as e:
+                self.log.error(f'{e}: {data[:100]}')
+
+        if self.connected:
+            self.log.warning('INDI client disconnected')
+            self.connectionLost()
+        self.readTask = None
+        self._closeStream()
+
+    def _sendCmd(self, indiCommand, blobChannel=False):
+        """
+        _sendCmd writes the command to the stream. the stream buffers the data, so
+        there is no need to wait for it being sent. during a blob upload the commands
+        are held back, as the upload waits for the stream between the chunks and the
+        commands must not end up inside the blob vector. they are written with the end
+        of the blob vector.
+
+        :param indiCommand: XML command to send
+        :param blobChannel: there is no dedicated blob connection, so always False
+        :return: success of sending
+        """
+
+        if blobChannel or not self.connected:
+            return False
+
+        cmd = indiCommand.toXML()
+        self.log.debug(f"SendCmd: [{cmd.decode().lstrip('<').rstrip('/>')}]")
+        if self.blobUpload:
+            self.outgoing += cmd + b'\n'
+        else:
+            self.writer.write(cmd + b'\n')
+        return True
+
+    async def drain(self):
+        """
+        drain waits until the buffer of the stream is sent down to its limit.
+
+        :return: success
+        """
+
+        if not self.connected:
+            return False
+        try:
+            await self.writer.drain()
+        except ConnectionError as e:
+            self.log.error(f'INDI client connection fault, error: {e}')
+            return False
+        return True
+
+    async def _writeData(self, data):
+        """
+        _writeData writes the data to the stream and waits for the buffer to be sent
+        down to its limit, so large uploads do not pile up in memory.
+
+        :param data: data to be sent as bytes
+        :return: success of sending
+        """
+
+        if not self.connected:
+            return False
+        self.writer.write(data)
+        return await self.drain()
+
+    async def startBlob(self, deviceName='', propertyName='', timestamp=''):
+        """
+        startBlob begins the upload of a blob vector.
+
+        :param deviceName: name string of INDI device
+        :param propertyName: name string of device property
+        :param timestamp: optional timestamp of the vector
+        :return: success
+        """
+
+        if not self.connected:
+            return False
+        if deviceName not in self.devices:
+            return False
+        if not hasattr(self.devices[deviceName], propertyName):
+            return False
+
+        data = indiXML.newBLOBSerializer.vectorStart(deviceName, propertyName, timestamp)
+        self.blobUpload = await self._writeData(data)
+        return self.blobUpload
+
+    async def sendOneBlob(self, blobName='', blobSize=0, blobFormat='', blobBuffer=None):
+        """
+        sendOneBlob encodes the blob chunk by chunk to base64 and writes the chunks to
+        the stream. if no size is given, the size of the buffer or of the rest of the
+        file is used. the upload stops at the first failed write.
+
+        :param blobName: name string of the blob element
+        :param blobSize: number of bytes of the uncompressed blob
+        :param blobFormat: format of the blob as file suffix, eg: .fits, .fits.z
+        :param blobBuffer: data of the blob, bytes like or file like object
+        :return: success
+        """
+
+        if not self.blobUpload or blobBuffer is None:
+            return False
+        if not blobSize:
+            blobSize = sourceSize(blobBuffer)
+
+        data = indiXML.newBLOBSerializer.elementStart(blobName, blobSize, blobFormat)
+        suc = await self._writeData(data)
+        if suc:
+            for chunk in encodeBlob(blobBuffer, chunkSize=self.BLOB_CHUNK_SIZE):
+                suc = await self._writeData(chunk)
+                if not suc:
+                    break
+        suc = suc and await self._writeData(indiXML.newBLOBSerializer.element_end)
+
+        self.blobUpload = suc
+        if not suc:
+            self.outgoing.clear()
+        return suc
+
+    async def finishBlob(self):
+        """
+        finishBlob closes the upload of the blob vector and writes the commands, which
+        were held back during the upload.
+
+        :return: success
+        """
+
+        if not self.blobUpload:
+            return False
+
+        self.blobUpload = False
+        data = indiXML.newBLOBSerializer.vector_end + b'\n' + self.dataToSend()
+        return await self._writeData(data)
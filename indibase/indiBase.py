@@ -19,14 +19,16 @@
 #
 ###########################################################
 # standard libraries
+import contextlib
 import logging
 # external packages
 import PyQt5.QtCore
-import PyQt5.QtNetwork
-import xml.etree.ElementTree as ETree
 # local import
 from indibase.loggerMW import CustomLogger
 from indibase import indiXML
+from indibase.indiCore import ClientCore, CommandHandle
+from indibase.indiDevice import Device, Property, Element  # noqa: F401
+from indibase.indiBlob import encodeBlob, sourceSize
 
 
 class INDISignals(PyQt5.QtCore.QObject):
@@ -61,165 +63,135 @@ class INDISignals(PyQt5.QtCore.QObject):
     deviceDisconnected = PyQt5.QtCore.pyqtSignal(str)
 
     serverAlive = PyQt5.QtCore.pyqtSignal(bool)
+    serverError = PyQt5.QtCore.pyqtSignal(str)
+    connectionState = PyQt5.QtCore.pyqtSignal(str)
 
 
-class Device(object):
+class ReceiveWorker(PyQt5.QtCore.QObject):
     """
-    Device implements an INDI Device. it rely on PyQt5 and it's signalling scheme.
-    there might be not all capabilities implemented right now. all the data, properties
-    and attributes are stored in a the devices dict.
+    The ReceiveWorker class runs the receive engines of the client in its own QThread.
+    the received data comes in through the queued signal received, the commands, which
+    are caused by parsing, go back to the thread of the sockets through the queued
+    signal send. the signals of the client are sent from this thread, so they reach
+    the gui thread queued as well.
 
-        >>> indiDevice = Device(
-        >>>                     name=''
-        >>>                     )
+        >>> receiver = ReceiveWorker(
+        >>>                          client=client,
+        >>>                          )
 
     """
 
-    __all__ = ['Device',
-               'version',
-               'getNumber',
-               'getText',
-               'getSwitch',
-               'getLight',
-               'getBlob',
-               ]
+    __all__ = ['ReceiveWorker']
 
-    logger = logging.getLogger(__name__)
-    log = CustomLogger(logger, {})
+    received = PyQt5.QtCore.pyqtSignal(object, bytes)
+    send = PyQt5.QtCore.pyqtSignal(bytes, bool)
 
     def __init__(self,
-                 name='',
+                 client=None,
                  ):
         super().__init__()
 
-        self.name = name
-        self.connected = False
+        self.client = client
 
-    def getNumber(self, propertyName):
+    @PyQt5.QtCore.pyqtSlot(object, bytes)
+    def feed(self, parser, data):
         """
-        getNumber extracts from the device dictionary the relevant property subset for
-        number or list of number elements. the return dict could be used later on for
-        setting an element list (number vector) in indi client.
+        feed hands the received data over to the receive engine in the thread of the
+        worker.
 
-        :param propertyName: string with name
-        :return: dict with number / number vector
+        :param parser: receive engine, which was active when the data was received
+        :param data: received data as bytes
+        :return: nothing
         """
 
-        if not hasattr(self, propertyName):
-            return {}
-        iProperty = getattr(self, propertyName)
-        if iProperty['propertyType'] not in ['defNumberVector',
-                                             'setNumberVector']:
-            self.log.error('Property: {0} is not Number'.format(iProperty['propertyType']))
-            return
-        elementList = iProperty['elementList']
-        retDict = {}
-        for prop in elementList:
-            retDict[prop] = elementList[prop]['value']
-        # self.log.info(f'Get number [{self.name}]: {retDict}')
-        return retDict
+        self.client._feedParser(parser, data)
 
-    def getText(self, propertyName):
-        """
-        getNumber extracts from the device dictionary the relevant property subset for
-        text or list of text elements. the return dict could be used later on for
-        setting an element list (text vector) in indi client.
 
-        :param propertyName: string with name
-        :return: dict with text or text vector
-        """
+class Command(CommandHandle, PyQt5.QtCore.QObject):
+    """
+    The Command class is the handle of a command sent with requestNewText,
+    requestNewNumber or requestNewSwitch. the signal finished is sent with the final
+    state, when the device acknowledged the command or the timeout of the property
+    passed. scripts could wait for the command without polling the device.
 
-        if not hasattr(self, propertyName):
-            return {}
-        iProperty = getattr(self, propertyName)
-        if iProperty['propertyType'] not in ['defTextVector',
-                                             'setTextVector']:
-            self.log.error('Property: {0} is not Text'.format(iProperty['propertyType']))
-            return
-        elementList = iProperty['elementList']
-        retDict = {}
-        for prop in elementList:
-            retDict[prop] = elementList[prop]['value']
-        # self.log.info(f'Get text   [{self.name}]: {retDict}')
-        return retDict
+        >>> command = indiClient.requestNewNumber(...)
+        >>> command.finished.connect(...)
+        >>> state = command.wait()
+
+    """
+
+    __all__ = ['Command',
+               'wait',
+               ]
+
+    finished = PyQt5.QtCore.pyqtSignal(str)
+
+    def __init__(self,
+                 deviceName='',
+                 propertyName='',
+                 timeout=0,
+                 client=None,
+                 ):
+        super().__init__(deviceName=deviceName,
+                         propertyName=propertyName,
+                         timeout=timeout,
+                         client=client)
 
-    def getSwitch(self, propertyName):
+        self.timer = PyQt5.QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._handleTimeout)
+        self.timer.start(int(timeout * 1000))
+
+    def _resolve(self, state):
         """
-        getSwitch extracts from the device dictionary the relevant property subset for
-        switch or list of switch elements. the return dict could be used later on for
-        setting an element list (switch vector) in indi client.
+        _resolve finishes the command and sends the signal finished. as commands might
+        be finished in the receive thread, the timer is not stopped here, but ignored
+        when it fires later.
 
-        :param propertyName: string with name
-        :return: dict with switch or switch vector
+        :param state: final state
+        :return: True if the command was finished by this call
         """
 
-        if not hasattr(self, propertyName):
-            return {}
-        iProperty = getattr(self, propertyName)
-        if iProperty['propertyType'] not in ['defSwitchVector',
-                                             'setSwitchVector']:
-            self.log.error('Property: {0} is not Switch'.format(iProperty['propertyType']))
-            return
-        elementList = iProperty['elementList']
-        retDict = {}
-        for prop in elementList:
-            retDict[prop] = elementList[prop]['value']
-        # self.log.info(f'Get switch [{self.name}]: {retDict}')
-        return retDict
+        if not super()._resolve(state):
+            return False
+        self.finished.emit(state)
+        return True
 
-    def getLight(self, propertyName):
+    @PyQt5.QtCore.pyqtSlot()
+    def _handleTimeout(self):
         """
-        getLight extracts from the device dictionary the relevant property subset for
-        light or list of light elements. the return dict could be used later on for
-        setting an element list (light vector) in indi client.
+        _handleTimeout finishes the command with the state Timeout, when the timer
+        fires.
 
-        :param propertyName: string with name
-        :return: dict with light or light vector
+        :return: nothing
         """
 
-        if not hasattr(self, propertyName):
-            return {}
-        iProperty = getattr(self, propertyName)
-        if iProperty['propertyType'] not in ['defLightVector',
-                                             'setLightVector']:
-            self.log.error('Property: {0} is not Light'.format(iProperty['propertyType']))
-            return
-        elementList = iProperty['elementList']
-        retDict = {}
-        for prop in elementList:
-            retDict[prop] = elementList[prop]['value']
-        # self.log.info(f'Get light  [{self.name}]: {retDict}')
-        return retDict
+        super()._handleTimeout()
 
-    def getBlob(self, propertyName):
+    def wait(self):
         """
-        getBlob extracts from the device dictionary the relevant property value for
-        blob.
+        wait runs a local event loop until the command is finished.
 
-        :param propertyName: string with name
-        :return: return blob
+        :return: final state
         """
 
-        # blob return different, because it's binary data
-        if not hasattr(self, propertyName):
-            return {}
-        iProperty = getattr(self, propertyName)
-        if iProperty['propertyType'] not in ['defBLOBVector',
-                                             'setBLOBVector']:
-            self.log.error('Property: {0} is not Blob'.format(iProperty['propertyType']))
-            return
-        elementList = iProperty['elementList']
-        # self.log.info(f'Get blob   [{self.name}]')
-        return elementList[propertyName]
+        if self.state:
+            return self.state
+        loop = PyQt5.QtCore.QEventLoop()
+        self.finished.connect(loop.quit)
+        if not self.state:
+            loop.exec_()
+        return self.state
 
 
-class Client(PyQt5.QtCore.QObject):
+class Client(ClientCore, PyQt5.QtCore.QObject):
     """
     Client implements an INDI Base Client for INDI servers. it rely on PyQt5 and it's
     signalling scheme. there might be not all capabilities implemented right now. all
     the data, properties and attributes are stored in a the devices dict.
     The reading and parsing of the XML data is done in a streaming way, so for xml the
-    xml.parse.feed() mechanism is used.
+    xml.parse.feed() mechanism is used. all parts, which do not depend on Qt, are
+    shared with other transports in ClientCore.
 
         >>> indiClient = Client(
         >>>                     host=host
@@ -233,6 +205,7 @@ class Client(PyQt5.QtCore.QObject):
                'watchDevice',
                'connectServer',
                'disconnectServer',
+               'getConnectionState',
                'isServerConnected',
                'connectDevice',
                'disconnectDevice',
@@ -240,14 +213,24 @@ class Client(PyQt5.QtCore.QObject):
                'getDevices',
                'setBlobMode',
                'getBlobMode',
+               'setBlobStorage',
+               'setBlobInflate',
+               'setBlobStream',
+               'getBlobStream',
+               'setBlobConnection',
+               'setReceiveThread',
                'getHost',
                'getPort',
                'sendNewText',
                'sendNewNumber',
                'sendNewSwitch',
+               'requestNewText',
+               'requestNewNumber',
+               'requestNewSwitch',
                'startBlob',
                'sendOneBlob',
                'finishBlob',
+               'batch',
                'setVerbose',
                'isVerbose',
                'setConnectionTimeout',
@@ -256,834 +239,706 @@ class Client(PyQt5.QtCore.QObject):
     logger = logging.getLogger(__name__)
     log = CustomLogger(logger, {})
 
-    # INDI device types
-    GENERAL_INTERFACE = 0
-    TELESCOPE_INTERFACE = (1 << 0)
-    CCD_INTERFACE = (1 << 1)
-    GUIDER_INTERFACE = (1 << 2)
-    FOCUSER_INTERFACE = (1 << 3)
-    FILTER_INTERFACE = (1 << 4)
-    DOME_INTERFACE = (1 << 5)
-    GPS_INTERFACE = (1 << 6)
-    WEATHER_INTERFACE = (1 << 7)
-    AO_INTERFACE = (1 << 8)
-    DUSTCAP_INTERFACE = (1 << 9)
-    LIGHTBOX_INTERFACE = (1 << 10)
-    DETECTOR_INTERFACE = (1 << 11)
-    AUX_INTERFACE = (1 << 15)
-
-    # default port indi servers
-    DEFAULT_PORT = 7624
-
-    # timeout for client to server
-    CONNECTION_TIMEOUT = 3000
+    # limit of buffered data on socket before waiting during blob upload
+    BLOB_WRITE_LIMIT = 2 ** 20
+
+    # states of the connection to the server
+    DISCONNECTED = 'Disconnected'
+    CONNECTING = 'Connecting'
+    CONNECTED = 'Connected'
+    DISCONNECTING = 'Disconnecting'
+    BACKOFF = 'Backoff'
+    # time in milliseconds to wait after a failed connection before the next attempt
+    CONNECTION_BACKOFF = 1000
 
     def __init__(self,
                  host=None,
+                 engine='etree',
                  ):
-        super().__init__()
-
-        self.host = host
+        self.blobParser = None
+        super().__init__(host=host, engine=engine)
 
         # instance variables
         self.signals = INDISignals()
-        self.connected = False
-        self.blobMode = 'Never'
-        self.devices = dict()
-        self.curDepth = 0
-        self.parser = None
-
-        # tcp handling
-        self.socket = PyQt5.QtNetwork.QTcpSocket()
+        self.blobUpload = False
+        self.blobConnection = False
+        self.receiveThread = None
+        self.receiver = None
+        self.blobOutgoing = bytearray()
+        self.batchDepth = 0
+        self.state = self.DISCONNECTED
+        # blobs are only inflated while they arrive in the receive thread, otherwise
+        # the inflating would run in the gui thread
+        self.blobInflate = False
+
+        # timers of the connection state machine
+        self.connectTimer = PyQt5.QtCore.QTimer()
+        self.connectTimer.setSingleShot(True)
+        self.connectTimer.timeout.connect(self._handleConnectTimeout)
+        self.backoffTimer = PyQt5.QtCore.QTimer()
+        self.backoffTimer.setSingleShot(True)
+        self.backoffTimer.timeout.connect(self._handleBackoffEnd)
+        self.blobTimer = PyQt5.QtCore.QTimer()
+        self.blobTimer.setSingleShot(True)
+        self.blobTimer.timeout.connect(self._handleBlobConnectTimeout)
+
+        # tcp handling. QtNetwork is imported with the first client, so tools using
+        # only parts of the module do not pay for it
+        from PyQt5 import QtNetwork
+
+        self.socket = QtNetwork.QTcpSocket()
+        self.socket.connected.connect(self._handleConnected)
         self.socket.readyRead.connect(self._handleReadyRead)
         self.socket.error.connect(self._handleError)
         self.socket.disconnected.connect(self._handleDisconnected)
-        self.clearParser()
-
-    @property
-    def host(self):
-        return self._host
-
-    def checkFormat(self, value):
-        # checking format
-        if not value:
-            return None
-        if not isinstance(value, (tuple, str)):
-            self.log.warning('wrong host value: {0}'.format(value))
-            return None
-        # now we got the right format
-        if isinstance(value, str):
-            value = (value, self.DEFAULT_PORT)
-        return value
-
-    @host.setter
-    def host(self, value):
-        value = self.checkFormat(value)
-        self._host = value
+        self.blobSocket = QtNetwork.QTcpSocket()
+        self.blobSocket.connected.connect(self._handleBlobConnected)
+        self.blobSocket.readyRead.connect(self._handleBlobReadyRead)
+        self.blobSocket.error.connect(self._handleBlobError)
 
-    def clearParser(self):
+    def _createCommand(self, deviceName='', propertyName='', timeout=0):
         """
+        _createCommand creates the handle of a command, which sends the signal finished.
 
-        :return: success for test purpose
+        :param deviceName: name string of INDI device
+        :param propertyName: name string of device property
+        :param timeout: timeout in seconds
+        :return: handle
         """
-        # XML parser
-        self.parser = ETree.XMLPullParser(['start', 'end'])
-        self.parser.feed('<root>')
-        # clear the event queue of parser
-        for _, _ in self.parser.read_events():
-            pass
 
-        return True
+        return Command(deviceName=deviceName,
+                       propertyName=propertyName,
+                       timeout=timeout,
+                       client=self)
 
-    def setServer(self, host='', port=7624):
+    def _emit(self, signal, *args):
         """
-        Part of BASE CLIENT API of EKOS
-        setServer sets the server address of the indi server
+        _emit sends the qt signal with the name of the event.
 
-        :param host: host name as string
-        :param port: port as int
-        :return: success for test purpose
+        :param signal: name of the signal in INDISignals
+        :param args: arguments of the signal
+        :return: nothing
         """
-        self.host = (host, port)
-        self.connected = False
-        return True
 
-    def watchDevice(self, deviceName=''):
+        getattr(self.signals, signal).emit(*args)
+
+    def clearParser(self):
         """
-        Part of BASE CLIENT API of EKOS
-        adds a device to the watchlist. if the device name is empty, all traffic for all
-        devices will be watched and therefore received
+        clearParser sets up new receive engines for parsing the incoming data of the
+        primary and the dedicated blob connection.
 
-        :param deviceName: name string of INDI device
         :return: success for test purpose
         """
-        if deviceName:
-            cmd = indiXML.clientGetProperties(indi_attr={'version': '1.7',
-                                                         'device': deviceName})
-        else:
-            cmd = indiXML.clientGetProperties(indi_attr={'version': '1.7'})
 
-        suc = self._sendCmd(cmd)
-        return suc
+        super().clearParser()
+        self.blobParser = self.ENGINES[self.engine](client=self)
+        return True
 
     def connectServer(self):
         """
         Part of BASE CLIENT API of EKOS
-        connect starts the link to the indi server.
+        connect starts the link to the indi server. the call does not wait for the
+        connection, the result is signaled with serverConnected or serverError. after
+        a failed attempt the client stays in state Backoff for CONNECTION_BACKOFF and
+        does not start a new attempt meanwhile.
 
-        :return: success
+        :return: success of starting the connection
         """
 
         if self._host is None:
             return False
         if len(self._host) != 2:
             return False
+        if not self._host[0]:
+            return False
+        if self.state in [self.CONNECTED, self.CONNECTING]:
+            return True
         if self.connected:
-            # self.signals.serverConnected.emit()
             return True
-        self.socket.connectToHost(*self._host)
-        if not self.socket.waitForConnected(self.CONNECTION_TIMEOUT):
-            self.connected = False
+        if self.state == self.BACKOFF:
             return False
-        self.connected = True
-        self.signals.serverConnected.emit()
+
+        # a socket still delivering the last commands of the previous connection
+        # has to be closed before it could be used again
+        if self.socket.state() != self.socket.UnconnectedState:
+            self.socket.abort()
+        if self.blobSocket.state() != self.blobSocket.UnconnectedState:
+            self.blobSocket.abort()
+        self._setState(self.CONNECTING)
+        self.socket.connectToHost(*self._host)
+        self.connectTimer.start(self.CONNECTION_TIMEOUT)
         return True
 
-    def clearDevices(self, deviceName):
+    def getConnectionState(self):
         """
-        clearDevices deletes all the actual knows devices and sens out the appropriate
-        qt signals
+        getConnectionState returns the state of the connection to the server, which is
+        one of Disconnected, Connecting, Connected, Disconnecting and Backoff.
 
-        :param deviceName: name string of INDI device
-        :return: success for test purpose
+        :return: state
+        """
+
+        return self.state
+
+    def _setState(self, state):
         """
+        _setState changes the state of the connection and signals the new state.
 
-        for device in self.devices:
-            if not device == deviceName and deviceName:
-                continue
-            self.signals.removeDevice.emit(device)
-            # self.signals.deviceDisconnected.emit(device)
-            self.log.warning(f'Remove device [{device}]')
-        self.devices = {}
+        :param state: new state
+        :return: True if the state changed
+        """
+
+        if state == self.state:
+            return False
+        self.log.debug(f'Connection state [{self.state}] -> [{state}]')
+        self.state = state
+        self.signals.connectionState.emit(state)
         return True
 
-    def disconnectServer(self, deviceName=''):
+    def _backoffDelay(self):
         """
-        Part of BASE CLIENT API of EKOS
-        disconnect drops the connection to the indi server
+        _backoffDelay returns the time to wait after a failed connection.
 
-        :param deviceName: name string of INDI device
-        :return: success
+        :return: delay in milliseconds
+        """
+
+        return self.CONNECTION_BACKOFF
+
+    def _connectionFailed(self, message=''):
         """
+        _connectionFailed stops the running connection attempt, enters the state Backoff
+        and signals the error.
 
-        self.connected = False
-        self.clearParser()
-        self.signals.serverDisconnected.emit(self.devices)
-        self.clearDevices(deviceName)
+        :param message: reason of the failure
+        :return: nothing
+        """
+
+        self.connectTimer.stop()
         self.socket.abort()
+        self.log.warning(f'Connection to [{self._host}] failed: {message}')
+        self._setState(self.BACKOFF)
+        self.backoffTimer.start(self._backoffDelay())
+        self.signals.serverError.emit(message)
 
-        return True
+    @PyQt5.QtCore.pyqtSlot()
+    def _handleConnected(self):
+        """
+        _handleConnected finishes the connection to the server and starts the dedicated
+        blob connection if enabled.
+
+        :return: nothing
+        """
+
+        self.connectTimer.stop()
+        self._setState(self.CONNECTED)
+        self.connectionMade()
+        if self.blobConnection:
+            self._connectBlobServer()
 
     @PyQt5.QtCore.pyqtSlot()
-    def _handleDisconnected(self):
+    def _handleConnectTimeout(self):
         """
-        _handleDisconnected log all network errors in case of problems.
+        _handleConnectTimeout drops the connection attempt, which took longer than
+        CONNECTION_TIMEOUT.
 
         :return: nothing
         """
 
-        self.connected = False
-        self.log.warning('INDI client disconnected')
+        if self.state != self.CONNECTING:
+            return
+        self._connectionFailed('Connection timeout')
 
-    def isServerConnected(self):
+    @PyQt5.QtCore.pyqtSlot()
+    def _handleBackoffEnd(self):
         """
-        Part of BASE CLIENT API of EKOS
+        _handleBackoffEnd allows new connection attempts.
 
-        :return: true if server connected
+        :return: nothing
         """
 
-        return self.connected
+        if self.state == self.BACKOFF:
+            self._setState(self.DISCONNECTED)
 
-    def connectDevice(self, deviceName=''):
+    def setBlobConnection(self, status=True):
         """
-        Part of BASE CLIENT API of EKOS
+        setBlobConnection enables a second connection to the indi server, which is used
+        for the blob traffic only. the server sends blobs on this connection with the
+        mode 'Only', the primary connection keeps the default mode 'Never'. so large
+        images do not delay the control traffic. both connections write into the same
+        device store and send the same signals. if the client is already connected,
+        the blob connection is started or stopped immediately.
 
-        :param deviceName: name string of INDI device
+        :param status: True for using a dedicated blob connection
         :return: success
         """
-        
-        # todo: do connected state for each device
 
+        self.blobConnection = status
         if not self.connected:
-            return False
-        if not deviceName:
-            return False
-        if deviceName not in self.devices:
-            return False
+            return True
+        if status and not self.blobConnected:
+            return self._connectBlobServer()
+        if not status and self.blobConnected:
+            self._switchBlobChannel(False)
+            self.blobSocket.disconnectFromHost()
+        return True
 
-        con = self.devices[deviceName].getSwitch('CONNECTION')
-        if con['CONNECT'] == 'On':
-            self.log.warning(f'Device [{deviceName}] was connected at startup')
-            return False
-        else:
-            self.log.warning(f'Device [{deviceName}] unconnected - connect it now')
-
-        suc = self.sendNewSwitch(deviceName=deviceName,
-                                 propertyName='CONNECTION',
-                                 elements={'CONNECT': 'On',
-                                           'DISCONNECT': 'Off'
-                                           },
-                                 )
-        return suc
+    def setReceiveThread(self, status=True):
+        """
+        setReceiveThread moves the receive engines into a QThread of their own, so
+        large bursts of data do not block the gui thread. the sockets stay in the
+        thread of the client, as they are used by the sending methods, and pass the
+        data through a queued signal. the signals of the client reach the gui thread
+        queued. the getters of the devices and getDevices hold storeLock, other
+        readers iterating over the device store have to hold it as well. data, which
+        was not parsed when the thread is stopped, is dropped. compressed blobs are
+        inflated while they arrive only in the receive thread.
 
-    def disconnectDevice(self, deviceName=''):
+        :param status: True for parsing in a thread of its own
+        :return: success for test purpose
         """
-        Part of BASE CLIENT API of EKOS
 
-        :param deviceName: name string of INDI device
+        if status and self.receiveThread is None:
+            self.receiveThread = PyQt5.QtCore.QThread()
+            self.receiver = ReceiveWorker(client=self)
+            self.receiver.moveToThread(self.receiveThread)
+            self.receiver.received.connect(self.receiver.feed)
+            self.receiver.send.connect(self._writeCmd)
+            self.receiveThread.start()
+        elif not status and self.receiveThread is not None:
+            self.receiveThread.quit()
+            self.receiveThread.wait()
+            self.receiveThread = None
+            self.receiver = None
+        self.blobInflate = status
+        return True
+
+    def _connectBlobServer(self):
+        """
+        _connectBlobServer starts the dedicated blob connection to the indi server. the
+        call does not wait for the connection.
+
         :return: success
         """
 
-        # todo: do connected state for each device
+        if self.blobSocket.state() != self.blobSocket.UnconnectedState:
+            return True
+        self.blobSocket.connectToHost(*self._host)
+        self.blobTimer.start(self.CONNECTION_TIMEOUT)
+        return True
 
-        if not self.connected:
-            return False
-        if not deviceName:
-            return False
-        if deviceName not in self.devices:
-            return False
+    @PyQt5.QtCore.pyqtSlot()
+    def _handleBlobConnected(self):
+        """
+        _handleBlobConnected enables the blobs for all devices already known on the
+        dedicated blob connection.
 
-        con = self.devices[deviceName].getSwitch('CONNECTION')
-        if con['DISCONNECT'] == 'On':
-            self.log.warning(f'{deviceName} already disconnected')
-            return False
+        :return: nothing
+        """
 
-        suc = self.sendNewSwitch(deviceName=deviceName,
-                                 propertyName='CONNECTION',
-                                 elements={'CONNECT': 'Off',
-                                           'DISCONNECT': 'On'
-                                           },
-                                 )
-        return suc
+        self.blobTimer.stop()
+        self._switchBlobChannel(True)
 
-    def getDevice(self, deviceName=''):
+    def _switchBlobChannel(self, status=True):
         """
-        Part of BASE CLIENT API of EKOS
-        getDevice collects all the data of the given device
+        _switchBlobChannel moves the blob traffic between the primary and the dedicated
+        blob connection. the stored blob modes are set to 'Never' on the connection,
+        which is given up, and replayed on the one taking over, so the server sends
+        every blob exactly once. if the connection given up is already dropped, only
+        the replay is done.
 
-        :param deviceName: name of device
-        :return: dict with data of that give device
+        :param status: True if the dedicated blob connection takes over
+        :return: success
         """
 
-        value = self.devices.get(deviceName, None)
-        return value
+        suc = True
+        if status != self.blobConnected:
+            for (deviceName, propertyName), mode in list(self.blobModes.items()):
+                if mode == 'Never':
+                    continue
+                indiAttr = {'device': deviceName}
+                if propertyName:
+                    indiAttr['name'] = propertyName
+                cmd = indiXML.enableBLOB('Never', indi_attr=indiAttr)
+                suc = self._sendCmd(cmd, blobChannel=self.blobConnected) and suc
+            self._flushCmd()
+
+        self.blobConnected = status
+        for deviceName in list(self.devices):
+            if status:
+                suc = self._watchBlobDevice(deviceName) and suc
+            suc = self._replayBlobModes(deviceName) and suc
+        return suc
 
-    def getDevices(self, driverInterface=0xFFFF):
+    @PyQt5.QtCore.pyqtSlot()
+    def _handleBlobConnectTimeout(self):
         """
-        Part of BASE CLIENT API of EKOS
-        getDevices generates a list of devices, which are from type of the given
-        driver interface type.
+        _handleBlobConnectTimeout drops the attempt of the dedicated blob connection.
+        the primary connection stays untouched.
 
-        :param driverInterface: binary value of driver interface type
-        :return: list of knows devices of this type
+        :return: nothing
         """
 
-        deviceList = list()
-        for deviceName in self.devices:
-            typeCheck = self._getDriverInterface(deviceName) & driverInterface
-            if typeCheck:
-                deviceList.append(deviceName)
-        return deviceList
+        if self.blobConnected:
+            return
+        self.log.warning('Dedicated blob connection could not be established')
+        self.blobSocket.abort()
 
-    def setBlobMode(self, blobHandling='Never', deviceName='', propertyName=''):
+    def _watchBlobDevice(self, deviceName=''):
         """
-        Part of BASE CLIENT API of EKOS
+        _watchBlobDevice registers the device on the dedicated blob connection and sets
+        the blob mode to 'Only', so nothing else than the blobs of the device will be
+        sent on this connection.
 
-        :param blobHandling:
         :param deviceName: name string of INDI device
-        :param propertyName: name string of device property
-        :return: true if server connected
+        :return: success
         """
 
-        if not deviceName:
-            return False
-        if deviceName not in self.devices:
+        if not self.blobConnected:
             return False
-        cmd = indiXML.enableBLOB(blobHandling,
-                                 indi_attr={'name': propertyName,
-                                            'device': deviceName})
-        self.blobMode = blobHandling
-        suc = self._sendCmd(cmd)
+
+        cmd = indiXML.clientGetProperties(indi_attr={'version': '1.7',
+                                                     'device': deviceName})
+        suc = self._sendCmd(cmd, blobChannel=True)
+        cmd = indiXML.enableBLOB('Only', indi_attr={'device': deviceName})
+        suc = self._sendCmd(cmd, blobChannel=True) and suc
         return suc
 
-    def getBlobMode(self, deviceName='', propertyName=''):
+    def disconnectServer(self, deviceName=''):
         """
         Part of BASE CLIENT API of EKOS
+        disconnect drops the connection to the indi server. a running connection
+        attempt or backoff is stopped as well. the commands, which were sent before,
+        are still written and delivered before the connection is closed.
 
         :param deviceName: name string of INDI device
-        :param propertyName: name string of device property
-        :return: None, because not implemented
-        """
-        pass
-
-    def getHost(self):
+        :return: success
         """
-        Part of BASE CLIENT API of EKOS
 
-        :return: host name as str
-        """
+        self.connectTimer.stop()
+        self.backoffTimer.stop()
+        self.blobTimer.stop()
+        if self.connected:
+            self._setState(self.DISCONNECTING)
+            self._flushCmd()
+            self.connectionLost(deviceName)
+        self.outgoing.clear()
+        self.blobOutgoing.clear()
+        self._closeSocket(self.socket)
+        self._closeSocket(self.blobSocket)
+        self._setState(self.DISCONNECTED)
 
-        if self._host is None:
-            return ''
-        if len(self._host) != 2:
-            return 0
-        return self._host[0]
+        return True
 
-    def getPort(self):
+    @staticmethod
+    def _closeSocket(socket):
         """
-        Part of BASE CLIENT API of EKOS
+        _closeSocket closes an established connection after the written data is
+        delivered. a connection attempt is aborted.
 
-        :return: port number as int
+        :param socket: socket to be closed
+        :return: nothing
         """
 
-        if self._host is None:
-            return 0
-        if len(self._host) != 2:
-            return 0
-        return self._host[1]
+        if socket.state() == socket.ConnectedState:
+            socket.disconnectFromHost()
+        else:
+            socket.abort()
 
-    def sendNewText(self, deviceName='', propertyName='', elements='', text=''):
+    @PyQt5.QtCore.pyqtSlot()
+    def _handleDisconnected(self):
         """
-        Part of BASE CLIENT API of EKOS
+        _handleDisconnected cleans up, when the server dropped the connection.
 
-        :param deviceName: name string of INDI device
-        :param propertyName: name string of device property
-        :param elements: element name or dict of element name / values
-        :param text: string in case of having only one element in elements
-        :return: success for test
+        :return: nothing
         """
 
-        if deviceName not in self.devices:
-            return False
-        if not hasattr(self.devices[deviceName], propertyName):
-            return False
-        if not isinstance(elements, dict):
-            elements = {elements: text}
-        elementList = []
-        for element in elements:
-            text = elements[element]
-            elementList.append(
-                indiXML.oneText(text,
-                                indi_attr={'name': element}
-                                )
-            )
-        cmd = indiXML.newTextVector(elementList,
-                                    indi_attr={'name': propertyName,
-                                               'device': deviceName})
-        suc = self._sendCmd(cmd)
-        return suc
+        if self.connected:
+            self.log.warning('INDI client disconnected')
+            self._setState(self.DISCONNECTING)
+            self.connectionLost()
+        self._setState(self.DISCONNECTED)
 
-    def sendNewNumber(self, deviceName='', propertyName='', elements='', number=0):
+    def startBlob(self, deviceName='', propertyName='', timestamp=''):
         """
         Part of BASE CLIENT API of EKOS
+        startBlob begins the upload of a blob vector. the start tag is written to the
+        socket, the blobs itself follow with sendOneBlob and the upload is closed with
+        finishBlob.
 
         :param deviceName: name string of INDI device
         :param propertyName: name string of device property
-        :param elements: element name or dict of element name / values
-        :param number: value in case of having only one element in elements
+        :param timestamp: optional timestamp of the vector
         :return: success for test
         """
 
+        if not self.connected:
+            return False
         if deviceName not in self.devices:
             return False
         if not hasattr(self.devices[deviceName], propertyName):
             return False
-        if not isinstance(elements, dict):
-            elements = {elements: number}
-        elementList = []
-        for element in elements:
-            number = elements[element]
-            elementList.append(
-                indiXML.oneNumber(number,
-                                  indi_attr={'name': element}
-                                  )
-            )
-        cmd = indiXML.newNumberVector(elementList,
-                                      indi_attr={'name': propertyName,
-                                                 'device': deviceName})
-        suc = self._sendCmd(cmd)
-        return suc
 
-    def sendNewSwitch(self, deviceName='', propertyName='', elements=''):
+        self._flushCmd()
+        data = indiXML.newBLOBSerializer.vectorStart(deviceName, propertyName, timestamp)
+        self.blobUpload = self._writeData(data)
+        return self.blobUpload
+
+    def sendOneBlob(self, blobName='', blobSize=0, blobFormat='', blobBuffer=None):
         """
         Part of BASE CLIENT API of EKOS
-
-        :param deviceName: name string of INDI device
-        :param propertyName: name string of device property
-        :param elements: element name or dict of element name / values
+        sendOneBlob encodes the blob chunk by chunk to base64 and writes the chunks
+        directly to the socket, so the memory needed does not depend on the size of
+        the blob. the blob buffer is a bytes like object or a file like object opened
+        in binary mode. if no size is given, the size of the buffer or of the rest of
+        the file is used. the upload stops at the first failed write.
+
+        :param blobName: name string of the blob element
+        :param blobSize: number of bytes of the uncompressed blob
+        :param blobFormat: format of the blob as file suffix, eg: .fits, .fits.z
+        :param blobBuffer: data of the blob
         :return: success for test
         """
 
-        if deviceName not in self.devices:
+        if not self.blobUpload or blobBuffer is None:
             return False
-        if not hasattr(self.devices[deviceName], propertyName):
-            return False
-        if not isinstance(elements, dict):
-            elements = {elements: 'On'}
-        elementList = []
-        for element in elements:
-            switch = elements[element]
-            elementList.append(
-                indiXML.oneSwitch(switch,
-                                  indi_attr={'name': element}
-                                  )
-            )
-        cmd = indiXML.newSwitchVector(elementList,
-                                      indi_attr={'name': propertyName,
-                                                 'device': deviceName})
-        suc = self._sendCmd(cmd)
+        if not blobSize:
+            blobSize = sourceSize(blobBuffer)
+
+        data = indiXML.newBLOBSerializer.elementStart(blobName, blobSize, blobFormat)
+        suc = self._writeData(data)
+        if suc:
+            for chunk in encodeBlob(blobBuffer, chunkSize=self.BLOB_CHUNK_SIZE):
+                suc = self._writeData(chunk)
+                if not suc:
+                    break
+        suc = suc and self._writeData(indiXML.newBLOBSerializer.element_end)
+
+        self.blobUpload = suc
         return suc
 
-    def startBlob(self, deviceName='', propertyName='', timestamp=''):
-        """
-        Part of BASE CLIENT API of EKOS
-
-        :return:
-        """
-        pass
-
-    def sendOneBlob(self, blobName='', blobSize=0, blobFormat='', blobBuffer=None):
-        """
-        Part of BASE CLIENT API of EKOS
-
-        :return:
-        """
-        pass
-
     def finishBlob(self):
         """
         Part of BASE CLIENT API of EKOS
+        finishBlob closes the upload of the blob vector and flushes the socket. the
+        commands, which were held back during the upload, are sent afterwards.
 
-        :return:
-        """
-        pass
-
-    def setVerbose(self, status):
-        """
-        Part of BASE CLIENT API of EKOS
-
-        :return:
+        :return: success for test
         """
 
-        pass
+        if not self.blobUpload:
+            self.blobUpload = False
+            return False
 
-    @staticmethod
-    def isVerbose():
-        """
-        Part of BASE CLIENT API of EKOS
+        self.blobUpload = False
+        suc = self._writeData(indiXML.newBLOBSerializer.vector_end + b'\n')
+        self._flushCmd()
+        self.socket.flush()
+        return suc
 
-        :return: status of verbose
+    @contextlib.contextmanager
+    def batch(self):
         """
+        batch holds back all commands sent inside the context and writes them at the
+        end in one go, so a sequence of commands leaves the client in one packet.
+        batches could be nested, the commands are written when the outermost batch
+        ends.
 
-        return False
+            >>> with indiClient.batch():
+            >>>     indiClient.sendNewNumber(...)
+            >>>     indiClient.sendNewSwitch(...)
 
-    def setConnectionTimeout(self, seconds=2, microseconds=0):
-        """
-        Part of BASE CLIENT API of EKOS
-
-        :return: success for test purpose
+        :return: client
         """
 
-        self.CONNECTION_TIMEOUT = seconds + microseconds / 1000000
-        return True
+        self.batchDepth += 1
+        try:
+            yield self
+        finally:
+            self.batchDepth -= 1
+            if not self.batchDepth:
+                self._flushCmd()
 
-    def _sendCmd(self, indiCommand):
+    def _sendCmd(self, indiCommand, blobChannel=False):
         """
         sendCmd take an XML indi command, converts it and sends it over the network and
         flushes the buffer
 
         :param indiCommand: XML command to send
+        :param blobChannel: True if sent over the dedicated blob connection
         :return: success of sending
         """
 
-        if self.connected:
+        if blobChannel:
+            connected = self.blobConnected
+        else:
+            connected = self.connected
+
+        if connected:
             cmd = indiCommand.toXML()
             self.log.debug(f"SendCmd: [{cmd.decode().lstrip('<').rstrip('/>')}]")
-            number = self.socket.write(cmd + b'\n')
-            self.socket.flush()
-            if number > 0:
+            receiveThread = PyQt5.QtCore.QThread.currentThread() is not self.thread()
+            if self.receiver is not None and receiveThread:
+                self.receiver.send.emit(cmd + b'\n', blobChannel)
                 return True
-            else:
-                return False
+            return self._writeCmd(cmd + b'\n', blobChannel)
         else:
             return False
 
-    def _getDriverInterface(self, deviceName):
+    @PyQt5.QtCore.pyqtSlot(bytes, bool)
+    def _writeCmd(self, data, blobChannel=False):
         """
-        _getDriverInterface look the type of the device's driver interface up and gives
-        it back as binary value.
+        _writeCmd writes the command to the connection straight away, so it is sent
+        even if no event loop runs afterwards. inside a batch the command is put into
+        the outgoing queue, which is written at the end of the batch. during a blob
+        upload the commands of the primary connection are queued until the upload is
+        finished. commands sent from the receive thread reach this slot
+        queued, as the sockets must only be used from the thread of the client.
 
-        :param deviceName: device name
-        :return: binary value of type of device drivers interface
+        :param data: command as bytes
+        :param blobChannel: True if sent over the dedicated blob connection
+        :return: success of sending or queueing
         """
 
-        device = self.devices[deviceName]
-        if not hasattr(device, 'DRIVER_INFO'):
-            return -1
-        val = getattr(device, 'DRIVER_INFO')
-        if val:
-            val = val['elementList'].get('DRIVER_INTERFACE', '')
-            if val:
-                interface = val['value']
-                return int(interface)
-            else:
-                return -1
+        if blobChannel:
+            self.blobOutgoing += data
         else:
-            return -1
-
-    def _fillAttributes(self, deviceName=None, chunk=None, elementList=None, defVector=None):
-        """
+            self.outgoing += data
 
-        :param deviceName: device name
-        :param chunk:   xml element from INDI
-        :param elementList:
-        :param defVector:
-        :return: True for test purpose
-        """
-
-        # now running through all atomic elements
-        for elt in chunk.elt_list:
-            name = elt.attr.get('name', '')
-            elementList[name] = {}
-            elementList[name]['elementType'] = elt.etype
-
-            # as a new blob vector does not  contain an initial value, we have to separate this
-            if not isinstance(elt, indiXML.DefBLOB):
-                elementList[name]['value'] = elt.getValue()
-
-            # now all other attributes of element are stored
-            for attr in elt.attr:
-                elementList[name][attr] = elt.attr[attr]
-
-            # send connected signals
-            if name == 'CONNECT' and elt.getValue() == 'On' and chunk.attr['state'] == 'Ok':
-                self.signals.deviceConnected.emit(deviceName)
-                self.log.warning(f'Device [{deviceName}] connected')
-            if name == 'DISCONNECT' and elt.getValue() == 'On':
-                self.signals.deviceDisconnected.emit(deviceName)
-                self.log.warning(f'Device [{deviceName}] disconnected')
-
-        return True
-
-    @staticmethod
-    def _setupPropertyStructure(chunk=None, device=None):
-        """
-
-        :param chunk:   xml element from INDI
-        :param device:  device class
-        :return:
-        """
-
-        iProperty = chunk.attr.get('name', '')
-        if not hasattr(device, iProperty):
-            setattr(device, iProperty, {})
-
-        # shortening for readability
-        deviceProperty = getattr(device, iProperty)
-
-        deviceProperty['propertyType'] = chunk.etype
-        for vecAttr in chunk.attr:
-            deviceProperty[vecAttr] = chunk.attr.get(vecAttr)
-
-        # adding subspace for atomic elements (text, switch, etc)
-        deviceProperty['elementList'] = {}
-        elementList = deviceProperty['elementList']
-
-        return iProperty, elementList
+        if self.batchDepth or (self.blobUpload and not blobChannel):
+            return True
+        return self._flushCmd()
 
-    def _getDeviceReference(self, chunk=None):
+    def _flushCmd(self):
         """
-        _getDeviceReference extracts the device name from INDI chunk and looks device
-        presence in INDi base class up. if not present, a new device will be generated
+        _flushCmd writes the queued commands of both connections with one write each
+        and flushes the sockets. during a blob upload the commands of the primary
+        connection are held back, as they must not end up inside the blob vector.
 
-        :param chunk:   xml element from INDI
-        :return: device and device name
+        :return: success of sending
         """
 
-        deviceName = chunk.attr.get('device', '')
-
-        if deviceName not in self.devices:
-            self.devices[deviceName] = Device(deviceName)
-            self.signals.newDevice.emit(deviceName)
-            self.log.warning(f'New device [{deviceName}]')
-
-        device = self.devices[deviceName]
-        return device, deviceName
+        suc = True
+        if self.blobOutgoing and self.blobConnected:
+            number = self.blobSocket.write(bytes(self.blobOutgoing))
+            self.blobSocket.flush()
+            suc = number > 0
+        if self.outgoing and self.connected and not self.blobUpload:
+            number = self.socket.write(bytes(self.outgoing))
+            self.socket.flush()
+            suc = number > 0 and suc
+        self.blobOutgoing.clear()
+        if not self.blobUpload:
+            self.outgoing.clear()
+        return suc
 
-    def _delProperty(self, chunk=None, device=None, deviceName=None):
+    def _writeData(self, data):
         """
-        _delProperty removes property from device class
+        _writeData writes the data to the socket. as the socket buffers all data, which
+        could not be sent immediately, the call waits for the buffer to be sent down to
+        BLOB_WRITE_LIMIT, so large uploads do not pile up in memory.
 
-        :param chunk:   xml element from INDI
-        :param device:  device class
-        :param deviceName: device name
-        :return: success
+        :param data: data to be sent as bytes
+        :return: success of sending
         """
 
-        if deviceName not in self.devices:
+        if not self.connected:
             return False
-        if 'name' not in chunk.attr:
+        if self.socket.write(data) != len(data):
             return False
-        iProperty = chunk.attr['name']
-        if hasattr(device, iProperty):
-            delattr(device, iProperty)
-            self.signals.removeProperty.emit(deviceName, iProperty)
-            self.log.warning(f'Device [{deviceName}] del property [{iProperty}]')
-        return True
-
-    def _setProperty(self, chunk=None, device=None, deviceName=None):
-        """
-        _sefProperty generate and write all data to device class for SefVector chunks
-
-        :param chunk:   xml element from INDI
-        :param device:  device class
-        :param deviceName: device name
-        :return: success
-        """
-
-        iProperty, elementList = self._setupPropertyStructure(chunk=chunk, device=device)
-
-        self._fillAttributes(deviceName=deviceName,
-                             chunk=chunk,
-                             elementList=elementList,
-                             defVector=False)
-
-        if isinstance(chunk, indiXML.SetBLOBVector):
-            self.signals.newBLOB.emit(deviceName, iProperty)
-        elif isinstance(chunk, indiXML.SetSwitchVector):
-            self.signals.newSwitch.emit(deviceName, iProperty)
-        elif isinstance(chunk, indiXML.SetNumberVector):
-            self.signals.newNumber.emit(deviceName, iProperty)
-        elif isinstance(chunk, indiXML.SetTextVector):
-            self.signals.newText.emit(deviceName, iProperty)
-        elif isinstance(chunk, indiXML.SetLightVector):
-            self.signals.newLight.emit(deviceName, iProperty)
 
+        while self.socket.bytesToWrite() > self.BLOB_WRITE_LIMIT:
+            if not self.socket.waitForBytesWritten(self.CONNECTION_TIMEOUT):
+                self.log.warning('Sending blob data timed out')
+                return False
         return True
 
-    def _defProperty(self, chunk=None, device=None, deviceName=None):
+    @PyQt5.QtCore.pyqtSlot()
+    def _handleReadyRead(self):
         """
-        _defProperty generate and write all data to device class for DefVector chunks
+        _handleReadyRead gets the date in buffer signal and starts to read data from the
+        network. as long as data is streaming, it feeds to the receive engine. with this
+        construct you don't have to put the whole data set into the parser at once, but
+        doing the work step be step. blob data is decoded while streaming as well.
 
-        :param chunk:   xml element from INDI
-        :param device:  device class
-        :param deviceName: device name
-        :return: success
+        :return: nothing
         """
 
-        iProperty, elementList = self._setupPropertyStructure(chunk=chunk, device=device)
-
-        self._fillAttributes(deviceName=deviceName,
-                             chunk=chunk,
-                             elementList=elementList,
-                             defVector=True)
-
-        self.signals.newProperty.emit(deviceName, iProperty)
-
-        if isinstance(chunk, indiXML.DefBLOBVector):
-            self.signals.defBLOB.emit(deviceName, iProperty)
-        elif isinstance(chunk, indiXML.DefSwitchVector):
-            self.signals.defSwitch.emit(deviceName, iProperty)
-        elif isinstance(chunk, indiXML.DefNumberVector):
-            self.signals.defNumber.emit(deviceName, iProperty)
-        elif isinstance(chunk, indiXML.DefTextVector):
-            self.signals.defText.emit(deviceName, iProperty)
-        elif isinstance(chunk, indiXML.DefLightVector):
-            self.signals.defLight.emit(deviceName, iProperty)
-
-        return True
+        buf = self.socket.readAll().data()
+        if self.receiver is not None:
+            self.receiver.received.emit(self.parser, buf)
+        else:
+            self._feedParser(self.parser, buf)
 
-    def _getProperty(self, chunk=None, device=None, deviceName=None):
+    @PyQt5.QtCore.pyqtSlot()
+    def _handleBlobReadyRead(self):
         """
+        _handleBlobReadyRead feeds the data of the dedicated blob connection to its own
+        receive engine, which writes into the same device store.
 
-        :param chunk:   xml element from INDI
-        :param device:  device class
-        :param deviceName: device name
-        :return: success
+        :return: nothing
         """
 
-        # todo: there is actually no implementation for this type. check if it is relevant
-        # get property is for snooping other devices
-        pass
+        buf = self.blobSocket.readAll().data()
+        if self.receiver is not None:
+            self.receiver.received.emit(self.blobParser, buf)
+        else:
+            self._feedParser(self.blobParser, buf)
 
-    def _message(self, chunk=None, deviceName=None):
+    def _feedParser(self, parser, data):
         """
+        _feedParser feeds the data to the receive engine while holding the lock of the
+        device store. if the engine was replaced in the meantime, as the connection
+        was dropped, the data belongs to the old connection and is skipped.
 
-        :param chunk:   xml element from INDI
-        :param deviceName: device name
+        :param parser: receive engine for the data
+        :param data: received data as bytes
         :return: success
         """
 
-        message = chunk.attr.get('message', '-')
-        self.signals.newMessage.emit(deviceName, message)
+        with self.storeLock:
+            if parser is not self.parser and parser is not self.blobParser:
+                return False
+            try:
+                parser.feed(data)
+            except Exception as e:
+                self.log.error(f'{e}: {data[:100]}')
+                return False
         return True
 
-    def _parseCmd(self, chunk):
-        """
-        _parseCmd parses the incoming indi XL data and builds up a dictionary of devices
-        in device class which holds all the data transferred through INDI protocol.
-
-        :param chunk: raw indi XML element
-        :return: success if it could be parsed
+    # the error slots are not decorated, as the type of the error would need
+    # PyQt5.QtNetwork at import time
+    def _handleBlobError(self, socketError):
         """
-        self.log.debug(f'RecvCmd: [{chunk}]')
-        if not self.connected:
-            return False
-
-        if 'device' not in chunk.attr:
-            self.log.error('No device in chunk: {0}'.format(chunk))
-            return False
-
-        device, deviceName = self._getDeviceReference(chunk=chunk)
-
-        # all message have no device names, they could be general
-        if isinstance(chunk, indiXML.Message):
-            self._message(chunk=chunk, deviceName=deviceName)
-            return True
-
-        if 'name' not in chunk.attr:
-            self.log.error('No property in chunk: {0}'.format(chunk))
-            return False
-
-        if isinstance(chunk, indiXML.DelProperty):
-            self._delProperty(chunk=chunk, device=device, deviceName=deviceName)
-            return True
-
-        if isinstance(chunk, (indiXML.SetBLOBVector,
-                              indiXML.SetSwitchVector,
-                              indiXML.SetTextVector,
-                              indiXML.SetLightVector,
-                              indiXML.SetNumberVector,
-                              )
-                      ):
-            self._setProperty(chunk=chunk, device=device, deviceName=deviceName)
-            return True
-
-        if isinstance(chunk, (indiXML.DefBLOBVector,
-                              indiXML.DefSwitchVector,
-                              indiXML.DefTextVector,
-                              indiXML.DefLightVector,
-                              indiXML.DefNumberVector,
-                              )
-                      ):
-            self._defProperty(chunk=chunk, device=device, deviceName=deviceName)
-            return True
-
-        if isinstance(chunk, indiXML.GetProperties):
-            self._getProperty(chunk=chunk, device=device, deviceName=deviceName)
-            return True
-
-        if isinstance(chunk, (indiXML.NewBLOBVector,
-                              indiXML.NewSwitchVector,
-                              indiXML.NewTextVector,
-                              indiXML.NewNumberVector,
-                              )
-                      ):
-            # todo: what to do with the "New" vector ?
-            return True
-
-        if isinstance(chunk, (indiXML.OneBLOB,
-                              indiXML.OneSwitch,
-                              indiXML.OneText,
-                              indiXML.OneNumber,
-                              )
-                      ):
-            # todo: what to do with the "One" vector ?
-            return True
-
-        self.log.error('Unknown vectors: {0}'.format(chunk))
-        return False
-
-    @PyQt5.QtCore.pyqtSlot()
-    def _handleReadyRead(self):
-        """
-        _handleReadyRead gets the date in buffer signal and starts to read data from the
-        network. as long as data is streaming, it feeds to the xml parser. with this
-        construct you don't have to put the whole data set into the parser at once, but
-        doing the work step be step.
+        _handleBlobError log all network errors of the dedicated blob connection. the
+        primary connection stays untouched.
 
+        :param socketError: the error from socket library
         :return: nothing
         """
 
-        buf = self.socket.readAll()
-        self.parser.feed(buf)
-        try:
-            for event, elem in self.parser.read_events():
-                if event == 'start':
-                    self.curDepth += 1
-                elif event == 'end':
-                    self.curDepth -= 1
-                else:
-                    self.log.critical('Problem parsing event: {0}'.format(event))
-                if self.curDepth > 0:
-                    continue
-                # print('Depth: ', self.curDepth, '  Parsed: ', elem.items())
-                elemParsed = indiXML.parseETree(elem)
-                elem.clear()
-                self._parseCmd(elemParsed)
-        except Exception as e:
-            self.log.error(f'{e}: {buf}')
-
-    @PyQt5.QtCore.pyqtSlot(PyQt5.QtNetwork.QAbstractSocket.SocketError)
+        if not self.blobConnected and not self.blobTimer.isActive():
+            return
+        self.blobTimer.stop()
+        self.log.error(f'INDI client blob connection fault, error: {socketError}')
+        if self.blobConnected:
+            self.blobConnected = False
+            self._switchBlobChannel(False)
+        self.blobSocket.abort()
+
     def _handleError(self, socketError):
         """
-        _handleError log all network errors in case of problems.
+        _handleError log all network errors in case of problems. errors while
+        connecting end the connection attempt, errors of an established connection
+        drop it. both are signaled with serverError.
 
         :param socketError: the error from socket library
         :return: nothing
         """
 
+        if self.state == self.CONNECTING:
+            self._connectionFailed(self.socket.errorString())
+            return
         if not self.connected:
             return
         self.log.error('INDI client connection fault, error: {0}'.format(socketError))
+        self.signals.serverError.emit(self.socket.errorString())
         self.disconnectServer()
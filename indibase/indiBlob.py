@@ -0,0 +1,580 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+#       #   #  #   #   #    #
+#      ##  ##  #  ##  #    #
+#     # # # #  # # # #    #  #
+#    #  ##  #  ##  ##    ######
+#   #   #   #  #   #       #
+#
+# Python-based Tool for interaction with the 10micron mounts
+# GUI with PyQT5 for python
+# Python  v3.7.4
+
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import logging
+import binascii
+import mmap
+import os
+import threading
+import zlib
+# external packages
+# local import
+from indibase.loggerMW import CustomLogger
+
+
+def blobSize(attr):
+    """
+    blobSize extracts the size attribute of a oneBLOB element.
+
+    :param attr: attributes of the oneBLOB element
+    :return: size in bytes
+    """
+
+    try:
+        size = int(attr.get('size', 0))
+    except ValueError:
+        size = 0
+    return size
+
+
+def _readChunks(source, chunkSize):
+    """
+    _readChunks reads a file like object into a preallocated buffer. the buffer is only
+    passed on when it is filled completely or the end of the file is reached.
+
+    :param source: file like object opened in binary mode
+    :param chunkSize: size of the chunks in bytes
+    :return: generator of memory views of the buffer
+    """
+
+    buffer = bytearray(chunkSize)
+    view = memoryview(buffer)
+    while True:
+        length = 0
+        while length < chunkSize:
+            number = source.readinto(view[length:])
+            if not number:
+                break
+            length += number
+        if not length:
+            return
+        yield view[:length]
+        if length < chunkSize:
+            return
+
+
+def sourceSize(source):
+    """
+    sourceSize returns the number of bytes of a blob source, which are going to be
+    sent. a file like object is measured from its current position to its end or, if
+    it could not be seeked, by the size of its file.
+
+    :param source: bytes like or file like object
+    :return: size in bytes, 0 if unknown
+    """
+
+    if not hasattr(source, 'readinto'):
+        return memoryview(source).nbytes
+    try:
+        if source.seekable():
+            position = source.tell()
+            size = source.seek(0, os.SEEK_END) - position
+            source.seek(position)
+            return size
+        return os.fstat(source.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        return 0
+
+
+def encodeBlob(source, chunkSize=3 * 2 ** 16):
+    """
+    encodeBlob encodes the data of a blob to base64 chunk by chunk. the chunk size is
+    a multiple of three, so the chunks could be concatenated without any padding in
+    between. the source is either a bytes like object, which is sliced without copying,
+    or a file like object, which is read chunk by chunk.
+
+    :param source: bytes like or file like object
+    :param chunkSize: size of the unencoded chunks in bytes
+    :return: generator of base64 text chunks as bytes
+    """
+
+    chunkSize = max(chunkSize - chunkSize % 3, 3)
+    if hasattr(source, 'readinto'):
+        chunks = _readChunks(source, chunkSize)
+    else:
+        view = memoryview(source).cast('B')
+        chunks = (view[i:i + chunkSize] for i in range(0, len(view), chunkSize))
+
+    for chunk in chunks:
+        yield binascii.b2a_base64(chunk, newline=False)
+
+
+class BlobMap(mmap.mmap):
+    """
+    BlobMap is a read only memory map of a spooled blob file, which keeps the path of
+    the file, if the file was stored in a target directory.
+    """
+
+    __all__ = ['BlobMap',
+               ]
+
+    path = ''
+
+
+class BlobDecoder(object):
+    """
+    BlobDecoder decodes the base64 text of a oneBLOB element chunk by chunk as it arrives
+    from the network. the decoded data is written into a buffer, which is preallocated
+    with the size attribute of the oneBLOB element, so there is no need to keep the whole
+    base64 text in memory before decoding.
+
+        >>> decoder = BlobDecoder(
+        >>>                       size=0,
+        >>>                       )
+
+    """
+
+    __all__ = ['BlobDecoder',
+               'feed',
+               'finish',
+               ]
+
+    logger = logging.getLogger(__name__)
+    log = CustomLogger(logger, {})
+
+    # characters, which might be part of the base64 text, but not of the data
+    WHITESPACE = b' \t\r\n'
+
+    def __init__(self,
+                 size=0,
+                 ):
+
+        self.buffer = bytearray(max(size, 0))
+        self.length = 0
+        self.rest = b''
+
+    def feed(self, data):
+        """
+        feed decodes all complete base64 quadruples of the given data into the buffer.
+        an incomplete quadruple at the end is kept for the next call. if the buffer is
+        too small, it is extended.
+
+        :param data: base64 text as bytes
+        :return: number of decoded bytes so far
+        """
+
+        data = (self.rest + data).translate(None, self.WHITESPACE)
+        usable = len(data) - len(data) % 4
+        self.rest = data[usable:]
+        if not usable:
+            return self.length
+
+        self._write(binascii.a2b_base64(data[:usable]))
+        return self.length
+
+    def _write(self, decoded):
+        """
+        _write stores the decoded data in the buffer.
+
+        :param decoded: decoded data
+        :return: nothing
+        """
+
+        end = self.length + len(decoded)
+        self.buffer[self.length:end] = decoded
+        self.length = end
+
+    def _close(self):
+        """
+        _close truncates the buffer to the number of bytes, which were really decoded.
+
+        :return: buffer with decoded data
+        """
+
+        del self.buffer[self.length:]
+        return self.buffer
+
+    def _discard(self):
+        """
+        _discard drops the data decoded so far. the buffer is just left to the garbage
+        collector.
+
+        :return: nothing
+        """
+
+        pass
+
+    def finish(self):
+        """
+        finish decodes the remaining text and truncates the buffer to the number of
+        bytes, which were really decoded.
+
+        :return: buffer with decoded data
+        """
+
+        if self.rest:
+            try:
+                self.feed(b'=' * (-len(self.rest) % 4))
+            except binascii.Error as e:
+                self.log.warning(f'{e}: [{self.rest}]')
+            self.rest = b''
+
+        return self._close()
+
+
+class BlobSpool(BlobDecoder):
+    """
+    BlobSpool decodes the base64 text of a oneBLOB element chunk by chunk into a file
+    instead of memory. when finished, the file is exposed as read only memory map, so
+    the data is paged in by the operating system when used. without a target directory
+    a temporary file is used, which the operating system removes, when it is closed
+    and no longer mapped.
+
+        >>> spool = BlobSpool(
+        >>>                   directory='',
+        >>>                   suffix='',
+        >>>                   )
+
+    """
+
+    __all__ = ['BlobSpool',
+               ]
+
+    def __init__(self,
+                 directory='',
+                 suffix='',
+                 ):
+        super().__init__(0)
+        # tempfile costs more import time than the whole indiBlob module and is only
+        # needed for spooling, so it is imported on first use
+        import tempfile
+
+        self.keep = bool(directory)
+        if not self.keep:
+            self.path = ''
+            self.file = tempfile.TemporaryFile(suffix=suffix, prefix='indi_')
+            return
+        fd, self.path = tempfile.mkstemp(suffix=suffix,
+                                         prefix='indi_',
+                                         dir=directory)
+        self.file = os.fdopen(fd, 'w+b')
+
+    def _write(self, decoded):
+        """
+        _write stores the decoded data in the file.
+
+        :param decoded: decoded data
+        :return: nothing
+        """
+
+        self.file.write(decoded)
+        self.length += len(decoded)
+
+    def _close(self):
+        """
+        _close maps the file read only into memory. the memory map stays valid, when
+        the file is closed.
+
+        :return: memory map with decoded data
+        """
+
+        self.file.flush()
+        try:
+            if self.length:
+                buffer = BlobMap(self.file.fileno(), self.length, access=mmap.ACCESS_READ)
+            else:
+                buffer = b''
+        finally:
+            self.file.close()
+
+        if self.keep and self.length:
+            buffer.path = self.path
+        return buffer
+
+    def _remove(self):
+        """
+        _remove deletes the spool file.
+
+        :return: nothing
+        """
+
+        try:
+            os.remove(self.path)
+        except OSError as e:
+            self.log.warning(f'Could not remove spool file [{self.path}]: {e}')
+
+    def _discard(self):
+        """
+        _discard closes the spool file and deletes it, if it was stored in a target
+        directory, as the data is not complete.
+
+        :return: nothing
+        """
+
+        self.file.close()
+        if self.keep:
+            self._remove()
+
+
+class BlobInflater(BlobDecoder):
+    """
+    BlobInflater decodes the base64 text of a zlib compressed oneBLOB element and feeds
+    every decoded chunk directly into a zlib decompressor. the inflated data is passed
+    to the target decoder, which stores it in memory or a file. so decoding and
+    inflating run side by side while the data arrives. the compressed data is kept
+    until the blob is complete. if inflating fails, the inflated data is discarded and
+    the compressed data is delivered instead, the suffix .z is put back to the format
+    attribute of the element.
+
+        >>> inflater = BlobInflater(
+        >>>                         target=BlobDecoder(size),
+        >>>                         attr=attr,
+        >>>                         )
+
+    """
+
+    __all__ = ['BlobInflater',
+               ]
+
+    def __init__(self,
+                 target=None,
+                 attr=None,
+                 ):
+        super().__init__(0)
+
+        self.target = target
+        self.attr = attr
+        self.decompressor = zlib.decompressobj()
+
+    def _write(self, decoded):
+        """
+        _write keeps the decoded data, inflates it and stores it in the target. after
+        an error the data is only kept.
+
+        :param decoded: decoded data
+        :return: nothing
+        """
+
+        super()._write(decoded)
+        if self.decompressor is None:
+            return
+
+        try:
+            self.target._write(self.decompressor.decompress(decoded))
+        except zlib.error as e:
+            self.log.warning(f'Could not inflate blob: {e}')
+            self.decompressor = None
+
+    def _close(self):
+        """
+        _close inflates the data left in the decompressor and closes the target. if
+        inflating failed or the compressed data is not complete, the target is
+        discarded and the compressed data is returned.
+
+        :return: buffer of the target with inflated data or compressed data
+        """
+
+        if self.decompressor is not None:
+            try:
+                self.target._write(self.decompressor.flush())
+            except zlib.error as e:
+                self.log.warning(f'Could not inflate blob: {e}')
+                self.decompressor = None
+
+        if self.decompressor is not None and self.decompressor.eof:
+            return self.target._close()
+
+        if self.decompressor is not None:
+            self.log.warning('Could not inflate blob: compressed data incomplete')
+        self.target._discard()
+        if self.attr is not None:
+            self.attr['format'] = self.attr.get('format', '') + '.z'
+        return super()._close()
+
+
+class FrameRing(object):
+    """
+    FrameRing keeps the frames of a streamed blob property in a fixed number of
+    preallocated buffers. every frame gets a sequence number. the buffers are reused
+    for the following frames and only grow, if a frame is larger than the buffer. if a
+    frame is overwritten before it was read, it counts as dropped. the frame is
+    dropped as soon as its buffer is handed out for the next frame, so a frame, which
+    is only partly received, is never read. the frames are read while holding the
+    lock of the device store, as the receive engine might write them in another
+    thread.
+
+        >>> ring = FrameRing(
+        >>>                  slots=8,
+        >>>                  size=0,
+        >>>                  lock=None,
+        >>>                  )
+
+    """
+
+    __all__ = ['FrameRing',
+               'read',
+               'latest',
+               ]
+
+    def __init__(self,
+                 slots=8,
+                 size=0,
+                 lock=None,
+                 ):
+
+        self.lock = lock if lock is not None else threading.RLock()
+        self.slots = max(slots, 1)
+        self.buffers = [bytearray(size) for _ in range(self.slots)]
+        self.lengths = [0] * self.slots
+        self.sequence = 0
+        self.readSequence = 0
+        self.dropped = 0
+        self.writing = False
+
+    def __len__(self):
+        return self.sequence - self.readSequence
+
+    def _oldest(self):
+        """
+        _oldest returns the sequence number of the oldest frame, which is still
+        readable. while a frame is written, its buffer does not hold a frame.
+
+        :return: sequence number
+        """
+
+        return max(self.sequence - self.slots + self.writing, 0)
+
+    def nextBuffer(self, size=0):
+        """
+        nextBuffer returns the buffer for the next frame. it is only replaced, if it is
+        too small for the size of the frame. the frame kept in the buffer so far is
+        not readable anymore and counts as dropped, if it was not read.
+
+        :param size: size of the next frame
+        :return: buffer
+        """
+
+        self.writing = True
+        oldest = self._oldest()
+        if self.readSequence < oldest:
+            self.dropped += oldest - self.readSequence
+            self.readSequence = oldest
+
+        index = self.sequence % self.slots
+        if len(self.buffers[index]) < size:
+            self.buffers[index] = bytearray(size)
+        return self.buffers[index]
+
+    def commit(self, buffer, length):
+        """
+        commit stores the written buffer as next frame. if the oldest unread frame is
+        overwritten, it is counted as dropped.
+
+        :param buffer: buffer with the frame
+        :param length: length of the frame in the buffer
+        :return: memory view of the frame
+        """
+
+        index = self.sequence % self.slots
+        self.buffers[index] = buffer
+        self.lengths[index] = length
+        self.sequence += 1
+        self.writing = False
+        if self.sequence - self.readSequence > self.slots:
+            self.dropped += self.sequence - self.readSequence - self.slots
+            self.readSequence = self.sequence - self.slots
+        return memoryview(buffer)[:length]
+
+    def _frame(self, sequence):
+        index = sequence % self.slots
+        return memoryview(self.buffers[index])[:self.lengths[index]]
+
+    def read(self):
+        """
+        read returns the oldest frame, which was not read so far.
+
+        :return: sequence number and memory view of the frame, None if nothing new
+        """
+
+        with self.lock:
+            if self.readSequence >= self.sequence:
+                return None, None
+            sequence = self.readSequence
+            self.readSequence += 1
+            return sequence, self._frame(sequence)
+
+    def latest(self):
+        """
+        latest returns the newest frame. all older frames, which were not read so far,
+        are skipped and counted as dropped.
+
+        :return: sequence number and memory view of the frame, None if no frame
+        """
+
+        with self.lock:
+            sequence = self.sequence - 1
+            if sequence < self._oldest():
+                return None, None
+            self.dropped += max(sequence - self.readSequence, 0)
+            self.readSequence = self.sequence
+            return sequence, self._frame(sequence)
+
+
+class FrameDecoder(BlobDecoder):
+    """
+    FrameDecoder decodes the base64 text of a oneBLOB element directly into the next
+    buffer of a frame ring, so streamed frames do not allocate new memory.
+
+        >>> decoder = FrameDecoder(
+        >>>                        ring=ring,
+        >>>                        size=0,
+        >>>                        )
+
+    """
+
+    __all__ = ['FrameDecoder',
+               ]
+
+    def __init__(self,
+                 ring=None,
+                 size=0,
+                 ):
+        super().__init__(0)
+
+        self.ring = ring
+        self.buffer = ring.nextBuffer(size)
+
+    def _write(self, decoded):
+        """
+        _write stores the decoded data in the buffer of the ring. as there might be
+        views on the buffer from older frames, it is never resized but replaced, if
+        it is too small.
+
+        :param decoded: decoded data
+        :return: nothing
+        """
+
+        end = self.length + len(decoded)
+        if end > len(self.buffer):
+            buffer = bytearray(max(end, 2 * len(self.buffer)))
+            buffer[:self.length] = self.buffer[:self.length]
+            self.buffer = buffer
+        self.buffer[self.length:end] = decoded
+        self.length = end
+
+    def _close(self):
+        """
+        _close commits the frame to the ring.
+
+        :return: memory view of the frame
+        """
+
+        return self.ring.commit(self.buffer, self.length)
@@ -0,0 +1,1517 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+#       #   #  #   #   #    #
+#      ##  ##  #  ##  #    #
+#     # # # #  # # # #    #  #
+#    #  ##  #  ##  ##    ######
+#   #   #   #  #   #       #
+#
+# Python-based Tool for interaction with the 10micron mounts
+# GUI with PyQT5 for python
+# Python  v3.7.4
+
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+# external packages
+# local import
+from indibase.loggerMW import CustomLogger
+from indibase import indiXML
+from indibase.indiParser import ETreeParser, DirectParser
+from indibase.indiDevice import Device, Property, Element
+from indibase.indiDevice import parseNumber
+from indibase.indiBlob import BlobDecoder, BlobSpool, BlobInflater
+from indibase.indiBlob import FrameRing, FrameDecoder
+from indibase.indiBlob import blobSize
+
+
+class Event(object):
+    """
+    Event is the base of the events of the protocol core. the name of the event is the
+    name of the signal of the Qt client and args are the arguments of the signal.
+    """
+
+    __slots__ = ()
+
+    @property
+    def args(self):
+        return tuple(self)[1:]
+
+
+class ServerEvent(Event, collections.namedtuple('ServerEvent', ['signal'])):
+    """
+    ServerEvent is sent for serverConnected.
+    """
+
+    __slots__ = ()
+
+
+class DisconnectEvent(Event, collections.namedtuple('DisconnectEvent',
+                                                    ['signal', 'devices'])):
+    """
+    DisconnectEvent is sent for serverDisconnected with the devices known before.
+    """
+
+    __slots__ = ()
+
+
+class DeviceEvent(Event, collections.namedtuple('DeviceEvent', ['signal', 'device'])):
+    """
+    DeviceEvent is sent for newDevice, removeDevice, deviceConnected and
+    deviceDisconnected.
+    """
+
+    __slots__ = ()
+
+
+class PropertyEvent(Event, collections.namedtuple('PropertyEvent',
+                                                  ['signal', 'device', 'name'])):
+    """
+    PropertyEvent is sent for newProperty, removeProperty and all defXXX and newXXX
+    signals.
+    """
+
+    __slots__ = ()
+
+
+class MessageEvent(Event, collections.namedtuple('MessageEvent',
+                                                 ['signal', 'device', 'message'])):
+    """
+    MessageEvent is sent for newMessage.
+    """
+
+    __slots__ = ()
+
+
+# event types of the signals, all other signals are property events
+EVENT_TYPES = {'serverConnected': ServerEvent,
+               'serverDisconnected': DisconnectEvent,
+               'newDevice': DeviceEvent,
+               'removeDevice': DeviceEvent,
+               'deviceConnected': DeviceEvent,
+               'deviceDisconnected': DeviceEvent,
+               'newMessage': MessageEvent,
+               }
+
+
+def makeEvent(signal, *args):
+    """
+    makeEvent creates the typed event for a signal.
+
+    :param signal: name of the signal
+    :param args: arguments of the signal
+    :return: event
+    """
+
+    return EVENT_TYPES.get(signal, PropertyEvent)(signal, *args)
+
+
+class CommandHandle(object):
+    """
+    CommandHandle follows a command, which was sent to a property of a device. the
+    command is finished, when the device sets the property with the state Ok or Alert.
+    the final state is one of Ok, Alert, Timeout or Failed. transports derive their
+    handles from it to signal the result and to apply the timeout. a handle, which
+    timed out, is removed from the pending commands of its client.
+
+        >>> handle = CommandHandle(
+        >>>                        deviceName='',
+        >>>                        propertyName='',
+        >>>                        timeout=0,
+        >>>                        client=None,
+        >>>                        )
+
+    """
+
+    __all__ = ['CommandHandle',
+               'done',
+               ]
+
+    def __init__(self,
+                 deviceName='',
+                 propertyName='',
+                 timeout=0,
+                 client=None,
+                 ):
+        super().__init__()
+
+        self.deviceName = deviceName
+        self.propertyName = propertyName
+        self.timeout = timeout
+        self.client = client
+        self.values = dict()
+        self.state = ''
+
+    def done(self):
+        """
+        :return: True if the command is finished
+        """
+
+        return bool(self.state)
+
+    def _resolve(self, state):
+        """
+        _resolve finishes the command with the given state. a finished command keeps
+        its state.
+
+        :param state: final state
+        :return: True if the command was finished by this call
+        """
+
+        if self.state:
+            return False
+        self.state = state
+        return True
+
+    def _handleTimeout(self):
+        """
+        _handleTimeout finishes the command with the state Timeout. the command is
+        removed from the pending commands of the client first, so a late acknowledgement
+        of the device does not finish a newer command of the same property.
+
+        :return: nothing
+        """
+
+        if self.client is not None:
+            self.client._dropCommand(self)
+        self._resolve('Timeout')
+
+
+class ClientCore(object):
+    """
+    ClientCore is the INDI protocol engine, which does not depend on any transport. it
+    holds the devices dict with all data, properties and attributes and the receive
+    engines, which fill it. the received bytes are fed with receive, which gives back
+    the typed events. the commands are collected as bytes, which are taken with
+    dataToSend. transports (Qt or asyncio) are thin adapters, which deliver the events
+    directly by overriding _emit and write the commands directly by overriding
+    _sendCmd.
+
+        >>> core = ClientCore(
+        >>>                   host=host,
+        >>>                   engine='etree',
+        >>>                   )
+        >>> core.connectionMade()
+        >>> core.watchDevice('CCD Simulator')
+        >>> socket.send(core.dataToSend())
+        >>> events = core.receive(socket.recv(65536))
+
+    """
+
+    __all__ = ['ClientCore',
+               'receive',
+               'takeEvents',
+               'dataToSend',
+               'connectionMade',
+               'connectionLost',
+               'setServer',
+               'watchDevice',
+               'isServerConnected',
+               'connectDevice',
+               'disconnectDevice',
+               'getDevice',
+               'getDevices',
+               'setBlobMode',
+               'getBlobMode',
+               'setBlobStorage',
+               'setBlobInflate',
+               'setBlobStream',
+               'getBlobStream',
+               'getHost',
+               'getPort',
+               'sendNewText',
+               'sendNewNumber',
+               'sendNewSwitch',
+               'requestNewText',
+               'requestNewNumber',
+               'requestNewSwitch',
+               'setVerbose',
+               'isVerbose',
+               'setConnectionTimeout',
+               ]
+
+    logger = logging.getLogger(__name__)
+    log = CustomLogger(logger, {})
+
+    # INDI device types
+    GENERAL_INTERFACE = 0
+    TELESCOPE_INTERFACE = (1 << 0)
+    CCD_INTERFACE = (1 << 1)
+    GUIDER_INTERFACE = (1 << 2)
+    FOCUSER_INTERFACE = (1 << 3)
+    FILTER_INTERFACE = (1 << 4)
+    DOME_INTERFACE = (1 << 5)
+    GPS_INTERFACE = (1 << 6)
+    WEATHER_INTERFACE = (1 << 7)
+    AO_INTERFACE = (1 << 8)
+    DUSTCAP_INTERFACE = (1 << 9)
+    LIGHTBOX_INTERFACE = (1 << 10)
+    DETECTOR_INTERFACE = (1 << 11)
+    AUX_INTERFACE = (1 << 15)
+
+    # default port indi servers
+    DEFAULT_PORT = 7624
+
+    # timeout for client to server
+    CONNECTION_TIMEOUT = 3000
+
+    # raw chunk size for encoding uploaded blobs, multiple of 3 for base64
+    BLOB_CHUNK_SIZE = 3 * 2 ** 16
+
+    # states of a property, which finish a command
+    COMMAND_STATES = ['Ok',
+                      'Alert',
+                      ]
+
+    # timeout in seconds for commands to properties without a timeout
+    COMMAND_TIMEOUT = 60
+
+    # receive engines for parsing the incoming data
+    ENGINES = {'etree': ETreeParser,
+               'direct': DirectParser,
+               }
+
+    # signals to be sent for defined or set properties
+    PROPERTY_SIGNALS = {'defBLOBVector': 'defBLOB',
+                        'defSwitchVector': 'defSwitch',
+                        'defNumberVector': 'defNumber',
+                        'defTextVector': 'defText',
+                        'defLightVector': 'defLight',
+                        'setBLOBVector': 'newBLOB',
+                        'setSwitchVector': 'newSwitch',
+                        'setNumberVector': 'newNumber',
+                        'setTextVector': 'newText',
+                        'setLightVector': 'newLight',
+                        }
+
+    # elements, which hold number values
+    NUMBER_ELEMENTS = ['defNumber',
+                       'oneNumber',
+                       ]
+
+    def __init__(self,
+                 host=None,
+                 engine='etree',
+                 ):
+        super().__init__()
+
+        self.host = host
+        self.engine = engine
+
+        # instance variables
+        self.connected = False
+        self.blobModes = dict()
+        self.watchedDevices = list()
+        self.commands = dict()
+        self.lateCommands = dict()
+        self.blobSpoolSize = 0
+        self.blobSpoolDir = ''
+        self.blobInflate = True
+        self.blobStreams = dict()
+        self.blobConnected = False
+        self.devices = dict()
+        # the device store is written by the receive engine, which might run in its own
+        # thread, so all writers and readers iterating over it hold this lock
+        self.storeLock = threading.RLock()
+        self.parser = None
+        self.pendingEvents = []
+        self.outgoing = bytearray()
+        self.clearParser()
+
+    @property
+    def host(self):
+        return self._host
+
+    def checkFormat(self, value):
+        # checking format
+        if not value:
+            return None
+        if not isinstance(value, (tuple, str)):
+            self.log.warning('wrong host value: {0}'.format(value))
+            return None
+        # now we got the right format
+        if isinstance(value, str):
+            value = (value, self.DEFAULT_PORT)
+        return value
+
+    @host.setter
+    def host(self, value):
+        value = self.checkFormat(value)
+        self._host = value
+
+    def clearParser(self):
+        """
+        clearParser sets up a new receive engine for parsing the incoming data. the
+        engine is chosen by the engine parameter of the client, 'etree' builds the
+        INDIBase objects of indiXML for every command, 'direct' writes the values
+        directly into the device store while parsing.
+
+        :return: success for test purpose
+        """
+
+        self.parser = self.ENGINES[self.engine](client=self)
+        return True
+
+    def setServer(self, host='', port=7624):
+        """
+        Part of BASE CLIENT API of EKOS
+        setServer sets the server address of the indi server
+
+        :param host: host name as string
+        :param port: port as int
+        :return: success for test purpose
+        """
+        self.host = (host, port)
+        self.connected = False
+        return True
+
+    def watchDevice(self, deviceName=''):
+        """
+        Part of BASE CLIENT API of EKOS
+        adds a device to the watchlist. if the device name is empty, all traffic for all
+        devices will be watched and therefore received. the devices of the watchlist are
+        watched again after a reconnect.
+
+        :param deviceName: name string of INDI device
+        :return: success for test purpose
+        """
+        if deviceName:
+            cmd = indiXML.clientGetProperties(indi_attr={'version': '1.7',
+                                                         'device': deviceName})
+        else:
+            cmd = indiXML.clientGetProperties(indi_attr={'version': '1.7'})
+
+        suc = self._sendCmd(cmd)
+        if suc and deviceName not in self.watchedDevices:
+            self.watchedDevices.append(deviceName)
+        return suc
+
+    def _effectiveBlobMode(self, blobHandling='Never'):
+        """
+        _effectiveBlobMode returns the blob handling, which is really sent to the
+        server. with the dedicated blob connection the modes are sent over this
+        connection, so any other mode than 'Never' becomes 'Only'.
+
+        :param blobHandling: blob mode 'Never', 'Also' or 'Only'
+        :return: blob mode sent to the server
+        """
+
+        if self.blobConnected and blobHandling != 'Never':
+            return 'Only'
+        return blobHandling
+
+    def _sendBlobMode(self, blobHandling='Never', deviceName='', propertyName=''):
+        """
+        _sendBlobMode stores the blob handling in the blob mode table and sends it to
+        the server over the connection, which carries the blobs.
+
+        :param blobHandling: blob mode 'Never', 'Also' or 'Only'
+        :param deviceName: name string of INDI device
+        :param propertyName: name string of device property, empty for all
+        :return: success
+        """
+
+        self.blobModes[(deviceName, propertyName)] = blobHandling
+
+        indiAttr = {'device': deviceName}
+        if propertyName:
+            indiAttr['name'] = propertyName
+        cmd = indiXML.enableBLOB(self._effectiveBlobMode(blobHandling), indi_attr=indiAttr)
+        suc = self._sendCmd(cmd, blobChannel=self.blobConnected)
+        return suc
+
+    def _replayBlobModes(self, deviceName=''):
+        """
+        _replayBlobModes sends all blob modes stored for the device again, as the
+        server forgets them with the connection.
+
+        :param deviceName: name string of INDI device
+        :return: success
+        """
+
+        suc = True
+        for (device, propertyName), mode in list(self.blobModes.items()):
+            if device != deviceName:
+                continue
+            suc = self._sendBlobMode(blobHandling=mode,
+                                     deviceName=deviceName,
+                                     propertyName=propertyName) and suc
+        return suc
+
+    def _watchBlobDevice(self, deviceName=''):
+        """
+        _watchBlobDevice registers the device on a dedicated blob connection. the core
+        has no connections at all, so this is done by the transport, which offers a
+        dedicated blob connection.
+
+        :param deviceName: name string of INDI device
+        :return: success
+        """
+
+        return False
+
+    def clearDevices(self, deviceName):
+        """
+        clearDevices deletes all the actual knows devices and sens out the appropriate
+        qt signals
+
+        :param deviceName: name string of INDI device
+        :return: success for test purpose
+        """
+
+        for device in self.devices:
+            if not device == deviceName and deviceName:
+                continue
+            self._emit('removeDevice', device)
+            # self._emit('deviceDisconnected', device)
+            self.log.warning(f'Remove device [{device}]')
+        self.devices = {}
+        return True
+
+    def isServerConnected(self):
+        """
+        Part of BASE CLIENT API of EKOS
+
+        :return: true if server connected
+        """
+
+        return self.connected
+
+    def connectDevice(self, deviceName=''):
+        """
+        Part of BASE CLIENT API of EKOS
+
+        :param deviceName: name string of INDI device
+        :return: success
+        """
+
+        # todo: do connected state for each device
+
+        if not self.connected:
+            return False
+        if not deviceName:
+            return False
+        if deviceName not in self.devices:
+            return False
+
+        con = self.devices[deviceName].getSwitch('CONNECTION')
+        if con['CONNECT'] == 'On':
+            self.log.warning(f'Device [{deviceName}] was connected at startup')
+            return False
+        else:
+            self.log.warning(f'Device [{deviceName}] unconnected - connect it now')
+
+        suc = self.sendNewSwitch(deviceName=deviceName,
+                                 propertyName='CONNECTION',
+                                 elements={'CONNECT': 'On',
+                                           'DISCONNECT': 'Off'
+                                           },
+                                 )
+        return suc
+
+    def disconnectDevice(self, deviceName=''):
+        """
+        Part of BASE CLIENT API of EKOS
+
+        :param deviceName: name string of INDI device
+        :return: success
+        """
+
+        # todo: do connected state for each device
+
+        if not self.connected:
+            return False
+        if not deviceName:
+            return False
+        if deviceName not in self.devices:
+            return False
+
+        con = self.devices[deviceName].getSwitch('CONNECTION')
+        if con['DISCONNECT'] == 'On':
+            self.log.warning(f'{deviceName} already disconnected')
+            return False
+
+        suc = self.sendNewSwitch(deviceName=deviceName,
+                                 propertyName='CONNECTION',
+                                 elements={'CONNECT': 'Off',
+                                           'DISCONNECT': 'On'
+                                           },
+                                 )
+        return suc
+
+    def getDevice(self, deviceName=''):
+        """
+        Part of BASE CLIENT API of EKOS
+        getDevice collects all the data of the given device
+
+        :param deviceName: name of device
+        :return: dict with data of that give device
+        """
+
+        value = self.devices.get(deviceName, None)
+        return value
+
+    def getDevices(self, driverInterface=0xFFFF):
+        """
+        Part of BASE CLIENT API of EKOS
+        getDevices generates a list of devices, which are from type of the given
+        driver interface type.
+
+        :param driverInterface: binary value of driver interface type
+        :return: list of knows devices of this type
+        """
+
+        deviceList = list()
+        with self.storeLock:
+            for deviceName in self.devices:
+                typeCheck = self._getDriverInterface(deviceName) & driverInterface
+                if typeCheck:
+                    deviceList.append(deviceName)
+        return deviceList
+
+    def setBlobMode(self, blobHandling='Never', deviceName='', propertyName=''):
+        """
+        Part of BASE CLIENT API of EKOS
+        setBlobMode sets the blob handling for a device or a single property of it. the
+        mode is stored in a table keyed by device and property name and replayed when
+        the device is defined again after a reconnect.
+
+        :param blobHandling: blob mode 'Never', 'Also' or 'Only'
+        :param deviceName: name string of INDI device
+        :param propertyName: name string of device property, empty for all
+        :return: true if server connected
+        """
+
+        if not deviceName:
+            return False
+        if deviceName not in self.devices:
+            return False
+
+        suc = self._sendBlobMode(blobHandling=blobHandling,
+                                 deviceName=deviceName,
+                                 propertyName=propertyName)
+        return suc
+
+    def getBlobMode(self, deviceName='', propertyName=''):
+        """
+        Part of BASE CLIENT API of EKOS
+        getBlobMode looks up the blob handling, which was set for the property. if
+        there is none, the mode set for the whole device applies and without any the
+        default of the server 'Never'.
+
+        :param deviceName: name string of INDI device
+        :param propertyName: name string of device property
+        :return: blob mode
+        """
+
+        mode = self.blobModes.get((deviceName, propertyName))
+        if mode is None:
+            mode = self.blobModes.get((deviceName, ''), 'Never')
+        return self._effectiveBlobMode(mode)
+
+    def setBlobInflate(self, status=True):
+        """
+        setBlobInflate enables the decompression of zlib compressed blobs while they
+        arrive. the decoded chunks are inflated directly, so the blob is ready as soon
+        as the closing tag of the element is received.
+
+        :param status: True for inflating blobs while receiving
+        :return: success for test purpose
+        """
+
+        self.blobInflate = status
+        return True
+
+    def setBlobStream(self, deviceName='', propertyName='', slots=8):
+        """
+        setBlobStream switches a blob property to streaming mode, which is used for
+        video streams. the received frames are written into a ring of preallocated
+        buffers instead of new buffers for each frame. the value of the blob is a view
+        of the newest frame, which is valid until the ring is turned around. consumers,
+        which could not keep up with the stream, take the newest frame from the ring
+        and older frames are counted as dropped. with slots=0 the streaming mode is
+        switched off.
+
+        :param deviceName: name string of INDI device
+        :param propertyName: name string of device property
+        :param slots: number of frames kept in the ring
+        :return: success for test purpose
+        """
+
+        if not slots:
+            return self.blobStreams.pop((deviceName, propertyName), None) is not None
+
+        self.blobStreams[(deviceName, propertyName)] = FrameRing(slots=slots, lock=self.storeLock)
+        return True
+
+    def getBlobStream(self, deviceName='', propertyName=''):
+        """
+        getBlobStream returns the frame ring of a streamed blob property.
+
+        :param deviceName: name string of INDI device
+        :param propertyName: name string of device property
+        :return: frame ring or None if not streamed
+        """
+
+        return self.blobStreams.get((deviceName, propertyName))
+
+    def setBlobStorage(self, threshold=0, directory=''):
+        """
+        setBlobStorage sets the policy for storing received blobs. blobs with a size
+        above the threshold are written to a file while they are decoded and exposed
+        as read only memory map instead of being held in memory. without a directory
+        temporary files are used, otherwise the files are kept in the directory.
+
+        :param threshold: size in bytes above blobs are spooled, 0 for never
+        :param directory: target directory for the spooled blobs
+        :return: success for test purpose
+        """
+
+        if directory and not os.path.isdir(directory):
+            self.log.warning(f'Blob directory [{directory}] does not exist')
+            return False
+
+        self.blobSpoolSize = threshold
+        self.blobSpoolDir = directory
+        return True
+
+    def getHost(self):
+        """
+        Part of BASE CLIENT API of EKOS
+
+        :return: host name as str
+        """
+
+        if self._host is None:
+            return ''
+        if len(self._host) != 2:
+            return 0
+        return self._host[0]
+
+    def getPort(self):
+        """
+        Part of BASE CLIENT API of EKOS
+
+        :return: port number as int
+        """
+
+        if self._host is None:
+            return 0
+        if len(self._host) != 2:
+            return 0
+        return self._host[1]
+
+    def sendNewText(self, deviceName='', propertyName='', elements='', text=''):
+        """
+        Part of BASE CLIENT API of EKOS
+
+        :param deviceName: name string of INDI device
+        :param propertyName: name string of device property
+        :param elements: element name or dict of element name / values
+        :param text: string in case of having only one element in elements
+        :return: success for test
+        """
+
+        if deviceName not in self.devices:
+            return False
+        if not hasattr(self.devices[deviceName], propertyName):
+            return False
+        if not isinstance(elements, dict):
+            elements = {elements: text}
+        cmd = indiXML.newTextSerializer.serialize(deviceName, propertyName, elements)
+        suc = self._sendCmd(cmd)
+        return suc
+
+    def sendNewNumber(self, deviceName='', propertyName='', elements='', number=0):
+        """
+        Part of BASE CLIENT API of EKOS
+
+        :param deviceName: name string of INDI device
+        :param propertyName: name string of device property
+        :param elements: element name or dict of element name / values
+        :param number: value in case of having only one element in elements
+        :return: success for test
+        """
+
+        if deviceName not in self.devices:
+            return False
+        if not hasattr(self.devices[deviceName], propertyName):
+            return False
+        if not isinstance(elements, dict):
+            elements = {elements: number}
+        cmd = indiXML.newNumberSerializer.serialize(deviceName, propertyName, elements)
+        suc = self._sendCmd(cmd)
+        return suc
+
+    def sendNewSwitch(self, deviceName='', propertyName='', elements=''):
+        """
+        Part of BASE CLIENT API of EKOS
+
+        :param deviceName: name string of INDI device
+        :param propertyName: name string of device property
+        :param elements: element name or dict of element name / values
+        :return: success for test
+        """
+
+        if deviceName not in self.devices:
+            return False
+        if not hasattr(self.devices[deviceName], propertyName):
+            return False
+        if not isinstance(elements, dict):
+            elements = {elements: 'On'}
+        cmd = indiXML.newSwitchSerializer.serialize(deviceName, propertyName, elements)
+        suc = self._sendCmd(cmd)
+        return suc
+
+    def requestNewText(self, deviceName='', propertyName='', elements='', text=''):
+        """
+        requestNewText sends new text values like sendNewText and gives back the handle
+        of the command, which is finished when the device acknowledges the values.
+
+        :param deviceName: name string of INDI device
+        :param propertyName: name string of device property
+        :param elements: element name or dict of element name / values
+        :param text: value in case of having only one element in elements
+        :return: handle
+        """
+
+        if not isinstance(elements, dict):
+            elements = {elements: text}
+        return self._sendCommand(self.sendNewText,
+                                 deviceName=deviceName,
+                                 propertyName=propertyName,
+                                 elements=elements)
+
+    def requestNewNumber(self, deviceName='', propertyName='', elements='', number=0):
+        """
+        requestNewNumber sends new number values like sendNewNumber and gives back the
+        handle of the command, which is finished when the device acknowledges the
+        values.
+
+        :param deviceName: name string of INDI device
+        :param propertyName: name string of device property
+        :param elements: element name or dict of element name / values
+        :param number: value in case of having only one element in elements
+        :return: handle
+        """
+
+        if not isinstance(elements, dict):
+            elements = {elements: number}
+        return self._sendCommand(self.sendNewNumber,
+                                 deviceName=deviceName,
+                                 propertyName=propertyName,
+                                 elements=elements)
+
+    def requestNewSwitch(self, deviceName='', propertyName='', elements=''):
+        """
+        requestNewSwitch sends new switch values like sendNewSwitch and gives back the
+        handle of the command, which is finished when the device acknowledges the
+        values.
+
+        :param deviceName: name string of INDI device
+        :param propertyName: name string of device property
+        :param elements: element name or dict of element name / values
+        :return: handle
+        """
+
+        if not isinstance(elements, dict):
+            elements = {elements: 'On'}
+        return self._sendCommand(self.sendNewSwitch,
+                                 deviceName=deviceName,
+                                 propertyName=propertyName,
+                                 elements=elements)
+
+    def setVerbose(self, status):
+        """
+        Part of BASE CLIENT API of EKOS
+
+        :return:
+        """
+
+        pass
+
+    @staticmethod
+    def isVerbose():
+        """
+        Part of BASE CLIENT API of EKOS
+
+        :return: status of verbose
+        """
+
+        return False
+
+    def setConnectionTimeout(self, seconds=2, microseconds=0):
+        """
+        Part of BASE CLIENT API of EKOS
+        setConnectionTimeout sets the time to wait for the connection to the server.
+        CONNECTION_TIMEOUT is kept in milliseconds.
+
+        :param seconds: seconds of the timeout
+        :param microseconds: microseconds of the timeout
+        :return: success for test purpose
+        """
+
+        self.CONNECTION_TIMEOUT = int(seconds * 1000 + microseconds / 1000)
+        return True
+
+    def receive(self, data):
+        """
+        receive parses the received data and gives back the events, which came up.
+
+        :param data: received data as bytes
+        :return: list of events
+        """
+
+        with self.storeLock:
+            self.parser.feed(data)
+        return self.takeEvents()
+
+    def takeEvents(self):
+        """
+        takeEvents gives back all events, which came up since the last call, including
+        the ones not caused by received data.
+
+        :return: list of events
+        """
+
+        events, self.pendingEvents = self.pendingEvents, []
+        return events
+
+    def dataToSend(self):
+        """
+        dataToSend gives back all commands, which were collected since the last call.
+
+        :return: data to be sent as bytes
+        """
+
+        data = bytes(self.outgoing)
+        self.outgoing.clear()
+        return data
+
+    def connectionMade(self):
+        """
+        connectionMade has to be called by the transport, when the connection to the
+        server is established. the devices, which were watched before, are watched
+        again. their blob modes follow, when the devices are defined again.
+
+        :return: success for test purpose
+        """
+
+        self.connected = True
+        self._emit('serverConnected')
+        for deviceName in list(self.watchedDevices):
+            self.watchDevice(deviceName)
+        return True
+
+    def connectionLost(self, deviceName=''):
+        """
+        connectionLost has to be called by the transport, when the connection to the
+        server is dropped. all devices are removed.
+
+        :param deviceName: name string of INDI device
+        :return: success for test purpose
+        """
+
+        with self.storeLock:
+            self.connected = False
+            self.blobConnected = False
+            self.clearParser()
+            self._emit('serverDisconnected', self.devices)
+            self.clearDevices(deviceName)
+            commands, self.commands = self.commands, dict()
+            self.lateCommands = dict()
+        for handles in commands.values():
+            for handle in handles:
+                handle._resolve('Failed')
+        return True
+
+    def _sendCmd(self, indiCommand, blobChannel=False):
+        """
+        _sendCmd collects the command for being sent. transports override it for
+        writing the command directly.
+
+        :param indiCommand: XML command to send
+        :param blobChannel: True if sent over the dedicated blob connection
+        :return: success of sending
+        """
+
+        if blobChannel or not self.connected:
+            return False
+        self.outgoing += indiCommand.toXML() + b'\n'
+        return True
+
+    def _emit(self, signal, *args):
+        """
+        _emit collects the event. transports override it for delivering the event
+        directly, the name of the event is the name of the signal in INDISignals.
+
+        :param signal: name of the event
+        :param args: arguments of the event
+        :return: nothing
+        """
+
+        self.pendingEvents.append(makeEvent(signal, *args))
+
+    def _getDriverInterface(self, deviceName):
+        """
+        _getDriverInterface look the type of the device's driver interface up and gives
+        it back as binary value.
+
+        :param deviceName: device name
+        :return: binary value of type of device drivers interface
+        """
+
+        device = self.devices[deviceName]
+        if not hasattr(device, 'DRIVER_INFO'):
+            return -1
+        val = getattr(device, 'DRIVER_INFO')
+        if val:
+            val = val['elementList'].get('DRIVER_INTERFACE', '')
+            if val:
+                interface = val['value']
+                return int(interface)
+            else:
+                return -1
+        else:
+            return -1
+
+    def _createBlobDecoder(self, deviceName='', propertyName='', attr=None):
+        """
+        _createBlobDecoder creates the decoder for a received oneBLOB element according
+        to the blob storage policy. frames of streamed properties are written into the
+        ring of the property. compressed blobs are inflated while they arrive, if
+        enabled. in this case the suffix .z is removed from the format attribute, as
+        the size attribute already is the size of the uncompressed data. it is put
+        back by the inflater, if inflating fails.
+
+        :param deviceName: device name
+        :param propertyName: property name
+        :param attr: attributes of the oneBLOB element
+        :return: blob decoder
+        """
+
+        size = blobSize(attr)
+        blobFormat = attr.get('format', '')
+        inflate = self.blobInflate and blobFormat.endswith('.z')
+        if inflate:
+            blobFormat = attr['format'] = blobFormat[:-2]
+
+        ring = self.blobStreams.get((deviceName, propertyName))
+        if ring is not None:
+            decoder = FrameDecoder(ring=ring, size=size)
+        elif not self.blobSpoolSize or size <= self.blobSpoolSize:
+            decoder = BlobDecoder(size)
+        else:
+            decoder = BlobSpool(directory=self.blobSpoolDir,
+                                suffix=blobFormat)
+
+        if inflate:
+            decoder = BlobInflater(decoder, attr=attr)
+        return decoder
+
+    def _fillElement(self, deviceName='', elementList=None, elementType='', attr=None,
+                     value=None, state=''):
+        """
+        _fillElement writes one atomic element with all its attributes into the element
+        list of a property and sends the device connection signals. if the element is
+        already present, it is updated in place, so the attributes of the definition
+        (like min, max, step, format or label) are kept.
+
+        :param deviceName: device name
+        :param elementList: element list of the property
+        :param elementType: type of the element
+        :param attr: attributes of the element
+        :param value: value of the element, None if there is no value
+        :param state: state of the vector of the element
+        :return: True for test purpose
+        """
+
+        name = attr.get('name', '')
+        element = elementList.get(name)
+        if element is None:
+            element = elementList[sys.intern(name)] = Element()
+        element.setAttributes(attr)
+        element.elementType = elementType
+
+        # as a new blob vector does not  contain an initial value, we have to separate this
+        if value is None:
+            pass
+        elif elementType in self.NUMBER_ELEMENTS:
+            element.setNumber(value)
+        else:
+            element.value = value
+
+        # send connected signals
+        if name == 'CONNECT' and value == 'On' and state == 'Ok':
+            self._emit('deviceConnected', deviceName)
+            self.log.warning(f'Device [{deviceName}] connected')
+        if name == 'DISCONNECT' and value == 'On':
+            self._emit('deviceDisconnected', deviceName)
+            self.log.warning(f'Device [{deviceName}] disconnected')
+
+        return True
+
+    def _fillAttributes(self, deviceName=None, chunk=None, elementList=None, defVector=None):
+        """
+
+        :param deviceName: device name
+        :param chunk:   xml element from INDI
+        :param elementList:
+        :param defVector:
+        :return: True for test purpose
+        """
+
+        # now running through all atomic elements
+        for elt in chunk.elt_list:
+            if isinstance(elt, indiXML.DefBLOB):
+                value = None
+            else:
+                value = elt.getValue()
+
+            self._fillElement(deviceName=deviceName,
+                              elementList=elementList,
+                              elementType=elt.etype,
+                              attr=elt.attr,
+                              value=value,
+                              state=chunk.attr.get('state', ''))
+
+        return True
+
+    @staticmethod
+    def _setupPropertyStructure(propertyType='', attr=None, device=None):
+        """
+        _setupPropertyStructure writes the attributes of a vector into the property of
+        the device. a def vector defines the property and starts with an empty element
+        list. a set vector only updates the attributes it carries (e.g. state, timestamp,
+        message) and keeps the existing element list, which is updated in place.
+
+        :param propertyType: type of the vector from INDI
+        :param attr: attributes of the vector
+        :param device:  device class
+        :return: property name, element list
+        """
+
+        iProperty = attr.get('name', '')
+        deviceProperty = getattr(device, iProperty, None)
+        if deviceProperty is None:
+            deviceProperty = Property()
+            setattr(device, iProperty, deviceProperty)
+
+        deviceProperty.propertyType = propertyType
+        deviceProperty.setAttributes(attr)
+
+        # adding subspace for atomic elements (text, switch, etc)
+        if propertyType.startswith('def'):
+            deviceProperty.elementList = {}
+        elementList = deviceProperty.elementList
+
+        return iProperty, elementList
+
+    def _emitProperty(self, deviceName='', iProperty='', propertyType=''):
+        """
+        _emitProperty sends the signals for a property, which was defined or set.
+
+        :param deviceName: device name
+        :param iProperty: property name
+        :param propertyType: type of the vector from INDI
+        :return: success
+        """
+
+        if propertyType.startswith('def'):
+            self._emit('newProperty', deviceName, iProperty)
+
+        signal = self.PROPERTY_SIGNALS.get(propertyType, '')
+        if not signal:
+            return False
+
+        self._emit(signal, deviceName, iProperty)
+        if propertyType.startswith('set'):
+            self._resolveCommand(deviceName, iProperty)
+        return True
+
+    def _commandTimeout(self, deviceName='', propertyName=''):
+        """
+        _commandTimeout looks up the timeout attribute of the property, which is the
+        worst case time in seconds the device needs for a command. if the property has
+        no timeout, COMMAND_TIMEOUT is used.
+
+        :param deviceName: name string of INDI device
+        :param propertyName: name string of device property
+        :return: timeout in seconds
+        """
+
+        iProperty = getattr(self.devices.get(deviceName), propertyName, None)
+        if iProperty is None:
+            return self.COMMAND_TIMEOUT
+        timeout = parseNumber(str(iProperty.get('timeout', '0')))
+        if not timeout > 0:
+            return self.COMMAND_TIMEOUT
+        return timeout
+
+    def _createCommand(self, deviceName='', propertyName='', timeout=0):
+        """
+        _createCommand creates the handle of a command. transports override it for
+        handles, which signal the result and apply the timeout.
+
+        :param deviceName: name string of INDI device
+        :param propertyName: name string of device property
+        :param timeout: timeout in seconds
+        :return: handle
+        """
+
+        return CommandHandle(deviceName=deviceName,
+                             propertyName=propertyName,
+                             timeout=timeout,
+                             client=self)
+
+    def _sendCommand(self, send, deviceName='', propertyName='', **kwargs):
+        """
+        _sendCommand sends a new vector and gives back the handle of the command. if
+        the vector could not be sent, the handle is finished with the state Failed.
+        several commands for the same property are finished in the order they were
+        sent.
+
+        :param send: method sending the vector
+        :param deviceName: name string of INDI device
+        :param propertyName: name string of device property
+        :param kwargs: further arguments of the sending method
+        :return: handle
+        """
+
+        timeout = self._commandTimeout(deviceName, propertyName)
+        handle = self._createCommand(deviceName=deviceName,
+                                     propertyName=propertyName,
+                                     timeout=timeout)
+        handle.values = kwargs.get('elements', {})
+        with self.storeLock:
+            if send(deviceName=deviceName, propertyName=propertyName, **kwargs):
+                self.commands.setdefault((deviceName, propertyName), []).append(handle)
+                return handle
+        handle._resolve('Failed')
+        return handle
+
+    def _dropCommand(self, handle):
+        """
+        _dropCommand removes a command, which timed out, from the pending commands of
+        its property. as the device might still acknowledge it, the command is kept as
+        late command for its timeout.
+
+        :param handle: handle of the command
+        :return: True if the command was pending
+        """
+
+        key = (handle.deviceName, handle.propertyName)
+        with self.storeLock:
+            handles = self.commands.get(key, [])
+            if handle not in handles:
+                return False
+            handles.remove(handle)
+            if not handles:
+                del self.commands[key]
+            now = time.monotonic()
+            for lateKey in list(self.lateCommands):
+                self._lateCommands(lateKey, now)
+            self.lateCommands.setdefault(key, []).append((now + handle.timeout, handle))
+        return True
+
+    def _lateCommands(self, key, now):
+        """
+        _lateCommands removes the expired late commands of a property.
+
+        :param key: tuple of device name and property name
+        :param now: monotonic time in seconds
+        :return: list of deadlines and handles of the late commands left
+        """
+
+        late = [x for x in self.lateCommands.pop(key, []) if x[0] > now]
+        if late:
+            self.lateCommands[key] = late
+        return late
+
+    def _commandDistance(self, deviceName='', propertyName='', values=None):
+        """
+        _commandDistance compares the values of a property with the values sent by a
+        command. numbers add their difference, other values add one if they differ.
+
+        :param deviceName: name string of INDI device
+        :param propertyName: name string of device property
+        :param values: dict of element name / values sent
+        :return: distance, nan if the numbers could not be compared
+        """
+
+        elementList = getattr(self.devices[deviceName], propertyName).elementList
+        distance = 0
+        for name, value in values.items():
+            element = elementList.get(name)
+            if element is None:
+                continue
+            current = element.get('value')
+            if isinstance(current, float):
+                distance += abs(current - parseNumber(str(value), element.get('format', '')))
+            else:
+                distance += str(current) != str(value)
+        return distance
+
+    def _resolveCommand(self, deviceName='', propertyName=''):
+        """
+        _resolveCommand finishes the oldest pending command of the property, if it was
+        set with the state Ok or Alert. the acknowledgement is taken for the oldest late
+        command instead, if there is no pending command or if the values of the
+        property are strictly closer to the values of the late command than to the
+        values of the pending command. so a late acknowledgement does not finish a
+        newer command and a late command takes one acknowledgement at most. commands,
+        which are finished already, are skipped.
+
+        :param deviceName: name string of INDI device
+        :param propertyName: name string of device property
+        :return: True if a command was finished
+        """
+
+        key = (deviceName, propertyName)
+        handles = self.commands.get(key, [])
+        while handles and handles[0].done():
+            handles.pop(0)
+        if not handles:
+            self.commands.pop(key, None)
+        late = self._lateCommands(key, time.monotonic())
+        if not handles and not late:
+            return False
+        state = getattr(self.devices[deviceName], propertyName).get('state', '')
+        if state not in self.COMMAND_STATES:
+            return False
+
+        if late:
+            lateDistance = self._commandDistance(deviceName, propertyName, late[0][1].values)
+            if not handles or lateDistance < self._commandDistance(deviceName,
+                                                                   propertyName,
+                                                                   handles[0].values):
+                del late[0]
+                if not late:
+                    del self.lateCommands[key]
+                return False
+
+        handles.pop(0)._resolve(state)
+        if not handles:
+            del self.commands[key]
+        return True
+
+    def _getDeviceReference(self, deviceName=''):
+        """
+        _getDeviceReference looks device presence in INDi base class up. if not present,
+        a new device will be generated
+
+        :param deviceName: device name
+        :return: device and device name
+        """
+
+        if deviceName not in self.devices:
+            self.devices[deviceName] = Device(deviceName, lock=self.storeLock)
+            self._emit('newDevice', deviceName)
+            self.log.warning(f'New device [{deviceName}]')
+            self._watchBlobDevice(deviceName)
+            self._replayBlobModes(deviceName)
+
+        device = self.devices[deviceName]
+        return device, deviceName
+
+    def _delProperty(self, attr=None, device=None, deviceName=None):
+        """
+        _delProperty removes property from device class
+
+        :param attr: attributes of the xml element from INDI
+        :param device:  device class
+        :param deviceName: device name
+        :return: success
+        """
+
+        if deviceName not in self.devices:
+            return False
+        if 'name' not in attr:
+            return False
+        iProperty = attr['name']
+        if hasattr(device, iProperty):
+            delattr(device, iProperty)
+            self._emit('removeProperty', deviceName, iProperty)
+            self.log.warning(f'Device [{deviceName}] del property [{iProperty}]')
+        return True
+
+    def _setProperty(self, chunk=None, device=None, deviceName=None):
+        """
+        _sefProperty generate and write all data to device class for SefVector chunks
+
+        :param chunk:   xml element from INDI
+        :param device:  device class
+        :param deviceName: device name
+        :return: success
+        """
+
+        iProperty, elementList = self._setupPropertyStructure(propertyType=chunk.etype,
+                                                              attr=chunk.attr,
+                                                              device=device)
+
+        self._fillAttributes(deviceName=deviceName,
+                             chunk=chunk,
+                             elementList=elementList,
+                             defVector=False)
+
+        self._emitProperty(deviceName=deviceName,
+                           iProperty=iProperty,
+                           propertyType=chunk.etype)
+        return True
+
+    def _defProperty(self, chunk=None, device=None, deviceName=None):
+        """
+        _defProperty generate and write all data to device class for DefVector chunks
+
+        :param chunk:   xml element from INDI
+        :param device:  device class
+        :param deviceName: device name
+        :return: success
+        """
+
+        iProperty, elementList = self._setupPropertyStructure(propertyType=chunk.etype,
+                                                              attr=chunk.attr,
+                                                              device=device)
+
+        self._fillAttributes(deviceName=deviceName,
+                             chunk=chunk,
+                             elementList=elementList,
+                             defVector=True)
+
+        self._emitProperty(deviceName=deviceName,
+                           iProperty=iProperty,
+                           propertyType=chunk.etype)
+        return True
+
+    def _getProperty(self, attr=None, device=None, deviceName=None):
+        """
+
+        :param attr: attributes of the xml element from INDI
+        :param device:  device class
+        :param deviceName: device name
+        :return: success
+        """
+
+        # todo: there is actually no implementation for this type. check if it is relevant
+        # get property is for snooping other devices
+        pass
+
+    def _message(self, attr=None, deviceName=None):
+        """
+
+        :param attr: attributes of the xml element from INDI
+        :param deviceName: device name
+        :return: success
+        """
+
+        message = attr.get('message', '-')
+        self._emit('newMessage', deviceName, message)
+        return True
+
+    def _parseHeader(self, etype='', attr=None):
+        """
+        _parseHeader checks the attributes of a top level indi element and looks the
+        device up. the commands, which do not carry any elements (message, delProperty
+        and getProperties) are handled completely.
+
+        :param etype: type of the xml element from INDI
+        :param attr: attributes of the xml element from INDI
+        :return: success, device if the elements of the command have to be parsed
+        """
+
+        if not self.connected:
+            return False, None
+
+        if 'device' not in attr:
+            self.log.error(f'No device in chunk: {etype} {attr}')
+            return False, None
+
+        device, deviceName = self._getDeviceReference(deviceName=attr['device'])
+
+        # all message have no device names, they could be general
+        if etype == 'message':
+            self._message(attr=attr, deviceName=deviceName)
+            return True, None
+
+        if 'name' not in attr:
+            self.log.error(f'No property in chunk: {etype} {attr}')
+            return False, None
+
+        if etype == 'delProperty':
+            self._delProperty(attr=attr, device=device, deviceName=deviceName)
+            return True, None
+
+        if etype == 'getProperties':
+            self._getProperty(attr=attr, device=device, deviceName=deviceName)
+            return True, None
+
+        return True, device
+
+    def _parseCmd(self, chunk):
+        """
+        _parseCmd parses the incoming indi XL data and builds up a dictionary of devices
+        in device class which holds all the data transferred through INDI protocol.
+
+        :param chunk: raw indi XML element
+        :return: success if it could be parsed
+        """
+        self.log.debug(f'RecvCmd: [{chunk}]')
+
+        suc, device = self._parseHeader(etype=chunk.etype, attr=chunk.attr)
+        if device is None:
+            return suc
+
+        deviceName = device.name
+
+        if isinstance(chunk, (indiXML.SetBLOBVector,
+                              indiXML.SetSwitchVector,
+                              indiXML.SetTextVector,
+                              indiXML.SetLightVector,
+                              indiXML.SetNumberVector,
+                              )
+                      ):
+            self._setProperty(chunk=chunk, device=device, deviceName=deviceName)
+            return True
+
+        if isinstance(chunk, (indiXML.DefBLOBVector,
+                              indiXML.DefSwitchVector,
+                              indiXML.DefTextVector,
+                              indiXML.DefLightVector,
+                              indiXML.DefNumberVector,
+                              )
+                      ):
+            self._defProperty(chunk=chunk, device=device, deviceName=deviceName)
+            return True
+
+        if isinstance(chunk, (indiXML.NewBLOBVector,
+                              indiXML.NewSwitchVector,
+                              indiXML.NewTextVector,
+                              indiXML.NewNumberVector,
+                              )
+                      ):
+            # todo: what to do with the "New" vector ?
+            return True
+
+        if isinstance(chunk, (indiXML.OneBLOB,
+                              indiXML.OneSwitch,
+                              indiXML.OneText,
+                              indiXML.OneNumber,
+                              )
+                      ):
+            # todo: what to do with the "One" vector ?
+            return True
+
+        self.log.error('Unknown vectors: {0}'.format(chunk))
+        return False
@@ -0,0 +1,377 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+#       #   #  #   #   #    #
+#      ##  ##  #  ##  #    #
+#     # # # #  # # # #    #  #
+#    #  ##  #  ##  ##    ######
+#   #   #   #  #   #       #
+#
+# Python-based Tool for interaction with the 10micron mounts
+# GUI with PyQT5 for python
+# Python  v3.7.4
+
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import logging
+import re
+import sys
+import threading
+# external packages
+# local import
+from indibase.loggerMW import CustomLogger
+
+
+def parseSexagesimal(text):
+    """
+    parseSexagesimal converts a sexagesimal value like '12:34:56.7', '-0 30 00' or
+    '12:30' into a float. any characters, which are not part of a number, separate the
+    parts. a value with a single part is a plain decimal number.
+
+    :param text: value as string
+    :return: value as float
+    """
+
+    text = text.strip()
+    sign = -1 if text.startswith('-') else 1
+    parts = [part for part in re.split(r'[^0-9.]+', text) if part]
+    if not parts:
+        raise ValueError(f'{text} is not a sexagesimal value')
+
+    value = 0
+    for i, part in enumerate(parts[:3]):
+        value += float(part) / 60 ** i
+    return sign * value
+
+
+def parseNumber(text, numberFormat=''):
+    """
+    parseNumber converts the text of a number element into a float. the format of the
+    number definition is used to select the parser, formats like '%10.6m' announce
+    sexagesimal values. decimal values are parsed as sexagesimal if needed, as drivers
+    are allowed to send both variants.
+
+    :param text: value as string
+    :param numberFormat: print() style format of the number definition
+    :return: value as float, nan if the text is not a number
+    """
+
+    if not numberFormat.endswith('m'):
+        try:
+            return float(text)
+        except ValueError:
+            pass
+    try:
+        return parseSexagesimal(text)
+    except ValueError:
+        return float('nan')
+
+
+class StoreObject(object):
+    """
+    StoreObject is the base class for the objects in the device store. the values are
+    kept in slots to save memory. for compatibility the slots could be accessed like
+    the keys of a dict as well, unset slots behave like missing keys.
+    """
+
+    __all__ = ['StoreObject',
+               'get',
+               'keys',
+               'items',
+               'setAttributes',
+               ]
+
+    __slots__ = ()
+
+    # attributes, which are different for each message and not worth interning
+    NOT_INTERNED = ('timestamp', 'message')
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.__slots__ and hasattr(self, key)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.items() == other.items()
+
+    def __repr__(self):
+        return f'{type(self).__name__}({dict(self.items())})'
+
+    def get(self, key, default=None):
+        if key not in self.__slots__:
+            return default
+        return getattr(self, key, default)
+
+    def keys(self):
+        return [key for key in self.__slots__ if hasattr(self, key)]
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.keys()]
+
+    def setAttributes(self, attr):
+        """
+        setAttributes stores the xml attributes of an INDI element in the slots. repeated
+        names and values are interned, attributes unknown to the store are skipped.
+
+        :param attr: dict of xml attributes
+        :return: nothing
+        """
+
+        for key in attr:
+            if key not in self.__slots__:
+                continue
+            value = attr[key]
+            if key not in self.NOT_INTERNED:
+                value = sys.intern(value)
+            setattr(self, key, value)
+
+
+class Element(StoreObject):
+    """
+    Element holds one atomic element (text, number, switch, light or blob) of a property
+    vector with it's value and the attributes of the definition. number values are
+    stored as float, the received text is kept in text.
+
+        >>> element = Element()
+
+    """
+
+    __all__ = ['Element',
+               ]
+
+    __slots__ = ('name',
+                 'elementType',
+                 'value',
+                 'text',
+                 'label',
+                 'format',
+                 'min',
+                 'max',
+                 'step',
+                 'size',
+                 )
+
+    def setNumber(self, text):
+        """
+        setNumber converts the text of a number element once with the format of it's
+        definition and keeps the text as well.
+
+        :param text: value as string
+        :return: nothing
+        """
+
+        self.text = text
+        self.value = parseNumber(text, getattr(self, 'format', ''))
+
+
+class Property(StoreObject):
+    """
+    Property holds one property vector of a device with the attributes of the vector and
+    the dict of it's elements.
+
+        >>> iProperty = Property()
+
+    """
+
+    __all__ = ['Property',
+               ]
+
+    __slots__ = ('name',
+                 'device',
+                 'propertyType',
+                 'label',
+                 'group',
+                 'state',
+                 'perm',
+                 'rule',
+                 'timeout',
+                 'timestamp',
+                 'message',
+                 'elementList',
+                 )
+
+    def __init__(self):
+        self.elementList = {}
+
+
+class Device(object):
+    """
+    Device implements an INDI Device. there might be not all capabilities implemented
+    right now. all the properties are stored as attributes of the device, each of them
+    as Property object with it's elements in the elementList. the getters look the
+    property up and read the elements while holding the lock of the device store, as
+    the receive engine might write them in another thread.
+
+        >>> indiDevice = Device(
+        >>>                     name='',
+        >>>                     lock=None,
+        >>>                     )
+
+    """
+
+    __all__ = ['Device',
+               'version',
+               'getNumber',
+               'getText',
+               'getSwitch',
+               'getLight',
+               'getBlob',
+               ]
+
+    logger = logging.getLogger(__name__)
+    log = CustomLogger(logger, {})
+
+    def __init__(self,
+                 name='',
+                 lock=None,
+                 ):
+        super().__init__()
+
+        self.name = sys.intern(name)
+        self.lock = lock if lock is not None else threading.RLock()
+        self.connected = False
+
+    def getNumber(self, propertyName):
+        """
+        getNumber extracts from the device dictionary the relevant property subset for
+        number or list of number elements. the return dict could be used later on for
+        setting an element list (number vector) in indi client. the values are floats,
+        which were converted once when received.
+
+        :param propertyName: string with name
+        :return: dict with number / number vector
+        """
+
+        with self.lock:
+            if not hasattr(self, propertyName):
+                return {}
+            iProperty = getattr(self, propertyName)
+            if iProperty['propertyType'] not in ['defNumberVector',
+                                                 'setNumberVector']:
+                self.log.error('Property: {0} is not Number'.format(iProperty['propertyType']))
+                return
+            elementList = iProperty['elementList']
+            retDict = {}
+            for prop in elementList:
+                retDict[prop] = elementList[prop]['value']
+        # self.log.info(f'Get number [{self.name}]: {retDict}')
+        return retDict
+
+    def getText(self, propertyName):
+        """
+        getNumber extracts from the device dictionary the relevant property subset for
+        text or list of text elements. the return dict could be used later on for
+        setting an element list (text vector) in indi client.
+
+        :param propertyName: string with name
+        :return: dict with text or text vector
+        """
+
+        with self.lock:
+            if not hasattr(self, propertyName):
+                return {}
+            iProperty = getattr(self, propertyName)
+            if iProperty['propertyType'] not in ['defTextVector',
+                                                 'setTextVector']:
+                self.log.error('Property: {0} is not Text'.format(iProperty['propertyType']))
+                return
+            elementList = iProperty['elementList']
+            retDict = {}
+            for prop in elementList:
+                retDict[prop] = elementList[prop]['value']
+        # self.log.info(f'Get text   [{self.name}]: {retDict}')
+        return retDict
+
+    def getSwitch(self, propertyName):
+        """
+        getSwitch extracts from the device dictionary the relevant property subset for
+        switch or list of switch elements. the return dict could be used later on for
+        setting an element list (switch vector) in indi client.
+
+        :param propertyName: string with name
+        :return: dict with switch or switch vector
+        """
+
+        with self.lock:
+            if not hasattr(self, propertyName):
+                return {}
+            iProperty = getattr(self, propertyName)
+            if iProperty['propertyType'] not in ['defSwitchVector',
+                                                 'setSwitchVector']:
+                self.log.error('Property: {0} is not Switch'.format(iProperty['propertyType']))
+                return
+            elementList = iProperty['elementList']
+            retDict = {}
+            for prop in elementList:
+                retDict[prop] = elementList[prop]['value']
+        # self.log.info(f'Get switch [{self.name}]: {retDict}')
+        return retDict
+
+    def getLight(self, propertyName):
+        """
+        getLight extracts from the device dictionary the relevant property subset for
+        light or list of light elements. the return dict could be used later on for
+        setting an element list (light vector) in indi client.
+
+        :param propertyName: string with name
+        :return: dict with light or light vector
+        """
+
+        with self.lock:
+            if not hasattr(self, propertyName):
+                return {}
+            iProperty = getattr(self, propertyName)
+            if iProperty['propertyType'] not in ['defLightVector',
+                                                 'setLightVector']:
+                self.log.error('Property: {0} is not Light'.format(iProperty['propertyType']))
+                return
+            elementList = iProperty['elementList']
+            retDict = {}
+            for prop in elementList:
+                retDict[prop] = elementList[prop]['value']
+        # self.log.info(f'Get light  [{self.name}]: {retDict}')
+        return retDict
+
+    def getBlob(self, propertyName):
+        """
+        getBlob extracts from the device dictionary the relevant property value for
+        blob.
+
+        :param propertyName: string with name
+        :return: return blob
+        """
+
+        # blob return different, because it's binary data
+        with self.lock:
+            if not hasattr(self, propertyName):
+                return {}
+            iProperty = getattr(self, propertyName)
+            if iProperty['propertyType'] not in ['defBLOBVector',
+                                                 'setBLOBVector']:
+                self.log.error('Property: {0} is not Blob'.format(iProperty['propertyType']))
+                return
+            elementList = iProperty['elementList']
+            # self.log.info(f'Get blob   [{self.name}]')
+            return elementList[propertyName]
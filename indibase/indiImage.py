@@ -0,0 +1,156 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+#       #   #  #   #   #    #
+#      ##  ##  #  ##  #    #
+#     # # # #  # # # #    #  #
+#    #  ##  #  ##  ##    ######
+#   #   #   #  #   #       #
+#
+# Python-based Tool for interaction with the 10micron mounts
+# GUI with PyQT5 for python
+# Python  v3.7.4
+
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import logging
+# external packages
+import numpy as np
+# local import
+from indibase.loggerMW import CustomLogger
+
+logger = logging.getLogger(__name__)
+log = CustomLogger(logger, {})
+
+# fits files are organized in blocks of 36 cards with 80 characters
+FITS_BLOCK = 2880
+FITS_CARD = 80
+
+# data types of fits images, which are always stored big endian
+FITS_DTYPES = {8: np.dtype('u1'),
+               16: np.dtype('>i2'),
+               32: np.dtype('>i4'),
+               64: np.dtype('>i8'),
+               -32: np.dtype('>f4'),
+               -64: np.dtype('>f8'),
+               }
+
+
+def parseFitsValue(text):
+    """
+    parseFitsValue converts the value field of a fits header card. strings are
+    enclosed in quotes, logical values are T or F, everything else is a number.
+
+    :param text: value field of the card including the comment
+    :return: value
+    """
+
+    text = text.strip()
+    if text.startswith("'"):
+        value = ''
+        rest = text[1:]
+        while "'" in rest:
+            part, rest = rest.split("'", 1)
+            value += part
+            if not rest.startswith("'"):
+                break
+            value += "'"
+            rest = rest[1:]
+        return value.rstrip()
+
+    text = text.split('/', 1)[0].strip()
+    if text == 'T':
+        return True
+    if text == 'F':
+        return False
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text.replace('D', 'E'))
+    except ValueError:
+        return text
+
+
+def readFitsHeader(buffer):
+    """
+    readFitsHeader parses the primary header of a fits file in the given buffer. only
+    cards with values are stored, comment and history cards are skipped.
+
+    :param buffer: bytes like object with fits data
+    :return: header as dict and offset of the image data, None if not fits
+    """
+
+    view = memoryview(buffer).cast('B')
+    if bytes(view[:9]) != b'SIMPLE  =':
+        log.warning('Buffer does not start with a fits header')
+        return {}, None
+
+    header = {}
+    for start in range(0, len(view) - FITS_CARD + 1, FITS_CARD):
+        card = bytes(view[start:start + FITS_CARD]).decode('ascii', 'replace')
+        keyword = card[:8].rstrip()
+        if keyword == 'END':
+            end = start + FITS_CARD
+            return header, end + (-end % FITS_BLOCK)
+        if card[8:10] == '= ':
+            header[keyword] = parseFitsValue(card[10:])
+
+    log.warning('Fits header without END card')
+    return header, None
+
+
+def fitsToArray(buffer, scale=False):
+    """
+    fitsToArray returns the image of the primary hdu of a fits file as numpy array. the
+    array is a view on the given buffer without copying the data, so it has the byte
+    order of the fits file and is read only for read only buffers. BZERO and BSCALE
+    are part of the header. if the physical values are needed, scale creates a new
+    array with the scaling applied. the common unsigned 16 bit images come out as uint16
+    in this case.
+
+    :param buffer: bytes like object with fits data
+    :param scale: True for returning the physical values
+    :return: image as numpy array or None and the header as dict
+    """
+
+    header, offset = readFitsHeader(buffer)
+    if offset is None:
+        return None, header
+
+    dtype = FITS_DTYPES.get(header.get('BITPIX'))
+    if dtype is None:
+        log.warning(f'Fits BITPIX [{header.get("BITPIX")}] not supported')
+        return None, header
+
+    naxis = header.get('NAXIS', 0)
+    shape = tuple(header.get(f'NAXIS{i}', 0) for i in range(naxis, 0, -1))
+    count = int(np.prod(shape)) if shape else 0
+    if not count:
+        return np.empty(shape or (0,), dtype=dtype), header
+    if offset + count * dtype.itemsize > memoryview(buffer).nbytes:
+        log.warning('Fits data is shorter than given in header')
+        return None, header
+
+    image = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+    image = image.reshape(shape)
+    if not scale:
+        return image, header
+
+    bzero = header.get('BZERO', 0)
+    bscale = header.get('BSCALE', 1)
+    if bzero == 0 and bscale == 1:
+        return image, header
+    if dtype.kind == 'i' and bscale == 1 and bzero == 2 ** (dtype.itemsize * 8 - 1):
+        # flipping the sign bit is the same as adding bzero for unsigned integers
+        unsigned = np.dtype(f'>u{dtype.itemsize}')
+        return image.view(unsigned) ^ unsigned.type(bzero), header
+
+    return image * bscale + bzero, header
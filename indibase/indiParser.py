@@ -0,0 +1,386 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+#       #   #  #   #   #    #
+#      ##  ##  #  ##  #    #
+#     # # # #  # # # #    #  #
+#    #  ##  #  ##  ##    ######
+#   #   #   #  #   #       #
+#
+# Python-based Tool for interaction with the 10micron mounts
+# GUI with PyQT5 for python
+# Python  v3.7.4
+
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import logging
+import xml.etree.ElementTree as ETree
+# external packages
+# local import
+from indibase.loggerMW import CustomLogger
+from indibase import indiXML
+
+# all vectors, which define or set a property in the device store
+PROPERTY_VECTORS = ['defTextVector',
+                    'defNumberVector',
+                    'defSwitchVector',
+                    'defLightVector',
+                    'defBLOBVector',
+                    'setTextVector',
+                    'setNumberVector',
+                    'setSwitchVector',
+                    'setLightVector',
+                    'setBLOBVector',
+                    ]
+
+
+class ETreeParser(object):
+    """
+    ETreeParser is the receive engine, which builds an ElementTree element for every
+    top level indi element. the element is converted into the INDIBase objects of
+    indiXML and handed over to the client for parsing the command. the base64 text of
+    oneBLOB elements is split off the xml stream and decoded while streaming.
+
+        >>> parser = ETreeParser(
+        >>>                      client=client,
+        >>>                      )
+
+    """
+
+    __all__ = ['ETreeParser',
+               'feed',
+               ]
+
+    logger = logging.getLogger(__name__)
+    log = CustomLogger(logger, {})
+
+    def __init__(self,
+                 client=None,
+                 ):
+
+        self.client = client
+        self.root = None
+        self.depth = 0
+        self.vectorAttr = {}
+        self.pendingData = b''
+        self.blobDecoder = None
+        self.blobBuffers = []
+
+        # XML parser, which is fed with a synthetic root element. all received top
+        # level elements become children of this root and are detached from it after
+        # being parsed, so the parser does not grow over time.
+        self.parser = ETree.XMLPullParser(['start', 'end'])
+        self.parser.feed('<root>')
+        # clear the event queue of parser and keep the root element
+        for _, elem in self.parser.read_events():
+            self.root = elem
+
+    def _attachBlobs(self, chunk):
+        """
+        _attachBlobs puts the already decoded buffers of the streamed oneBLOB elements
+        into the parsed chunk in the order of their arrival.
+
+        :param chunk:   xml element from INDI
+        :return: success for test purpose
+        """
+
+        if isinstance(chunk, (indiXML.SetBLOBVector,
+                              indiXML.NewBLOBVector,
+                              )
+                      ):
+            for elt in chunk.elt_list:
+                if isinstance(elt, indiXML.OneBLOB) and self.blobBuffers:
+                    elt.setValue(self.blobBuffers.pop(0))
+
+        self.blobBuffers = []
+        return True
+
+    def _handleBlobEvent(self, event, elem):
+        """
+        _handleBlobEvent starts a new blob decoder when a oneBLOB element begins. the
+        decoder buffer is preallocated from the size attribute of the element. if the
+        element ends and the decoder is still running, it will be closed.
+
+        :param event: parser event
+        :param elem: xml element of the event
+        :return: success for test purpose
+        """
+
+        if event == 'start':
+            self.blobDecoder = self.client._createBlobDecoder(
+                deviceName=self.vectorAttr.get('device', ''),
+                propertyName=self.vectorAttr.get('name', ''),
+                attr=elem.attrib)
+        elif self.blobDecoder is not None:
+            self._closeBlobDecoder()
+
+        return True
+
+    def _closeBlobDecoder(self):
+        """
+        _closeBlobDecoder finishes the running blob decoder and stores the decoded
+        buffer for attaching it to the parsed chunk.
+
+        :return: success for test purpose
+        """
+
+        self.blobBuffers.append(self.blobDecoder.finish())
+        self.blobDecoder = None
+        return True
+
+    def _feedXML(self, data):
+        """
+        _feedXML feeds the data to the xml parser and parses all top level elements,
+        which are complete.
+
+        :param data: xml data as bytes
+        :return: success for test purpose
+        """
+
+        self.parser.feed(data)
+        for event, elem in self.parser.read_events():
+            if elem.tag == 'oneBLOB':
+                self._handleBlobEvent(event, elem)
+            if event == 'start':
+                self.depth += 1
+                if self.depth == 1:
+                    self.vectorAttr = elem.attrib
+            elif event == 'end':
+                self.depth -= 1
+            else:
+                self.log.critical('Problem parsing event: {0}'.format(event))
+            if self.depth > 0:
+                continue
+            elemParsed = indiXML.parseETree(elem)
+            self.root.remove(elem)
+            elem.clear()
+            self._attachBlobs(elemParsed)
+            self.client._parseCmd(elemParsed)
+
+        return True
+
+    def _feedBlob(self, data):
+        """
+        _feedBlob feeds the base64 text of a oneBLOB element to the blob decoder. as
+        base64 does not contain '<', the next tag ends the text of the element.
+
+        :param data: received data as bytes
+        :return: data after the text of the oneBLOB element
+        """
+
+        end = data.find(b'<')
+        if end == -1:
+            self.blobDecoder.feed(data)
+            return b''
+
+        self.blobDecoder.feed(data[:end])
+        self._closeBlobDecoder()
+        return data[end:]
+
+    @staticmethod
+    def _splitPartialTag(data):
+        """
+        _splitPartialTag separates an incomplete oneBLOB tag at the end of the data, so
+        it could be checked again with the next data received.
+
+        :param data: received data as bytes
+        :return: data to be parsed, data to be kept
+        """
+
+        start = data.rfind(b'<')
+        if start == -1:
+            return data, b''
+        if not b'<oneBLOB'.startswith(data[start:]):
+            return data, b''
+        return data[:start], data[start:]
+
+    def feed(self, data):
+        """
+        feed separates the base64 text of oneBLOB elements from the xml stream. the text
+        is decoded chunk by chunk while it arrives and never reaches the xml parser, all
+        other data is fed to the xml parser.
+
+        :param data: received data as bytes
+        :return: success for test purpose
+        """
+
+        data = self.pendingData + data
+        self.pendingData = b''
+
+        while data:
+            if self.blobDecoder is not None:
+                data = self._feedBlob(data)
+                continue
+
+            start = data.find(b'<oneBLOB')
+            if start == -1:
+                data, self.pendingData = self._splitPartialTag(data)
+                self._feedXML(data)
+                break
+
+            end = data.find(b'>', start)
+            if end == -1:
+                self._feedXML(data[:start])
+                self.pendingData = data[start:]
+                break
+
+            self._feedXML(data[:end + 1])
+            data = data[end + 1:]
+
+        return True
+
+
+class DirectParser(object):
+    """
+    DirectParser is the receive engine, which works directly on the events of the
+    expat parser. the values of the elements are written into the device store of the
+    client as soon as an element is closed, without building an ElementTree or the
+    INDIBase objects of indiXML in between. the base64 text of oneBLOB elements is
+    decoded while streaming.
+
+        >>> parser = DirectParser(
+        >>>                       client=client,
+        >>>                       )
+
+    """
+
+    __all__ = ['DirectParser',
+               'feed',
+               ]
+
+    logger = logging.getLogger(__name__)
+    log = CustomLogger(logger, {})
+
+    def __init__(self,
+                 client=None,
+                 ):
+
+        self.client = client
+        self.depth = 0
+        self.device = None
+        self.vectorType = ''
+        self.vectorAttr = None
+        self.elementList = None
+        self.elementAttr = None
+        self.text = []
+        self.blobDecoder = None
+
+        # expat is only needed by this engine, so it is imported on first use
+        import xml.parsers.expat
+
+        self.parser = xml.parsers.expat.ParserCreate()
+        self.parser.buffer_text = False
+        self.parser.StartElementHandler = self._startElement
+        self.parser.EndElementHandler = self._endElement
+        self.parser.CharacterDataHandler = self._characterData
+        self.parser.Parse(b'<root>', False)
+
+    def _startVector(self, tag, attr):
+        """
+        _startVector checks the top level element, handles the commands without any
+        elements and prepares the property in the device store for the coming elements.
+
+        :param tag: element type
+        :param attr: attributes of the element
+        :return: success for test purpose
+        """
+
+        _, device = self.client._parseHeader(etype=tag, attr=attr)
+        if device is None or tag not in PROPERTY_VECTORS:
+            return False
+
+        self.device = device
+        self.vectorType = tag
+        self.vectorAttr = attr
+        _, self.elementList = self.client._setupPropertyStructure(propertyType=tag,
+                                                                  attr=attr,
+                                                                  device=device)
+        return True
+
+    def _startElement(self, tag, attr):
+        """
+        _startElement is the expat handler for the start of an element.
+
+        :param tag: element type
+        :param attr: attributes of the element
+        :return: nothing
+        """
+
+        self.depth += 1
+        if self.depth == 2:
+            self._startVector(tag, attr)
+        elif self.depth == 3 and self.elementList is not None:
+            self.elementAttr = attr
+            self.text = []
+            if tag == 'oneBLOB':
+                self.blobDecoder = self.client._createBlobDecoder(
+                    deviceName=self.device.name,
+                    propertyName=self.vectorAttr['name'],
+                    attr=attr)
+
+    def _characterData(self, data):
+        """
+        _characterData is the expat handler for the text of an element.
+
+        :param data: text
+        :return: nothing
+        """
+
+        if self.elementAttr is None:
+            return
+        if self.blobDecoder is not None:
+            self.blobDecoder.feed(data.encode())
+        else:
+            self.text.append(data)
+
+    def _endElement(self, tag):
+        """
+        _endElement is the expat handler for the end of an element. elements are
+        written into the device store, vectors send the signals of the client.
+
+        :param tag: element type
+        :return: nothing
+        """
+
+        self.depth -= 1
+        if self.depth == 2 and self.elementAttr is not None:
+            if tag == 'defBLOB':
+                value = None
+            elif self.blobDecoder is not None:
+                value = self.blobDecoder.finish()
+                self.blobDecoder = None
+            else:
+                value = ''.join(self.text).strip()
+            self.client._fillElement(deviceName=self.device.name,
+                                     elementList=self.elementList,
+                                     elementType=tag,
+                                     attr=self.elementAttr,
+                                     value=value,
+                                     state=self.vectorAttr.get('state', ''))
+            self.elementAttr = None
+            self.text = []
+
+        elif self.depth == 1 and self.elementList is not None:
+            self.client._emitProperty(deviceName=self.device.name,
+                                      iProperty=self.vectorAttr['name'],
+                                      propertyType=self.vectorType)
+            self.device = None
+            self.vectorAttr = None
+            self.elementList = None
+
+    def feed(self, data):
+        """
+        feed parses the received data.
+
+        :param data: received data as bytes
+        :return: success for test purpose
+        """
+
+        self.parser.Parse(data, False)
+        return True
@@ -36,8 +36,9 @@
 # standard libraries
 import logging
 import base64
+import operator
 import numbers
-import logging
+import types
 # external packages
 import xml.etree.ElementTree as ETree
 # local imports
@@ -735,57 +736,101 @@ indi_spec = {
 }
 
 
+class CompiledSpec(tuple):
+    """
+    The frozen lookup tables of an INDI type. This is a namedtuple written out, as
+    creating a namedtuple costs more import time than compiling a type.
+    """
+    __slots__ = ()
+    fields = ("cls", "xml", "docs", "arg", "attributes", "required", "xml_names")
+
+    def __new__(spec_type, **kwargs):
+        return tuple.__new__(spec_type, [kwargs[name] for name in spec_type.fields])
+
+
+for index, name in enumerate(CompiledSpec.fields):
+    setattr(CompiledSpec, name, property(operator.itemgetter(index)))
+del index, name
+
+
+def compileSpec(indi_type, type_spec):
+    """
+    Compiles the specification of an INDI type into frozen lookup tables. The
+    attributes are kept in the order of the specification as tuples of (name,
+    xml name, validator), as this order defines the order in the XML output.
+    """
+    attributes = tuple((attr[0], attr[1] or attr[0], attr[3])
+                       for attr in type_spec.get("attributes", []))
+    required = frozenset(attr[0] for attr in type_spec.get("attributes", []) if attr[2])
+    xml_names = types.MappingProxyType({attr[0]: attr[1] for attr in attributes})
+
+    return CompiledSpec(cls=type_spec["class"],
+                        xml=type_spec.get("xml", indi_type),
+                        docs=type_spec.get("docs", ""),
+                        arg=type_spec.get("arg"),
+                        attributes=attributes,
+                        required=required,
+                        xml_names=xml_names)
+
+
+class CompiledSpecs(dict):
+    """
+    Keeps the compiled specifications. An INDI type is compiled on first use, so
+    importing the module does not compile the whole specification.
+    """
+
+    def __missing__(self, indi_type):
+        if indi_type not in indi_spec:
+            raise KeyError(indi_type)
+        type_spec = self[indi_type] = compileSpec(indi_type, indi_spec[indi_type])
+        return type_spec
+
+
+indi_compiled = CompiledSpecs()
+
+
 def makeINDIFn(indi_type):
     """
     Returns an INDI function of the requested type.
     """
-    global indi_spec
 
     # Check that the requested type exists.
     if indi_type not in indi_spec:
         raise IndiXMLException(indi_type + " is not a valid INDI XML command type.")
 
-    type_spec = indi_spec[indi_type]
-
-    # Use indi_type as the XML element type, unless otherwise specified.
-    if "xml" not in type_spec:
-        type_spec["xml"] = indi_type
+    type_spec = indi_compiled[indi_type]
 
     # Function to make the object.
     def makeObject(fn_arg, fn_attr):
-
-        # Check attributes against those in the specification.
-        all_attr = []
-        final_attr = {}
-        for attr in type_spec["attributes"]:
-            attr_name = attr[0]
-            all_attr.append(attr_name)
-
-            # Check if required.
-            if attr[2] and attr_name not in fn_attr:
-                raise IndiXMLException(attr_name + " is a required attribute.")
-
-            # Check if valid.
-            if attr_name in fn_attr:
-                if attr[1] is None:
-                    attr[1] = attr[0]
-                final_attr[attr[1]] = attr[3](fn_attr[attr_name])
+        if fn_attr is None:
+            fn_attr = {}
 
         # Check that there are no extra attributes.
         for attr in fn_attr:
-            if attr not in all_attr:
+            if attr not in type_spec.xml_names:
                 raise IndiXMLException(attr + " is not an attribute of " + indi_type + ".")
 
+        # Check if required.
+        for attr in type_spec.required:
+            if attr not in fn_attr:
+                raise IndiXMLException(attr + " is a required attribute.")
+
+        # Check if valid, the order of the specification is kept.
+        final_attr = {}
+        for attr_name, xml_name, validator in type_spec.attributes:
+            if attr_name in fn_attr:
+                final_attr[xml_name] = validator(fn_attr[attr_name])
+
         # Make an INDI object of this class.
-        return type_spec["class"](type_spec["xml"], fn_arg, final_attr, None)
+        return type_spec.cls(type_spec.xml, fn_arg, final_attr, None)
 
     # Check if an argument was expected.
-    if "arg" in type_spec:
+    if type_spec.arg is not None:
 
         def ifunction(arg, indi_attr=None):
 
             # Check argument with validator function.
-            arg = type_spec["arg"](arg)
+            arg = type_spec.arg(arg)
 
             # Create object.
             return makeObject(arg, indi_attr)
@@ -799,7 +844,7 @@ def makeINDIFn(indi_type):
 
     # Manipulate some properties of the function so that help, etc. is clearer.
     ifunction.__name__ = indi_type
-    ifunction.__doc__ = type_spec["docs"]  # FIXME: Add arguments dictionary.
+    ifunction.__doc__ = type_spec.docs  # FIXME: Add arguments dictionary.
 
     return ifunction
 
@@ -812,40 +857,139 @@ def makeINDIFn(indi_type):
 # XML parsing of incoming commands.
 
 def parseETree(etree):
-    type_spec = indi_spec[etree.tag]
-    return type_spec["class"](type_spec["xml"], None, None, etree)
-
-
-# Create the functions for generating INDI command objects.
-
-deviceGetProperties = makeINDIFn("deviceGetProperties")
-defTextVector = makeINDIFn("defTextVector")
-defText = makeINDIFn("defText")
-defNumberVector = makeINDIFn("defNumberVector")
-defNumber = makeINDIFn("defNumber")
-defSwitchVector = makeINDIFn("defSwitchVector")
-defSwitch = makeINDIFn("defSwitch")
-defLightVector = makeINDIFn("defLightVector")
-defLight = makeINDIFn("defLight")
-defBLOBVector = makeINDIFn("defBLOBVector")
-defBLOB = makeINDIFn("defBLOB")
-setTextVector = makeINDIFn("setTextVector")
-setNumberVector = makeINDIFn("setNumberVector")
-setSwitchVector = makeINDIFn("setSwitchVector")
-setLightVector = makeINDIFn("setLightVector")
-setBLOBVector = makeINDIFn("setBLOBVector")
-message = makeINDIFn("message")
-delProperty = makeINDIFn("delProperty")
-oneLight = makeINDIFn("oneLight")
-
-clientGetProperties = makeINDIFn("clientGetProperties")
-enableBLOB = makeINDIFn("enableBLOB")
-newTextVector = makeINDIFn("newTextVector")
-newNumberVector = makeINDIFn("newNumberVector")
-newSwitchVector = makeINDIFn("newSwitchVector")
-newBLOBVector = makeINDIFn("newBLOBVector")
-
-oneText = makeINDIFn("oneText")
-oneNumber = makeINDIFn("oneNumber")
-oneSwitch = makeINDIFn("oneSwitch")
-oneBLOB = makeINDIFn("oneBLOB")
+    type_spec = indi_compiled[etree.tag]
+    return type_spec.cls(type_spec.xml, None, None, etree)
+
+
+# The functions for generating INDI command objects and the serializers are created
+# on first use and then kept as module attributes, e.g. indiXML.newNumberVector.
+
+def __getattr__(name):
+    if name in indi_spec:
+        value = makeINDIFn(name)
+    elif name in serializers:
+        value = serializers[name]()
+    else:
+        raise AttributeError("module " + __name__ + " has no attribute " + name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(indi_spec) | set(serializers))
+
+
+# Precompiled serializers for the new vectors sent by the client.
+
+def escape(text):
+    # Same as xml.sax.saxutils.escape, which imports urllib and the email package.
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+class SerializedCommand(object):
+    """
+    An INDI command, which is already serialized to XML.
+    """
+    __slots__ = ('xml',)
+
+    def __init__(self, xml):
+        self.xml = xml
+
+    def __str__(self):
+        return self.xml.decode()
+
+    def toXML(self):
+        return self.xml
+
+
+class VectorSerializer(object):
+    """
+    Serializes new vectors without building INDI objects or an ElementTree. The
+    start tags of the vectors and elements are generated once with ElementTree and
+    cached, so for every command only the values have to be validated and escaped.
+    The result is byte-identical to the toXML() of the corresponding INDI objects.
+    """
+
+    def __init__(self, vector_type, element_type):
+        self.vector_fn = makeINDIFn(vector_type)
+        self.element_type = element_type
+        self.arg = indi_compiled[element_type].arg
+        self.vector_end = ("</" + vector_type + ">").encode()
+        self.element_end = ("</" + element_type + ">").encode()
+        self.vectors = {}
+        self.elements = {}
+
+    @staticmethod
+    def splitTags(etree):
+        # Serialize with a dummy text and keep the start tag and the empty element.
+        etree.text = "-"
+        start = ETree.tostring(etree, "utf-8").split(b">", 1)[0] + b">"
+        empty = start[:-1] + b" />"
+        return start, empty
+
+    def vectorTags(self, device, name):
+        key = (device, name)
+        if key not in self.vectors:
+            vector = self.vector_fn([], indi_attr={"device": device, "name": name})
+            self.vectors[key] = self.splitTags(vector.toETree())
+        return self.vectors[key]
+
+    def elementTags(self, name):
+        if name not in self.elements:
+            etree = ETree.Element(self.element_type)
+            etree.set("name", str(name))
+            self.elements[name] = self.splitTags(etree)
+        return self.elements[name]
+
+    def serialize(self, device, name, elements):
+        start, empty = self.vectorTags(device, name)
+        if not elements:
+            return SerializedCommand(empty)
+
+        parts = [start]
+        for element in elements:
+            text = escape(str(self.arg(elements[element])))
+            element_start, element_empty = self.elementTags(element)
+            if text:
+                parts.append(element_start)
+                parts.append(text.encode())
+                parts.append(self.element_end)
+            else:
+                parts.append(element_empty)
+        parts.append(self.vector_end)
+        return SerializedCommand(b"".join(parts))
+
+
+class BLOBSerializer(object):
+    """
+    Serializes the tags of new BLOB vectors for streaming uploads. Only the start and
+    end tags are generated, the base64 text of the BLOBs is written in between by the
+    caller, so the payload never becomes part of an INDI object or an ElementTree.
+    """
+
+    def __init__(self):
+        self.vector_fn = makeINDIFn("newBLOBVector")
+        self.element_fn = makeINDIFn("oneBLOB")
+        self.vector_end = b"</newBLOBVector>"
+        self.element_end = b"</oneBLOB>"
+
+    def vectorStart(self, device, name, timestamp=None):
+        indi_attr = {"device": device, "name": name}
+        if timestamp:
+            indi_attr["timestamp"] = timestamp
+        vector = self.vector_fn([], indi_attr=indi_attr)
+        return VectorSerializer.splitTags(vector.toETree())[0]
+
+    def elementStart(self, name, size, blob_format):
+        element = self.element_fn("", indi_attr={"name": name,
+                                                 "size": str(size),
+                                                 "iformat": blob_format})
+        return VectorSerializer.splitTags(element.toETree())[0]
+
+
+serializers = {
+    "newTextSerializer": lambda: VectorSerializer("newTextVector", "oneText"),
+    "newNumberSerializer": lambda: VectorSerializer("newNumberVector", "oneNumber"),
+    "newSwitchSerializer": lambda: VectorSerializer("newSwitchVector", "oneSwitch"),
+    "newBLOBSerializer": BLOBSerializer,
+}
@@ -0,0 +1,584 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+#       #   #  #   #   #    #
+#      ##  ##  #  ##  #    #
+#     # # # #  # # # #    #  #
+#    #  ##  #  ##  ##    ######
+#   #   #   #  #   #       #
+#
+# Python-based Tool for interaction with the 10micron mounts
+# GUI with PyQT5 for python
+# Python  v3.7.4
+
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import functools
+import logging
+# external packages
+import PyQt5.QtCore
+# local import
+from indibase.loggerMW import CustomLogger
+from indibase import indiBase
+
+
+class Client(PyQt5.QtCore.QObject):
+    """
+    Client keeps the connections to several INDI servers at the same time and presents
+    the devices of all servers in one merged devices dict and one set of signals. every
+    server is handled by its own indiBase.Client. a device keeps its name, as long as
+    no other server has a device with the same name. otherwise it is named
+    device@host:port. all commands are routed to the server of the device.
+
+        >>> indiClient = Client(
+        >>>                     hosts=[('mount', 7624), ('camera', 7624)],
+        >>>                     )
+
+    """
+
+    __all__ = ['Client',
+               'addServer',
+               'removeServer',
+               'getClient',
+               'connectServer',
+               'disconnectServer',
+               'isServerConnected',
+               'watchDevice',
+               'connectDevice',
+               'disconnectDevice',
+               'getDevice',
+               'getDevices',
+               'setBlobMode',
+               'getBlobMode',
+               'sendNewText',
+               'sendNewNumber',
+               'sendNewSwitch',
+               'requestNewText',
+               'requestNewNumber',
+               'requestNewSwitch',
+               'startBlob',
+               'sendOneBlob',
+               'finishBlob',
+               ]
+
+    logger = logging.getLogger(__name__)
+    log = CustomLogger(logger, {})
+
+    # signals of the clients with the device name as first argument
+    DEVICE_SIGNALS = ['newDevice',
+                      'removeDevice',
+                      'newProperty',
+                      'removeProperty',
+                      'newBLOB',
+                      'newSwitch',
+                      'newNumber',
+                      'newText',
+                      'newLight',
+                      'defBLOB',
+                      'defSwitch',
+                      'defNumber',
+                      'defText',
+                      'defLight',
+                      'newMessage',
+                      'deviceConnected',
+                      'deviceDisconnected',
+                      ]
+
+    def __init__(self,
+                 hosts=None,
+                 engine='etree',
+                 ):
+        super().__init__()
+
+        self.engine = engine
+        self.signals = indiBase.INDISignals()
+        self.clients = dict()
+        self.routes = dict()
+        self.names = dict()
+        self.blobClient = None
+
+        for host in hosts or []:
+            self.addServer(host)
+
+    @property
+    def devices(self):
+        return {name: client.devices[deviceName]
+                for name, (client, deviceName) in self.routes.items()
+                if deviceName in client.devices}
+
+    def addServer(self, host='', port=7624):
+        """
+        addServer adds a server to the client. its signals are merged into the signals
+        of the client.
+
+        :param host: host name or tuple of host name and port
+        :param port: port, if host is only a name
+        :return: client of the server, None if already added or invalid
+        """
+
+        if isinstance(host, str):
+            host = (host, port)
+        if not host or not host[0] or host in self.clients:
+            return None
+
+        client = indiBase.Client(host=host, engine=self.engine)
+        for signal in self.DEVICE_SIGNALS:
+            getattr(client.signals, signal).connect(
+                functools.partial(self._forward, client, signal))
+        client.signals.serverConnected.connect(self.signals.serverConnected.emit)
+        client.signals.serverDisconnected.connect(
+            functools.partial(self._forwardDisconnected, client))
+        client.signals.serverError.connect(
+            functools.partial(self._forwardError, client))
+        self.clients[host] = client
+        return client
+
+    def removeServer(self, host='', port=7624):
+        """
+        removeServer disconnects from the server and removes it from the client.
+
+        :param host: host name or tuple of host name and port
+        :param port: port, if host is only a name
+        :return: success
+        """
+
+        if isinstance(host, str):
+            host = (host, port)
+        if host not in self.clients:
+            return False
+
+        client = self.clients.pop(host)
+        client.disconnectServer()
+        for name, (routeClient, deviceName) in list(self.routes.items()):
+            if routeClient is client:
+                self._releaseName(client, deviceName)
+        return True
+
+    def getClient(self, host='', port=7624):
+        """
+        getClient returns the client of a server.
+
+        :param host: host name or tuple of host name and port
+        :param port: port, if host is only a name
+        :return: client, None if unknown
+        """
+
+        if isinstance(host, str):
+            host = (host, port)
+        return self.clients.get(host)
+
+    def _mergedName(self, client, deviceName):
+        """
+        _mergedName gives back the name of a device of the server in the merged device
+        dict. a new device keeps its name, if it is not taken by a device of another
+        server.
+
+        :param client: client of the server
+        :param deviceName: name of the device on the server
+        :return: merged name
+        """
+
+        key = (client.host, deviceName)
+        if key in self.names:
+            return self.names[key]
+
+        name = deviceName
+        if name in self.routes:
+            host, port = client.host
+            name = f'{deviceName}@{host}:{port}'
+            self.log.warning(f'Device [{deviceName}] exists on several servers, '
+                             f'using [{name}]')
+        self.names[key] = name
+        self.routes[name] = (client, deviceName)
+        return name
+
+    def _releaseName(self, client, deviceName):
+        """
+        _releaseName removes a device of the server from the merged device dict.
+
+        :param client: client of the server
+        :param deviceName: name of the device on the server
+        :return: merged name
+        """
+
+        key = (client.host, deviceName)
+        if key not in self.names:
+            return deviceName
+        name = self.names.pop(key)
+        del self.routes[name]
+        return name
+
+    def _forward(self, client, signal, deviceName, *args):
+        """
+        _forward sends the signal of a client as signal of the merged client with the
+        merged name of the device.
+
+        :param client: client, which sent the signal
+        :param signal: name of the signal
+        :param deviceName: name of the device on the server
+        :param args: further arguments of the signal
+        :return: nothing
+        """
+
+        if not deviceName:
+            name = deviceName
+        elif signal == 'removeDevice':
+            name = self._releaseName(client, deviceName)
+        else:
+            name = self._mergedName(client, deviceName)
+        getattr(self.signals, signal).emit(name, *args)
+
+    def _forwardDisconnected(self, client, devices):
+        """
+        _forwardDisconnected sends serverDisconnected with the devices of the server
+        under their merged names.
+
+        :param client: client, which sent the signal
+        :param devices: devices of the server
+        :return: nothing
+        """
+
+        devices = {self.names.get((client.host, deviceName), deviceName): device
+                   for deviceName, device in devices.items()}
+        self.signals.serverDisconnected.emit(devices)
+
+    def _forwardError(self, client, message):
+        """
+        _forwardError sends serverError with the server in the message.
+
+        :param client: client, which sent the signal
+        :param message: error message
+        :return: nothing
+        """
+
+        host, port = client.host
+        self.signals.serverError.emit(f'{host}:{port}: {message}')
+
+    def _route(self, deviceName):
+        """
+        _route looks up the server of a device.
+
+        :param deviceName: merged name of the device
+        :return: client of the server and name of the device on the server
+        """
+
+        return self.routes.get(deviceName, (None, deviceName))
+
+    def connectServer(self):
+        """
+        connectServer starts the connections to all servers. as the connections are
+        set up without waiting, all servers are connected in parallel. every server
+        signals serverConnected or serverError.
+
+        :return: success of starting all connections
+        """
+
+        suc = bool(self.clients)
+        for client in self.clients.values():
+            suc = client.connectServer() and suc
+        return suc
+
+    def disconnectServer(self):
+        """
+        disconnectServer drops the connections to all servers.
+
+        :return: success
+        """
+
+        for client in self.clients.values():
+            client.disconnectServer()
+        return True
+
+    def isServerConnected(self):
+        """
+        isServerConnected checks the connections to all servers.
+
+        :return: True if all servers are connected
+        """
+
+        if not self.clients:
+            return False
+        return all(client.isServerConnected() for client in self.clients.values())
+
+    def watchDevice(self, deviceName=''):
+        """
+        watchDevice adds a device to the watchlist. as a device might not be known
+        before it is watched, unknown devices are watched on all servers.
+
+        :param deviceName: merged name of the device, empty for all devices
+        :return: success
+        """
+
+        client, name = self._route(deviceName)
+        if client is not None:
+            return client.watchDevice(name)
+
+        suc = False
+        for client in self.clients.values():
+            suc = client.watchDevice(deviceName) or suc
+        return suc
+
+    def connectDevice(self, deviceName=''):
+        """
+        connectDevice connects the device on its server.
+
+        :param deviceName: merged name of the device
+        :return: success
+        """
+
+        client, name = self._route(deviceName)
+        if client is None:
+            return False
+        return client.connectDevice(name)
+
+    def disconnectDevice(self, deviceName=''):
+        """
+        disconnectDevice disconnects the device on its server.
+
+        :param deviceName: merged name of the device
+        :return: success
+        """
+
+        client, name = self._route(deviceName)
+        if client is None:
+            return False
+        return client.disconnectDevice(name)
+
+    def getDevice(self, deviceName=''):
+        """
+        getDevice gives back the device from the store of its server.
+
+        :param deviceName: merged name of the device
+        :return: device, None if unknown
+        """
+
+        client, name = self._route(deviceName)
+        if client is None:
+            return None
+        return client.getDevice(name)
+
+    def getDevices(self, driverInterface=0xFFFF):
+        """
+        getDevices generates a list of the devices of all servers, which are from type
+        of the given driver interface type.
+
+        :param driverInterface: binary value of driver interface type
+        :return: list of merged names of the devices
+        """
+
+        deviceList = list()
+        for name, (client, deviceName) in list(self.routes.items()):
+            if deviceName in client.getDevices(driverInterface):
+                deviceList.append(name)
+        return deviceList
+
+    def setBlobMode(self, blobHandling='Never', deviceName='', propertyName=''):
+        """
+        setBlobMode sets the blob handling of the device on its server.
+
+        :param blobHandling: blob mode 'Never', 'Also' or 'Only'
+        :param deviceName: merged name of the device
+        :param propertyName: name string of device property, empty for all
+        :return: success
+        """
+
+        client, name = self._route(deviceName)
+        if client is None:
+            return False
+        return client.setBlobMode(blobHandling=blobHandling,
+                                  deviceName=name,
+                                  propertyName=propertyName)
+
+    def getBlobMode(self, deviceName='', propertyName=''):
+        """
+        getBlobMode gives back the blob handling of the device on its server.
+
+        :param deviceName: merged name of the device
+        :param propertyName: name string of device property
+        :return: blob mode
+        """
+
+        client, name = self._route(deviceName)
+        if client is None:
+            return 'Never'
+        return client.getBlobMode(deviceName=name, propertyName=propertyName)
+
+    def sendNewText(self, deviceName='', propertyName='', elements='', text=''):
+        """
+        sendNewText sends the new text values to the server of the device.
+
+        :param deviceName: merged name of the device
+        :param propertyName: name string of device property
+        :param elements: element name or dict of element name / values
+        :param text: value in case of having only one element in elements
+        :return: success
+        """
+
+        client, name = self._route(deviceName)
+        if client is None:
+            return False
+        return client.sendNewText(deviceName=name,
+                                  propertyName=propertyName,
+                                  elements=elements,
+                                  text=text)
+
+    def sendNewNumber(self, deviceName='', propertyName='', elements='', number=0):
+        """
+        sendNewNumber sends the new number values to the server of the device.
+
+        :param deviceName: merged name of the device
+        :param propertyName: name string of device property
+        :param elements: element name or dict of element name / values
+        :param number: value in case of having only one element in elements
+        :return: success
+        """
+
+        client, name = self._route(deviceName)
+        if client is None:
+            return False
+        return client.sendNewNumber(deviceName=name,
+                                    propertyName=propertyName,
+                                    elements=elements,
+                                    number=number)
+
+    def sendNewSwitch(self, deviceName='', propertyName='', elements=''):
+        """
+        sendNewSwitch sends the new switch values to the server of the device.
+
+        :param deviceName: merged name of the device
+        :param propertyName: name string of device property
+        :param elements: element name or dict of element name / values
+        :return: success
+        """
+
+        client, name = self._route(deviceName)
+        if client is None:
+            return False
+        return client.sendNewSwitch(deviceName=name,
+                                    propertyName=propertyName,
+                                    elements=elements)
+
+    def _request(self, method, deviceName='', propertyName='', **kwargs):
+        """
+        _request sends a command with the request method of the server of the device.
+        for unknown devices the handle is finished with the state Failed.
+
+        :param method: name of the request method
+        :param deviceName: merged name of the device
+        :param propertyName: name string of device property
+        :param kwargs: further arguments of the request method
+        :return: handle
+        """
+
+        client, name = self._route(deviceName)
+        if client is None:
+            handle = indiBase.Command(deviceName=deviceName, propertyName=propertyName)
+            handle._resolve('Failed')
+            return handle
+        return getattr(client, method)(deviceName=name,
+                                       propertyName=propertyName,
+                                       **kwargs)
+
+    def requestNewText(self, deviceName='', propertyName='', elements='', text=''):
+        """
+        requestNewText sends the new text values to the server of the device.
+
+        :param deviceName: merged name of the device
+        :param propertyName: name string of device property
+        :param elements: element name or dict of element name / values
+        :param text: value in case of having only one element in elements
+        :return: handle of the command
+        """
+
+        return self._request('requestNewText',
+                             deviceName=deviceName,
+                             propertyName=propertyName,
+                             elements=elements,
+                             text=text)
+
+    def requestNewNumber(self, deviceName='', propertyName='', elements='', number=0):
+        """
+        requestNewNumber sends the new number values to the server of the device.
+
+        :param deviceName: merged name of the device
+        :param propertyName: name string of device property
+        :param elements: element name or dict of element name / values
+        :param number: value in case of having only one element in elements
+        :return: handle of the command
+        """
+
+        return self._request('requestNewNumber',
+                             deviceName=deviceName,
+                             propertyName=propertyName,
+                             elements=elements,
+                             number=number)
+
+    def requestNewSwitch(self, deviceName='', propertyName='', elements=''):
+        """
+        requestNewSwitch sends the new switch values to the server of the device.
+
+        :param deviceName: merged name of the device
+        :param propertyName: name string of device property
+        :param elements: element name or dict of element name / values
+        :return: handle of the command
+        """
+
+        return self._request('requestNewSwitch',
+                             deviceName=deviceName,
+                             propertyName=propertyName,
+                             elements=elements)
+
+    def startBlob(self, deviceName='', propertyName='', timestamp=''):
+        """
+        startBlob begins the upload of a blob vector to the server of the device. the
+        following sendOneBlob and finishBlob go to the same server.
+
+        :param deviceName: merged name of the device
+        :param propertyName: name string of device property
+        :param timestamp: optional timestamp of the vector
+        :return: success
+        """
+
+        client, name = self._route(deviceName)
+        if client is None:
+            return False
+        self.blobClient = client
+        return client.startBlob(deviceName=name,
+                                propertyName=propertyName,
+                                timestamp=timestamp)
+
+    def sendOneBlob(self, blobName='', blobSize=0, blobFormat='', blobBuffer=None):
+        """
+        sendOneBlob sends a blob to the server of the running upload.
+
+        :param blobName: name string of the blob element
+        :param blobSize: number of bytes of the uncompressed blob
+        :param blobFormat: format of the blob as file suffix, eg: .fits, .fits.z
+        :param blobBuffer: data of the blob
+        :return: success
+        """
+
+        if self.blobClient is None:
+            return False
+        return self.blobClient.sendOneBlob(blobName=blobName,
+                                           blobSize=blobSize,
+                                           blobFormat=blobFormat,
+                                           blobBuffer=blobBuffer)
+
+    def finishBlob(self):
+        """
+        finishBlob closes the running upload.
+
+        :return: success
+        """
+
+        if self.blobClient is None:
+            return False
+        client, self.blobClient = self.blobClient, None
+        return client.finishBlob()
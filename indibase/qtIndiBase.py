@@ -20,7 +20,8 @@
 ###########################################################
 # standard libraries
 import logging
-import socket
+import random
+import zlib
 # external packages
 import PyQt5.QtCore
 # local import
@@ -99,16 +100,16 @@ class Client(indibase.indiBase.Client):
 
     logger = logging.getLogger(__name__)
 
-    # socket timeout for testing if server is present
-    SOCKET_TIMEOUT = 1
-    # cycle timer for checking server up
-    CYCLE_SERVER_UP = 5000
+    # shortest and longest time in milliseconds to wait before reconnecting
+    RECONNECT_MIN = 1000
+    RECONNECT_MAX = 60000
 
     def __init__(self,
                  host=None,
-                 threadPool=None
+                 threadPool=None,
+                 engine='etree',
                  ):
-        super().__init__(host=host)
+        super().__init__(host=host, engine=engine)
 
         if threadPool is None:
             self.threadPool = PyQt5.QtCore.QThreadPool()
@@ -116,104 +117,198 @@ class Client(indibase.indiBase.Client):
             self.threadPool = threadPool
 
         self.threadPool.setExpiryTimeout(300000)
-        self.mutexServerUp = PyQt5.QtCore.QMutex()
+        self.blobDecompress = True
 
+        # reconnect supervisor
+        self.supervise = False
+        self.reconnectAttempts = 0
+        self.lastState = self.state
+        self.serverUp = None
         self.timerServerUp = PyQt5.QtCore.QTimer()
-        self.timerServerUp.setSingleShot(False)
-        self.timerServerUp.timeout.connect(self.cycleCheckServerUp)
+        self.timerServerUp.setSingleShot(True)
+        self.timerServerUp.timeout.connect(self._reconnect)
+        self.signals.connectionState.connect(self._handleConnectionState)
 
-    def checkServerUp(self):
+    def setBlobDecompression(self, status=True):
         """
-        checkServerUp polls the host/port of the mount computer and set the state and
-        signals for the status accordingly.
+        setBlobDecompression enables the decompression of received blobs in the thread
+        pool. compressed blobs are signaled with newBLOB not before they are
+        decompressed, so the slots connected never have to do codec work.
 
-        :return: nothing
+        :param status: True for decompressing blobs
+        :return: success for test purpose
         """
 
-        client = socket.socket()
-        client.settimeout(self.SOCKET_TIMEOUT)
-        try:
-            client.connect(self.host)
-        except Exception:
-            suc = False
-        else:
-            suc = True
-        finally:
-            client.shutdown(socket.SHUT_RDWR)
-            client.close()
+        self.blobDecompress = status
+        return True
 
-        return suc
+    def decompressBlobs(self, deviceName, iProperty, blobs):
+        """
+        decompressBlobs runs in the thread pool and decompresses all given blobs. zlib
+        releases the GIL while working, so the gui thread keeps running. if a blob
+        could not be decompressed, it is kept as it is.
+
+        :param deviceName: device name
+        :param iProperty: property name
+        :param blobs: list of elements and their compressed values
+        :return: device name, property name and list of elements, compressed and
+                 decompressed values
+        """
 
-    def checkServerUpResult(self, result):
+        result = []
+        for element, compressed in blobs:
+            try:
+                value = zlib.decompress(compressed)
+            except zlib.error as e:
+                self.logger.error(f'Decompress [{deviceName}] [{iProperty}]: {e}')
+                continue
+            result.append((element, compressed, value))
+        return deviceName, iProperty, result
+
+    def decompressBlobsResult(self, result):
         """
+        decompressBlobsResult writes the decompressed values into the device store and
+        signals the blob as new. if the element got a newer value in the meantime, this
+        value is kept. the suffix .z is removed from the format.
 
-        :param result:
-        :return:
+        :param result: device name, property name and decompressed elements
+        :return: success for test purpose
         """
 
-        if result and not self.connected:
-            suc = self.connectServer()
-            self.logger.info(f'Connect to server, result: {suc}')
-            return suc
-        else:
-            return False
+        deviceName, iProperty, blobs = result
+        with self.storeLock:
+            for element, compressed, value in blobs:
+                if element.value is not compressed:
+                    continue
+                element.value = value
+                element.format = element.format[:-2]
+        return super()._emitProperty(deviceName=deviceName,
+                                     iProperty=iProperty,
+                                     propertyType='setBLOBVector')
+
+    def _emitProperty(self, deviceName='', iProperty='', propertyType=''):
+        """
+        _emitProperty sends the signals for a property, which was defined or set. for
+        compressed blobs the decompression is started in the thread pool and the
+        signal newBLOB is sent when the decompressed data is ready.
+
+        :param deviceName: device name
+        :param iProperty: property name
+        :param propertyType: type of the vector from INDI
+        :return: success
+        """
+
+        if not self.blobDecompress or propertyType != 'setBLOBVector':
+            return super()._emitProperty(deviceName=deviceName,
+                                         iProperty=iProperty,
+                                         propertyType=propertyType)
+
+        elementList = getattr(self.devices[deviceName], iProperty).elementList
+        blobs = [(element, element.get('value')) for element in elementList.values()
+                 if element.get('value') and element.get('format', '').endswith('.z')]
+        if not blobs:
+            return super()._emitProperty(deviceName=deviceName,
+                                         iProperty=iProperty,
+                                         propertyType=propertyType)
+
+        worker = Worker(self.decompressBlobs, deviceName, iProperty, blobs)
+        worker.signals.result.connect(self.decompressBlobsResult)
+        self.threadPool.start(worker)
+        return True
 
-    def errorCycleCheckServerUp(self, e):
+    def _backoffDelay(self):
         """
-        the cyclic or long lasting tasks for getting date from the mount should not run
-        twice for the same data at the same time. so there is a mutex to prevent this
-        behaviour. remove the mutex unlock this mutex.
+        _backoffDelay doubles the time to wait before reconnecting with every failed
+        attempt up to RECONNECT_MAX. the time is randomly reduced by up to one half, so
+        many clients do not reconnect to a restarted server at the same moment.
 
-        :return: nothing
+        :return: delay in milliseconds
         """
-        self.logger.error(f'Cycle error: {e}')
 
-    def clearCycleCheckServerUp(self):
+        if not self.supervise:
+            return super()._backoffDelay()
+
+        delay = min(self.RECONNECT_MAX, self.RECONNECT_MIN * 2 ** self.reconnectAttempts)
+        self.reconnectAttempts += 1
+        return int(delay / 2 + random.uniform(0, delay / 2))
+
+    def _setServerUp(self, status):
         """
-        the cyclic or long lasting tasks for getting date from the mount should not run
-        twice for the same data at the same time. so there is a mutex to prevent this
-        behaviour. remove the mutex unlock this mutex.
+        _setServerUp sends the signal serverAlive, if the health of the server changed.
 
+        :param status: True if the server is reachable
         :return: nothing
         """
 
-        self.mutexServerUp.unlock()
+        if status == self.serverUp:
+            return
+        self.serverUp = status
+        self.signals.serverAlive.emit(status)
 
-    def cycleCheckServerUp(self):
+    @PyQt5.QtCore.pyqtSlot(str)
+    def _handleConnectionState(self, state):
         """
-        cycleCheckServerUp prepares the worker thread and the signals for getting the settings
-        data.
+        _handleConnectionState is the reconnect supervisor. it follows the states of
+        the connection, reports the health of the server with serverAlive and starts a
+        new connection, when the connection is lost or the backoff of a failed attempt
+        is over. the reconnect runs on the existing socket, the watched devices and
+        their blob modes are replayed by the client.
 
+        :param state: new state of the connection
         :return: nothing
         """
 
-        if self.host is None:
-            return False
+        previous, self.lastState = self.lastState, state
+        if state == self.CONNECTED:
+            self.reconnectAttempts = 0
+            self._setServerUp(True)
+        elif state == self.BACKOFF:
+            self._setServerUp(False)
+        elif state == self.DISCONNECTED:
+            if previous == self.DISCONNECTING:
+                self._setServerUp(False)
+            if not self.supervise:
+                return
+            if previous == self.BACKOFF:
+                self.timerServerUp.start(0)
+            else:
+                self.timerServerUp.start(self._backoffDelay())
+
+    @PyQt5.QtCore.pyqtSlot()
+    def _reconnect(self):
+        """
+        _reconnect starts a new connection to the server.
 
-        if not self.mutexServerUp.tryLock():
-            return
+        :return: success
+        """
 
-        worker = Worker(self.checkServerUp)
-        worker.signals.finished.connect(self.clearCycleCheckServerUp)
-        worker.signals.result.connect(self.checkServerUpResult)
-        worker.signals.error.connect(self.errorCycleCheckServerUp)
-        self.threadPool.start(worker)
+        if not self.supervise:
+            return False
+        if self.state != self.DISCONNECTED:
+            return False
+        suc = self.connectServer()
+        self.logger.info(f'Reconnect to server, result: {suc}')
+        return suc
 
     def startTimers(self):
         """
-        startTimers enables the cyclic timers for polling necessary mount data.
+        startTimers enables the reconnect supervisor and connects to the server.
 
         :return: nothing
         """
 
-        self.timerServerUp.start(self.CYCLE_SERVER_UP)
+        self.supervise = True
+        self.reconnectAttempts = 0
+        if self.state == self.DISCONNECTED:
+            self.timerServerUp.start(0)
 
     def stopTimers(self):
         """
-        stopTimers disables the cyclic timers for polling necessary mount data.
-
+        stopTimers disables the reconnect supervisor. the connection itself stays as it
+        is.
 
         :return: nothing
         """
 
+        self.supervise = False
         self.timerServerUp.stop()
@@ -0,0 +1,54 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+# INDIBASE
+#
+# GUI with PyQT5 for python
+# Python  v3.7.4
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import base64
+import time
+import zlib
+# external packages
+import numpy as np
+# local import
+from indibase.indiBlob import BlobDecoder, BlobInflater
+
+# 16 MP frame with 16 bit noise in the lower bits, chunks as received from network
+SIZE = 16 * 2 ** 20
+CHUNK = 2 ** 16
+
+image = np.random.randint(0, 1024, SIZE // 2, dtype=np.uint16).tobytes()
+text = base64.encodebytes(zlib.compress(image))
+chunks = [text[i:i + CHUNK] for i in range(0, len(text), CHUNK)]
+
+
+def afterArrival():
+    decoder = BlobDecoder(len(text) * 3 // 4)
+    for chunk in chunks:
+        decoder.feed(chunk)
+    start = time.perf_counter()
+    value = zlib.decompress(decoder.finish())
+    return time.perf_counter() - start, value
+
+
+def whileArriving():
+    inflater = BlobInflater(BlobDecoder(SIZE))
+    for chunk in chunks:
+        inflater.feed(chunk)
+    start = time.perf_counter()
+    value = inflater.finish()
+    return time.perf_counter() - start, value
+
+
+for function in [afterArrival, whileArriving]:
+    duration, value = function()
+    assert image == value
+    print(f'{function.__name__:14s}: {duration * 1000:8.1f} ms from closing tag to image')
@@ -0,0 +1,81 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+# INDIBASE
+#
+# GUI with PyQT5 for python
+# Python  v3.7.4
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import tracemalloc
+# external packages
+import PyQt5.QtCore
+# local import
+from indibase import indiBase
+
+DEVICES = 50
+PROPERTIES = 100
+ELEMENTS = 4
+
+
+def defNumber(device, number):
+    elements = ''.join(f'<defNumber name="ELEMENT_{i}" label="Element {i}" '
+                       f'format="%10.6m" min="0" max="360" step="0">{i}.5</defNumber>'
+                       for i in range(ELEMENTS))
+    return (f'<defNumberVector device="{device}" name="PROPERTY_{number}" '
+            f'label="Property {number}" group="Main" state="Idle" perm="rw" '
+            f'timeout="60" timestamp="2019-01-01T00:00:00">'
+            f'{elements}</defNumberVector>\n').encode()
+
+
+def dictStore(client):
+    """
+    rebuilds the store with the dict of dicts layout used before the slots model
+    """
+    store = {}
+    for deviceName, device in client.devices.items():
+        for key, iProperty in vars(device).items():
+            if not isinstance(iProperty, indiBase.Property):
+                continue
+            prop = {k: ''.join(v) for k, v in iProperty.items()
+                    if k != 'elementList'}
+            # number values were kept as received text before they were converted
+            prop['elementList'] = {
+                name: {k: ''.join(element.text if k == 'value' else v)
+                       for k, v in element.items() if k != 'text'}
+                for name, element in iProperty.elementList.items()}
+            store[(deviceName, key)] = prop
+    return store
+
+
+def measure(function, *args):
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    result = function(*args)
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return end - start, result
+
+
+def fillClient():
+    client = indiBase.Client(engine='direct')
+    client.connected = True
+    for device in range(DEVICES):
+        for number in range(PROPERTIES):
+            client.parser.feed(defNumber(f'Device {device}', number))
+    return client
+
+
+app = PyQt5.QtCore.QCoreApplication([])
+number = DEVICES * PROPERTIES
+sizeSlots, client = measure(fillClient)
+sizeDict, store = measure(dictStore, client)
+print(f'{number} properties with {ELEMENTS} number elements each')
+print(f'slots model: {sizeSlots / number:8.0f} bytes per property')
+print(f'dict model : {sizeDict / number:8.0f} bytes per property')
@@ -0,0 +1,53 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+# INDIBASE
+#
+# GUI with PyQT5 for python
+# Python  v3.7.4
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import time
+# external packages
+# local import
+from indibase.indiCore import ClientCore
+
+NUMBER = 20000
+
+defNumber = (b'<defNumberVector device="Mount" name="EQ" state="Idle" perm="rw">'
+             b'<defNumber name="RA" format="%10.6m" min="0" max="24" step="0">'
+             b'1.5</defNumber>'
+             b'<defNumber name="DEC" format="%10.6m" min="-90" max="90" step="0">'
+             b'-2.5</defNumber>'
+             b'</defNumberVector>\n')
+setNumber = (b'<setNumberVector device="Mount" name="EQ" state="Ok" '
+             b'timeout="60" timestamp="2019-01-01T00:00:00">\n'
+             b'    <oneNumber name="RA">\n      12.3456\n    </oneNumber>\n'
+             b'    <oneNumber name="DEC">\n      45.6789\n    </oneNumber>\n'
+             b'</setNumberVector>\n')
+
+
+def benchmark(engine):
+    core = ClientCore(engine=engine)
+    core.connectionMade()
+    core.receive(defNumber)
+    # data is received in chunks of several messages
+    chunk = setNumber * 10
+    timeStart = time.perf_counter()
+    for _ in range(NUMBER // 10):
+        core.receive(chunk)
+    duration = time.perf_counter() - timeStart
+    return NUMBER / duration
+
+
+rates = {}
+for engine in ['etree', 'direct']:
+    rates[engine] = benchmark(engine)
+    print(f'{engine:8s}: {rates[engine]:10.0f} setNumberVector/s')
+print(f'speedup : {rates["direct"] / rates["etree"]:10.2f}')
@@ -0,0 +1,48 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+# INDIBASE
+#
+# GUI with PyQT5 for python
+# Python  v3.7.4
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import timeit
+# external packages
+# local import
+from indibase import indiXML
+
+NUMBER = 20000
+elements = {'TIMED_GUIDE_N': 100,
+            'TIMED_GUIDE_S': 0,
+            }
+
+
+def toXML():
+    elementList = []
+    for element in elements:
+        elementList.append(indiXML.oneNumber(elements[element],
+                                             indi_attr={'name': element}))
+    cmd = indiXML.newNumberVector(elementList,
+                                  indi_attr={'name': 'TELESCOPE_TIMED_GUIDE_NS',
+                                             'device': 'Telescope Simulator'})
+    return cmd.toXML()
+
+
+def serialize():
+    cmd = indiXML.newNumberSerializer.serialize('Telescope Simulator',
+                                                'TELESCOPE_TIMED_GUIDE_NS',
+                                                elements)
+    return cmd.toXML()
+
+
+assert toXML() == serialize()
+for function in [toXML, serialize]:
+    duration = timeit.timeit(function, number=NUMBER)
+    print(f'{function.__name__:10s}: {NUMBER / duration:10.0f} newNumberVector/s')
@@ -0,0 +1,76 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+# INDIBASE
+#
+# GUI with PyQT5 for python
+# Python  v3.7.4
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import resource
+import socket
+import threading
+import time
+# external packages
+import PyQt5.QtCore
+import PyQt5.QtWidgets
+# local import
+from indibase import indiBase
+
+SIZE = 256 * 2 ** 20
+
+app = PyQt5.QtWidgets.QApplication([])
+server = socket.socket()
+server.bind(('localhost', 0))
+server.listen(1)
+received = [0]
+
+
+def drain():
+    conn, _ = server.accept()
+    with conn:
+        while True:
+            chunk = conn.recv(2 ** 20)
+            if not chunk:
+                break
+            received[0] += len(chunk)
+
+
+thread = threading.Thread(target=drain, daemon=True)
+thread.start()
+
+client = indiBase.Client(host=('localhost', server.getsockname()[1]))
+# connectServer does not wait for the connection, so the event loop runs until the
+# connection is established or failed
+loop = PyQt5.QtCore.QEventLoop()
+client.signals.serverConnected.connect(loop.quit)
+client.signals.serverError.connect(loop.quit)
+client.connectServer()
+loop.exec_()
+if not client.isServerConnected():
+    raise SystemExit('connection to the drain server failed')
+device = indiBase.Device('CCD')
+device.CCD1 = indiBase.Property()
+client.devices = {'CCD': device}
+data = bytes(SIZE)
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+start = time.perf_counter()
+client.startBlob(deviceName='CCD', propertyName='CCD1')
+client.sendOneBlob(blobName='CCD1', blobFormat='.fits', blobBuffer=data)
+client.finishBlob()
+client.socket.waitForBytesWritten(3000)
+client.socket.disconnectFromHost()
+thread.join()
+duration = time.perf_counter() - start
+
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(f'upload : {SIZE / duration / 2 ** 20:10.1f} MB/s raw blob data')
+print(f'encoded: {received[0] / 2 ** 20:10.1f} MB sent')
+print(f'memory : {(after - before) / 2 ** 10:10.1f} MB additional peak rss')
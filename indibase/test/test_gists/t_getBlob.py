@@ -16,15 +16,14 @@
 import sys
 import logging
 import time
-import zlib
 # external packages
 import PyQt5
 import PyQt5.QtWidgets
 from PyQt5.QtTest import QTest
-from astropy.io import fits
 # local import
 from indibase import indiBase
 from indibase import indiXML
+from indibase import indiImage
 
 
 class IndiPythonBase(PyQt5.QtWidgets.QWidget):
@@ -93,15 +92,11 @@ class IndiPythonBase(PyQt5.QtWidgets.QWidget):
         print('got blob ')
         if deviceName == 'CCD Simulator':
             blob = self.ccdDevice.getBlob(propertyName=deviceProperty)
-            if blob['format'] == '.fits':
-                value = blob['value']
-            elif blob['format'] == '.fi':
-                value = zlib.decompress(blob['value'])
-            else:
+            if blob['format'] != '.fits':
                 print('format not known')
                 return
-            imageHDU = fits.HDUList.fromstring(value)
-            imageHDU.writeto(self.imagePath, overwrite=True)
+            image, header = indiImage.fitsToArray(blob['value'])
+            print('image: ', image.shape, image.dtype, header.get('BZERO', 0))
 
     def quit(self):
         self.client.disconnectServer()
@@ -0,0 +1,41 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+# INDIBASE
+#
+# GUI with PyQT5 for python
+# Python  v3.7.4
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+# external packages
+import pytest
+# local import
+
+
+@pytest.fixture
+def makeClient():
+    """
+    makeClient gives back a factory for clients, which behave as if they were
+    connected to the server. clients aggregating several servers are connected to all
+    of them. the data given is fed into the receive engine of the client.
+    """
+
+    def make(clientClass, *data, **kwargs):
+        client = clientClass(**kwargs)
+        if hasattr(client, 'clients'):
+            servers = list(client.clients.values())
+        else:
+            servers = [client]
+        for server in servers:
+            server.connected = True
+        for chunk in data:
+            client.parser.feed(chunk)
+        return client
+
+    return make
@@ -0,0 +1,288 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+# INDIBASE
+#
+# GUI with PyQT5 for python
+# Python  v3.7.4
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import asyncio
+import base64
+import os
+from unittest import mock
+# external packages
+# local import
+from indibase import asyncIndiBase
+
+defNumber = (b'<defNumberVector device="Mount" name="EQ" state="Idle" perm="rw">'
+             b'<defNumber name="RA" format="%10.6m" min="0" max="24" step="0">'
+             b'1.5</defNumber></defNumberVector>\n')
+setNumber = (b'<setNumberVector device="Mount" name="EQ" state="Ok">'
+             b'<oneNumber name="RA">2.5</oneNumber></setNumberVector>\n')
+
+
+class StandInServer(object):
+    """
+    StandInServer sends the properties of a device to every client and collects the
+    data received from the clients.
+    """
+
+    def __init__(self):
+        self.server = None
+        self.port = 0
+        self.received = []
+        self.writers = []
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, 'localhost', 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def handle(self, reader, writer):
+        data = bytearray()
+        self.received.append(data)
+        self.writers.append(writer)
+        writer.write(defNumber)
+        await writer.drain()
+        while True:
+            chunk = await reader.read(2 ** 16)
+            if not chunk:
+                break
+            data += chunk
+            if b'newNumberVector' in chunk:
+                writer.write(setNumber * chunk.count(b'<newNumberVector'))
+                await writer.drain()
+        writer.close()
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+def test_connectServer1():
+    async def run():
+        client = asyncIndiBase.Client()
+        assert not await client.connectServer()
+        client.setServer('localhost', 1)
+        assert not await client.connectServer()
+
+    asyncio.run(run())
+
+
+def test_callbacks1():
+    async def run():
+        server = StandInServer()
+        await server.start()
+        client = asyncIndiBase.Client(host=('localhost', server.port))
+        received = []
+        client.connect('defNumber', lambda *args: received.append(args))
+        client.connect('newNumber', lambda *args: received.append(args))
+        assert await client.connectServer()
+        assert client.watchDevice('Mount')
+        await asyncio.sleep(0.1)
+        assert 1.5 == client.getDevice('Mount').getNumber('EQ')['RA']
+        assert client.sendNewNumber(deviceName='Mount',
+                                    propertyName='EQ',
+                                    elements='RA',
+                                    number=2.5)
+        await asyncio.sleep(0.1)
+        assert [('Mount', 'EQ'), ('Mount', 'EQ')] == received
+        assert 2.5 == client.getDevice('Mount').getNumber('EQ')['RA']
+        assert await client.disconnectServer()
+        await server.stop()
+        assert server.received[0].startswith(b'<getProperties version="1.7" device="Mount"')
+        assert b'<oneNumber name="RA">2.5</oneNumber>' in server.received[0]
+
+    asyncio.run(run())
+
+
+def test_events1():
+    async def run():
+        server = StandInServer()
+        await server.start()
+        client = asyncIndiBase.Client(host=('localhost', server.port))
+        events = client.events('newDevice', 'defNumber')
+        task = asyncio.ensure_future(events.__anext__())
+        await asyncio.sleep(0)
+        assert await client.connectServer()
+        assert ('newDevice', ('Mount',)) == await asyncio.wait_for(task, 1)
+        assert ('defNumber', ('Mount', 'EQ')) == await asyncio.wait_for(events.__anext__(), 1)
+        await events.aclose()
+        assert not client.queues
+        await client.disconnectServer()
+        await server.stop()
+
+    asyncio.run(run())
+
+
+def test_sessions1():
+    async def session(port):
+        client = asyncIndiBase.Client(host=('localhost', port))
+        assert await client.connectServer()
+        async for signal, args in client.events('defNumber'):
+            break
+        await client.disconnectServer()
+        return args
+
+    async def run():
+        server = StandInServer()
+        await server.start()
+        results = await asyncio.gather(*[session(server.port) for _ in range(200)])
+        await server.stop()
+        assert [('Mount', 'EQ')] * 200 == results
+
+    asyncio.run(run())
+
+
+def test_serverClosed1():
+    async def run():
+        server = StandInServer()
+        await server.start()
+        client = asyncIndiBase.Client(host=('localhost', server.port))
+        received = []
+        client.connect('serverDisconnected', lambda *args: received.append('server'))
+        client.connect('removeDevice', lambda *args: received.append(args))
+        events = client.events('defNumber')
+        task = asyncio.ensure_future(events.__anext__())
+        await asyncio.sleep(0)
+        assert await client.connectServer()
+        await asyncio.wait_for(task, 1)
+        await events.aclose()
+        parser = client.parser
+        parser.feed(b'<setNumberVector device="Mount"')
+        server.server.close()
+        for writer in server.writers:
+            writer.close()
+        await asyncio.sleep(0.1)
+        assert not client.connected
+        assert ['server', ('Mount',)] == received
+        assert not client.devices
+        assert parser is not client.parser
+        assert client.writer is None
+        assert client.readTask is None
+        await server.stop()
+
+    asyncio.run(run())
+
+
+def test_uploadBlob1():
+    async def run():
+        server = StandInServer()
+        await server.start()
+        client = asyncIndiBase.Client(host=('localhost', server.port))
+        assert await client.connectServer()
+        await asyncio.sleep(0.1)
+        data = os.urandom(1000000)
+        assert await client.startBlob(deviceName='Mount', propertyName='EQ')
+        assert await client.sendOneBlob(blobName='RA', blobFormat='.fits', blobBuffer=data)
+        assert await client.finishBlob()
+        await client.disconnectServer()
+        await asyncio.sleep(0.1)
+        await server.stop()
+        text = bytes(server.received[0]).split(b'>', 2)[2].split(b'<', 1)[0]
+        assert base64.b64encode(data) == text
+
+    asyncio.run(run())
+
+
+def test_uploadBlob2():
+    async def run():
+        server = StandInServer()
+        await server.start()
+        client = asyncIndiBase.Client(host=('localhost', server.port))
+        assert await client.connectServer()
+        await asyncio.sleep(0.1)
+        data = os.urandom(1000000)
+        assert await client.startBlob(deviceName='Mount', propertyName='EQ')
+        assert client.sendNewNumber(deviceName='Mount',
+                                    propertyName='EQ',
+                                    elements='RA',
+                                    number=2.5)
+        assert client.outgoing
+        assert await client.sendOneBlob(blobName='RA', blobFormat='.fits', blobBuffer=data)
+        assert await client.finishBlob()
+        assert not client.outgoing
+        await client.disconnectServer()
+        await asyncio.sleep(0.1)
+        await server.stop()
+        received = bytes(server.received[0])
+        text = received.split(b'>', 2)[2].split(b'<', 1)[0]
+        assert base64.b64encode(data) == text
+        vector, commands = received.split(b'</newBLOBVector>\n')
+        assert b'newNumberVector' not in vector
+        assert b'newNumberVector' in commands
+
+    asyncio.run(run())
+
+
+def test_uploadBlob3():
+    async def run():
+        client = asyncIndiBase.Client()
+        client.blobUpload = True
+        client.outgoing += b'<getProperties version="1.7" />\n'
+        written = []
+
+        async def writeData(data):
+            written.append(data)
+            return len(written) < 3
+
+        client._writeData = writeData
+        data = bytes(10 * client.BLOB_CHUNK_SIZE)
+        assert not await client.sendOneBlob(blobName='RA', blobBuffer=data)
+        assert 3 == len(written)
+        assert b'size="%d"' % len(data) in written[0]
+        assert not client.blobUpload
+        assert not client.outgoing
+
+    asyncio.run(run())
+
+
+def test_requestNewNumber1():
+    async def run():
+        server = StandInServer()
+        await server.start()
+        client = asyncIndiBase.Client(host=('localhost', server.port))
+        events = client.events('defNumber')
+        task = asyncio.ensure_future(events.__anext__())
+        await asyncio.sleep(0)
+        assert await client.connectServer()
+        await asyncio.wait_for(task, 1)
+        await events.aclose()
+        commands = [client.requestNewNumber(deviceName='Mount',
+                                            propertyName='EQ',
+                                            elements='RA',
+                                            number=i) for i in range(3)]
+        assert 60 == commands[0].timeout
+        states = await asyncio.wait_for(asyncio.gather(*commands), 1)
+        assert ['Ok', 'Ok', 'Ok'] == states
+        assert not client.commands
+        await client.disconnectServer()
+        await server.stop()
+
+    asyncio.run(run())
+
+
+def test_requestNewNumber2():
+    async def run():
+        client = asyncIndiBase.Client()
+        client.connected = True
+        client.receive(defNumber.replace(b'perm="rw"', b'perm="rw" timeout="0.01"'))
+        client.writer = mock.Mock()
+        command = client.requestNewNumber(deviceName='Mount',
+                                          propertyName='EQ',
+                                          elements='RA',
+                                          number=2)
+        assert 'Timeout' == await asyncio.wait_for(command, 1)
+        assert not client.commands
+        assert 'Failed' == await client.requestNewNumber(deviceName='Mount',
+                                                         propertyName='AZ',
+                                                         elements='RA',
+                                                         number=2)
+
+    asyncio.run(run())
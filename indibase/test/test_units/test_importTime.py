@@ -0,0 +1,150 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+# INDIBASE
+#
+# GUI with PyQT5 for python
+# Python  v3.7.4
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import os
+import statistics
+import subprocess
+import sys
+# external packages
+# local import
+from indibase import indiXML
+
+# the import time of a module is measured after the modules, which it imports from
+# outside the package, were imported in the same interpreter. the time the module needs
+# on top is compared with the time of the reference modules, so the budget does not
+# depend on the speed of the machine. the budgets are fractions of the reference time.
+BASELINE = {
+    'indibase.indiXML': ('logging, base64, collections, numbers, types, '
+                         'xml.etree.ElementTree', 0.06),
+    'indibase.indiBase': ('logging, base64, collections, numbers, types, '
+                          'xml.etree.ElementTree, PyQt5.QtCore', 0.14),
+}
+# modules, which must not be imported by the qt free modules
+HEAVY_MODULES = ['PyQt5', 'xml.sax', 'urllib', 'email', 'tempfile', 'numpy']
+# modules, which are imported on first use only
+LAZY_MODULES = ['PyQt5.QtNetwork', 'xml.parsers.expat', 'tempfile']
+# number of runs, the median is taken
+RUNS = 11
+
+
+def runImport(modules, reference=''):
+    """
+    runImport imports the modules in a fresh interpreter with bytecode caching
+    enabled and returns the import time of the modules, the import time of the
+    reference modules imported before and all loaded modules.
+    """
+
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    code = f'import sys, {modules}; print(" ".join(sys.modules))'
+    if reference:
+        code = f'import {reference}; {code}'
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True,
+                            text=True,
+                            check=True,
+                            env=env)
+    names = [name.strip() for name in modules.split(',')]
+    total = 0
+    referenceTotal = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[12:].split('|')
+        # only top level imports, nested ones are part of their cumulative time
+        if name.startswith('  '):
+            continue
+        if name.strip() in names:
+            total += int(cumulative)
+        else:
+            referenceTotal += int(cumulative)
+    return total, referenceTotal, result.stdout.split()
+
+
+def checkBudget(module):
+    reference, budget = BASELINE[module]
+    runImport(module, reference)
+    ratios = []
+    for _ in range(RUNS):
+        total, referenceTotal, _ = runImport(module, reference)
+        ratios.append(total / referenceTotal)
+    assert statistics.median(ratios) < budget
+
+
+def test_importTime_indiXML():
+    _, _, modules = runImport('indibase.indiXML')
+    for heavy in HEAVY_MODULES:
+        assert heavy not in modules
+    checkBudget('indibase.indiXML')
+
+
+def test_importTime_indiCore():
+    _, _, modules = runImport('indibase.indiCore')
+    for heavy in HEAVY_MODULES + LAZY_MODULES:
+        assert heavy not in modules
+
+
+def test_importTime_indiBase():
+    _, _, modules = runImport('indibase.indiBase')
+    for lazy in LAZY_MODULES:
+        assert lazy not in modules
+    checkBudget('indibase.indiBase')
+
+
+def test_importTime_asyncIndiBase():
+    _, _, modules = runImport('indibase.asyncIndiBase')
+    assert 'PyQt5' not in modules
+
+
+def test_lazyBuilders():
+    code = ('from indibase import indiXML; '
+            'print("newTextVector" in vars(indiXML), "newBLOBSerializer" in vars(indiXML))')
+    result = subprocess.run([sys.executable, '-c', code],
+                            capture_output=True,
+                            text=True,
+                            check=True)
+    assert 'False False' == result.stdout.strip()
+
+
+def test_lazyBuilders_2():
+    fn = indiXML.newTextVector
+    assert fn is vars(indiXML)['newTextVector']
+    assert fn is indiXML.newTextVector
+    assert 'oneBLOB' in dir(indiXML)
+    assert 'newNumberSerializer' in dir(indiXML)
+    assert indiXML.newBLOBSerializer is indiXML.newBLOBSerializer
+
+
+def test_lazyBuilders_3():
+    try:
+        indiXML.newTestVector
+    except AttributeError:
+        pass
+    else:
+        assert False
+
+
+def test_lazyBuilders_4():
+    assert 'defNumber' == indiXML.indi_compiled['defNumber'].xml
+    try:
+        indiXML.indi_compiled['defTest']
+    except KeyError:
+        pass
+    else:
+        assert False
+
+
+def test_escape():
+    assert '&amp;&lt;&gt;"' == indiXML.escape('&<>"')
@@ -13,7 +13,13 @@
 #
 ###########################################################
 # standard libraries
+import base64
+import io
+import os
+import socket
+import threading
 from unittest import mock
+import xml.etree.ElementTree as ETree
 # external packages
 import PyQt5
 from PyQt5.QtTest import QTest
@@ -175,6 +181,26 @@ def test_disconnectServer4(qtbot):
     assert 0 == len(test.devices)
 
 
+def test_disconnectServer5():
+    server = StandInServer()
+    server.start()
+    client = indiBase.Client(host=('localhost', server.port))
+    assert client.connectServer()
+    assert client.socket.waitForConnected(3000)
+    client.parser.feed(b'<defSwitchVector device="CCD" name="CONNECTION" state="Ok" '
+                       b'perm="rw" rule="OneOfMany">'
+                       b'<defSwitch name="CONNECT">On</defSwitch>'
+                       b'<defSwitch name="DISCONNECT">Off</defSwitch>'
+                       b'</defSwitchVector>')
+    assert client.disconnectDevice('CCD')
+    assert client.disconnectServer()
+    assert not client.outgoing
+    QTest.qWait(100)
+    server.join(10)
+    assert b'<newSwitchVector device="CCD" name="CONNECTION">' in bytes(server.data[0])
+    assert indiBase.Client.DISCONNECTED == client.getConnectionState()
+
+
 def test_isServerConnected1():
     test.setServer('localhost')
     test.connectServer()
@@ -435,3 +461,559 @@ def test_setNumber():
                        propertyName='CCD_FRAME',
                        elements=numb,
                        )
+
+
+def test_sendNewNumber1():
+    device = indiBase.Device('Mount')
+    device.EQ = indiBase.Property()
+    test.devices = {'Mount': device}
+    call_ref = indiXML.newNumberVector([indiXML.oneNumber(1.5,
+                                                          indi_attr={'name': 'RA'})
+                                        ],
+                                       indi_attr={'name': 'EQ',
+                                                  'device': 'Mount'})
+    ret_val = True
+    with mock.patch.object(test,
+                           '_sendCmd',
+                           return_value=ret_val):
+        suc = test.sendNewNumber(deviceName='Mount',
+                                 propertyName='EQ',
+                                 elements='RA',
+                                 number=1.5)
+        assert suc
+        call_val = test._sendCmd.call_args_list[0][0][0]
+        assert call_ref.toXML() == call_val.toXML()
+    test.devices = {}
+
+
+def test_sendNewSwitch1():
+    device = indiBase.Device('CCD')
+    device.CONNECTION = indiBase.Property()
+    test.devices = {'CCD': device}
+    call_ref = indiXML.newSwitchVector([indiXML.oneSwitch('On',
+                                                          indi_attr={'name': 'CONNECT'})
+                                        ],
+                                       indi_attr={'name': 'CONNECTION',
+                                                  'device': 'CCD'})
+    ret_val = True
+    with mock.patch.object(test,
+                           '_sendCmd',
+                           return_value=ret_val):
+        suc = test.sendNewSwitch(deviceName='CCD',
+                                 propertyName='CONNECTION',
+                                 elements='CONNECT')
+        assert suc
+        call_val = test._sendCmd.call_args_list[0][0][0]
+        assert call_ref.toXML() == call_val.toXML()
+    test.devices = {}
+
+
+class StandInServer(threading.Thread):
+    """
+    StandInServer accepts a number of clients one after the other and collects all
+    data of each connection until the client closes it.
+    """
+
+    def __init__(self, connections=1):
+        super().__init__(daemon=True)
+        self.server = socket.socket()
+        self.server.bind(('localhost', 0))
+        self.server.listen(connections)
+        self.port = self.server.getsockname()[1]
+        self.data = [bytearray() for _ in range(connections)]
+
+    def run(self):
+        for data in self.data:
+            conn, _ = self.server.accept()
+            with conn:
+                while True:
+                    chunk = conn.recv(2 ** 16)
+                    if not chunk:
+                        break
+                    data += chunk
+        self.server.close()
+
+
+def uploadBlob(blobBuffer, blobSize=0):
+    server = StandInServer()
+    server.start()
+    client = indiBase.Client(host=('localhost', server.port))
+    assert client.connectServer()
+    assert client.socket.waitForConnected(3000)
+    device = indiBase.Device('CCD')
+    device.CCD1 = indiBase.Property()
+    client.devices = {'CCD': device}
+    suc = client.startBlob(deviceName='CCD', propertyName='CCD1')
+    suc = suc and client.sendOneBlob(blobName='CCD1',
+                                     blobSize=blobSize,
+                                     blobFormat='.fits',
+                                     blobBuffer=blobBuffer)
+    suc = suc and client.finishBlob()
+    client.socket.waitForBytesWritten(3000)
+    client.socket.disconnectFromHost()
+    server.join(10)
+    return suc, bytes(server.data[0])
+
+
+def test_startBlob1():
+    test.connected = False
+    assert not test.startBlob(deviceName='CCD', propertyName='CCD1')
+
+
+def test_sendOneBlob1():
+    test.blobUpload = False
+    assert not test.sendOneBlob(blobName='CCD1', blobBuffer=b'test')
+    assert not test.finishBlob()
+
+
+def test_uploadBlob1():
+    data = os.urandom(3000000)
+    suc, received = uploadBlob(data)
+    assert suc
+    assert received.endswith(b'</newBLOBVector>\n')
+    chunk = indiXML.parseETree(ETree.fromstring(received))
+    assert isinstance(chunk, indiXML.NewBLOBVector)
+    element = chunk.elt_list[0]
+    assert str(len(data)) == element.attr['size']
+    assert '.fits' == element.attr['format']
+    assert data == element.getValue()
+
+
+def test_uploadBlob2():
+    data = os.urandom(100001)
+    suc, received = uploadBlob(io.BytesIO(data), blobSize=len(data))
+    assert suc
+    text = received.split(b'>', 2)[2].split(b'<', 1)[0]
+    assert base64.b64encode(data) == text
+
+
+def test_uploadBlob3():
+    data = os.urandom(100001)
+    source = io.BytesIO(data)
+    source.seek(1)
+    suc, received = uploadBlob(source)
+    assert suc
+    element = indiXML.parseETree(ETree.fromstring(received)).elt_list[0]
+    assert '100000' == element.attr['size']
+    assert data[1:] == element.getValue()
+
+
+def test_sendOneBlob2():
+    client = indiBase.Client()
+    client.blobUpload = True
+    data = bytes(10 * client.BLOB_CHUNK_SIZE)
+    with mock.patch.object(client,
+                           '_writeData',
+                           side_effect=[True, True, False]) as writeData:
+        assert not client.sendOneBlob(blobName='CCD1', blobBuffer=data)
+    assert 3 == writeData.call_count
+    assert not client.blobUpload
+
+
+def test_setBlobConnection1():
+    client = indiBase.Client(host=('localhost', 7624))
+    assert client.setBlobConnection(True)
+    assert client.blobConnection
+    assert not client.blobConnected
+
+
+def test_setBlobConnection2(qtbot):
+    server = StandInServer(connections=2)
+    server.start()
+    client = indiBase.Client(host=('localhost', server.port))
+    client.devices = {'CCD': indiBase.Device('CCD')}
+    client.setBlobConnection(True)
+    assert client.connectServer()
+    assert client.socket.waitForConnected(3000)
+    assert client.blobSocket.waitForConnected(3000)
+    assert client.blobConnected
+    assert client.setBlobMode('Also', deviceName='CCD', propertyName='CCD1')
+    qtbot.waitUntil(lambda: not client.blobOutgoing)
+    client.socket.disconnectFromHost()
+    client.blobSocket.disconnectFromHost()
+    server.join(10)
+    assert b'' == bytes(server.data[0])
+    assert b'<getProperties version="1.7" device="CCD" />\n' \
+           b'<enableBLOB device="CCD">Only</enableBLOB>\n' \
+           b'<enableBLOB device="CCD" name="CCD1">Only</enableBLOB>\n' \
+           == bytes(server.data[1])
+
+
+def test_watchBlobDevice1():
+    client = indiBase.Client()
+    with mock.patch.object(client,
+                           '_sendCmd',
+                           return_value=True):
+        assert not client._watchBlobDevice('CCD')
+        client.blobConnected = True
+        client._getDeviceReference('CCD')
+        assert 2 == client._sendCmd.call_count
+        assert client._sendCmd.call_args[1]['blobChannel']
+        client._getDeviceReference('CCD')
+        assert 2 == client._sendCmd.call_count
+
+
+def test_blobParser1():
+    client = indiBase.Client()
+    client.connected = True
+    client.devices = {'CCD': indiBase.Device('CCD')}
+    client.parser.feed(b'<defBLOBVector device="CCD" name="CCD1" state="Idle" '
+                       b'perm="ro"><defBLOB name="CCD1"/></defBLOBVector>')
+    received = []
+    client.signals.newBLOB.connect(lambda *args: received.append(args))
+    client.blobParser.feed(b'<setBLOBVector device="CCD" name="CCD1" state="Ok">'
+                           b'<oneBLOB name="CCD1" size="4" format=".fits">'
+                           b'dGVzdA==</oneBLOB></setBLOBVector>')
+    assert [('CCD', 'CCD1')] == received
+    assert b'test' == client.devices['CCD'].getBlob('CCD1')['value']
+
+
+def test_getBlobMode1():
+    client = indiBase.Client()
+    client.devices = {'CCD': indiBase.Device('CCD'),
+                      'Guider': indiBase.Device('Guider')}
+    with mock.patch.object(client,
+                           '_sendCmd',
+                           return_value=True):
+        assert client.setBlobMode('Also', deviceName='CCD')
+        assert client.setBlobMode('Never', deviceName='Guider', propertyName='CCD1')
+    assert 'Also' == client.getBlobMode(deviceName='CCD', propertyName='CCD1')
+    assert 'Also' == client.getBlobMode(deviceName='CCD')
+    assert 'Never' == client.getBlobMode(deviceName='Guider', propertyName='CCD1')
+    assert 'Never' == client.getBlobMode(deviceName='Guider', propertyName='CCD2')
+    assert 'Never' == client.getBlobMode(deviceName='Focuser')
+
+
+def test_getBlobMode2():
+    client = indiBase.Client()
+    client.devices = {'CCD': indiBase.Device('CCD')}
+    with mock.patch.object(client,
+                           '_sendCmd',
+                           return_value=True):
+        client.setBlobMode('Also', deviceName='CCD', propertyName='CCD1')
+        client.blobConnected = True
+        assert 'Only' == client.getBlobMode(deviceName='CCD', propertyName='CCD1')
+        client.blobConnected = False
+        assert 'Also' == client.getBlobMode(deviceName='CCD', propertyName='CCD1')
+
+
+def test_replayBlobModes1():
+    client = indiBase.Client()
+    client.devices = {'CCD': indiBase.Device('CCD'),
+                      'Guider': indiBase.Device('Guider')}
+    with mock.patch.object(client,
+                           '_sendCmd',
+                           return_value=True):
+        client.setBlobMode('Also', deviceName='CCD', propertyName='CCD1')
+        client.setBlobMode('Never', deviceName='Guider', propertyName='CCD1')
+        client.setBlobMode('Also', deviceName='CCD')
+    client.devices = {}
+    call_ref = [indiXML.enableBLOB('Also', indi_attr={'device': 'CCD',
+                                                      'name': 'CCD1'}),
+                indiXML.enableBLOB('Also', indi_attr={'device': 'CCD'}),
+                ]
+    with mock.patch.object(client,
+                           '_sendCmd',
+                           return_value=True):
+        client._getDeviceReference('CCD')
+        call_val = [call[0][0] for call in client._sendCmd.call_args_list]
+    assert [cmd.toXML() for cmd in call_ref] == [cmd.toXML() for cmd in call_val]
+
+
+def test_switchBlobChannel1():
+    client = indiBase.Client()
+    client.devices = {'CCD': indiBase.Device('CCD'),
+                      'Guider': indiBase.Device('Guider')}
+    client.blobModes = {('CCD', 'CCD1'): 'Also',
+                        ('Guider', 'CCD1'): 'Never',
+                        ('Guider', ''): 'Also'}
+    with mock.patch.object(client,
+                           '_sendCmd',
+                           return_value=True):
+        assert client._switchBlobChannel(True)
+        calls = [(call[0][0].toXML(), call[1].get('blobChannel', False))
+                 for call in client._sendCmd.call_args_list]
+    assert client.blobConnected
+    assert (b'<enableBLOB device="CCD" name="CCD1">Never</enableBLOB>', False) in calls
+    assert (b'<enableBLOB device="Guider">Never</enableBLOB>', False) in calls
+    assert 2 == len([call for call in calls if not call[1]])
+    assert (b'<enableBLOB device="CCD" name="CCD1">Only</enableBLOB>', True) in calls
+    assert (b'<enableBLOB device="Guider" name="CCD1">Never</enableBLOB>', True) in calls
+    assert calls[-1] == (b'<enableBLOB device="Guider">Only</enableBLOB>', True)
+
+
+def test_switchBlobChannel2():
+    client = indiBase.Client()
+    client.devices = {'CCD': indiBase.Device('CCD')}
+    client.blobModes = {('CCD', 'CCD1'): 'Also',
+                        ('CCD', 'CCD2'): 'Never'}
+    client.blobConnected = True
+    with mock.patch.object(client,
+                           '_sendCmd',
+                           return_value=True):
+        assert client._switchBlobChannel(False)
+        calls = [(call[0][0].toXML(), call[1].get('blobChannel', False))
+                 for call in client._sendCmd.call_args_list]
+    assert not client.blobConnected
+    assert [(b'<enableBLOB device="CCD" name="CCD1">Never</enableBLOB>', True),
+            (b'<enableBLOB device="CCD" name="CCD1">Also</enableBLOB>', False),
+            (b'<enableBLOB device="CCD" name="CCD2">Never</enableBLOB>', False),
+            ] == calls
+
+
+def test_setBlobConnection3(qtbot):
+    server = StandInServer(connections=2)
+    server.start()
+    client = indiBase.Client(host=('localhost', server.port))
+    client.devices = {'CCD': indiBase.Device('CCD')}
+    client.blobModes = {('CCD', 'CCD1'): 'Also'}
+    assert client.connectServer()
+    assert client.socket.waitForConnected(3000)
+    client.setBlobConnection(True)
+    assert client.blobSocket.waitForConnected(3000)
+    qtbot.waitUntil(lambda: not client.outgoing and not client.blobOutgoing)
+    client.setBlobConnection(False)
+    assert not client.blobConnected
+    qtbot.waitUntil(lambda: not client.outgoing)
+    client.socket.disconnectFromHost()
+    server.join(10)
+    assert b'<enableBLOB device="CCD" name="CCD1">Never</enableBLOB>\n' \
+           b'<enableBLOB device="CCD" name="CCD1">Also</enableBLOB>\n' \
+           == bytes(server.data[0])
+    assert b'<getProperties version="1.7" device="CCD" />\n' \
+           b'<enableBLOB device="CCD">Only</enableBLOB>\n' \
+           b'<enableBLOB device="CCD" name="CCD1">Only</enableBLOB>\n' \
+           b'<enableBLOB device="CCD" name="CCD1">Never</enableBLOB>\n' \
+           == bytes(server.data[1])
+
+
+def test_setReceiveThread1():
+    client = indiBase.Client()
+    assert not client.blobInflate
+    assert client.setReceiveThread(True)
+    assert client.receiveThread.isRunning()
+    assert client.receiver.thread() is client.receiveThread
+    assert client.blobInflate
+    assert client.setReceiveThread(False)
+    assert client.receiveThread is None
+    assert client.receiver is None
+    assert not client.blobInflate
+
+
+def test_receiveThread1(qtbot):
+    client = indiBase.Client()
+    client.connected = True
+    client.setReceiveThread(True)
+    threads = []
+    client.signals.defNumber.connect(
+        lambda *args: threads.append(PyQt5.QtCore.QThread.currentThread()))
+    with mock.patch.object(client.parser,
+                           'feed',
+                           side_effect=lambda data: threads.append(
+                               PyQt5.QtCore.QThread.currentThread())):
+        with qtbot.waitSignal(client.receiver.received):
+            client.receiver.received.emit(client.parser, b'test')
+        qtbot.waitUntil(lambda: len(threads) == 1)
+    assert threads[0] is client.receiveThread
+    client.receiver.received.emit(client.parser,
+                                  b'<defNumberVector device="CCD" name="TEMP" '
+                                  b'state="Idle" perm="ro"><defNumber name="T" '
+                                  b'format="%f" min="0" max="1" step="0">0.5'
+                                  b'</defNumber></defNumberVector>')
+    qtbot.waitUntil(lambda: len(threads) == 2)
+    assert threads[1] is app.thread()
+    with client.storeLock:
+        assert 0.5 == client.devices['CCD'].getNumber('TEMP')['T']
+    client.setReceiveThread(False)
+
+
+def test_receiveThread2(qtbot):
+    client = indiBase.Client()
+    client.connected = True
+    client.setReceiveThread(True)
+    parser = client.parser
+    client.clearParser()
+    with qtbot.assertNotEmitted(client.signals.newDevice, wait=200):
+        client.receiver.received.emit(parser,
+                                      b'<message device="CCD" message="test"/>')
+    assert not client.devices
+    client.setReceiveThread(False)
+
+
+def test_receiveThread3(qtbot):
+    server = StandInServer()
+    server.start()
+    client = indiBase.Client(host=('localhost', server.port))
+    client.blobModes[('CCD', '')] = 'Also'
+    client.setReceiveThread(True)
+    assert client.connectServer()
+    assert client.socket.waitForConnected(3000)
+    with qtbot.waitSignal(client.signals.newDevice):
+        client.receiver.received.emit(client.parser,
+                                      b'<message device="CCD" message="test"/>')
+    qtbot.wait(100)
+    client.setReceiveThread(False)
+    client.socket.disconnectFromHost()
+    server.join(10)
+    assert b'<enableBLOB device="CCD">Also</enableBLOB>\n' == bytes(server.data[0])
+
+
+def sendSequence(client):
+    device = indiBase.Device('CCD')
+    for propertyName in ['CCD_BINNING', 'CCD_FRAME_TYPE', 'CCD_EXPOSURE']:
+        setattr(device, propertyName, indiBase.Property())
+    client.devices = {'CCD': device}
+    suc = client.sendNewNumber(deviceName='CCD',
+                               propertyName='CCD_BINNING',
+                               elements='HOR_BIN',
+                               number=2)
+    suc = suc and client.sendNewSwitch(deviceName='CCD',
+                                       propertyName='CCD_FRAME_TYPE',
+                                       elements='FRAME_LIGHT')
+    suc = suc and client.sendNewNumber(deviceName='CCD',
+                                       propertyName='CCD_EXPOSURE',
+                                       elements='CCD_EXPOSURE_VALUE',
+                                       number=1)
+    return suc
+
+
+def test_writeCmd1():
+    server = StandInServer()
+    server.start()
+    client = indiBase.Client(host=('localhost', server.port))
+    assert client.connectServer()
+    assert client.socket.waitForConnected(3000)
+    with mock.patch.object(client.socket,
+                           'write',
+                           wraps=client.socket.write) as write:
+        assert sendSequence(client)
+        assert 3 == write.call_count
+        assert not client.outgoing
+    client.socket.disconnectFromHost()
+    server.join(10)
+    received = bytes(server.data[0])
+    assert 3 == received.count(b'\n')
+    assert received.index(b'CCD_BINNING') < received.index(b'CCD_FRAME_TYPE')
+    assert received.index(b'CCD_FRAME_TYPE') < received.index(b'CCD_EXPOSURE')
+
+
+def test_batch1():
+    server = StandInServer()
+    server.start()
+    client = indiBase.Client(host=('localhost', server.port))
+    assert client.connectServer()
+    assert client.socket.waitForConnected(3000)
+    with mock.patch.object(client.socket,
+                           'write',
+                           wraps=client.socket.write) as write:
+        with client.batch():
+            assert sendSequence(client)
+            with client.batch():
+                client.watchDevice('CCD')
+            assert 0 == write.call_count
+        assert 1 == write.call_count
+        assert not client.outgoing
+    client.socket.disconnectFromHost()
+    server.join(10)
+    assert bytes(server.data[0]).endswith(b'<getProperties version="1.7" device="CCD" />\n')
+
+
+def test_batch2():
+    client = indiBase.Client()
+    client.connected = True
+    client.blobUpload = True
+    with mock.patch.object(client.socket,
+                           'write',
+                           return_value=10) as write:
+        with client.batch():
+            client.watchDevice('CCD')
+        assert 0 == write.call_count
+        assert client.outgoing
+        client.finishBlob()
+        assert 2 == write.call_count
+        assert not client.outgoing
+
+
+def test_connectionState1(qtbot):
+    server = StandInServer()
+    server.start()
+    client = indiBase.Client(host=('localhost', server.port))
+    states = []
+    client.signals.connectionState.connect(states.append)
+    with qtbot.waitSignal(client.signals.serverConnected):
+        assert client.connectServer()
+        assert 'Connecting' == client.getConnectionState()
+        assert not client.isServerConnected()
+    assert 'Connected' == client.getConnectionState()
+    assert client.isServerConnected()
+    with qtbot.waitSignal(client.signals.serverDisconnected):
+        assert client.disconnectServer()
+    assert ['Connecting', 'Connected', 'Disconnecting', 'Disconnected'] == states
+    server.join(10)
+
+
+def test_connectionState2(qtbot):
+    server = socket.socket()
+    server.bind(('localhost', 0))
+    port = server.getsockname()[1]
+    server.close()
+    client = indiBase.Client(host=('localhost', port))
+    client.CONNECTION_BACKOFF = 100
+    with qtbot.assertNotEmitted(client.signals.serverConnected):
+        with qtbot.waitSignal(client.signals.serverError):
+            assert client.connectServer()
+        assert 'Backoff' == client.getConnectionState()
+        assert not client.connectServer()
+    qtbot.waitUntil(lambda: 'Disconnected' == client.getConnectionState())
+
+
+def test_connectionState3(qtbot):
+    client = indiBase.Client(host=('localhost', 7624))
+    client.state = 'Connecting'
+    with qtbot.waitSignal(client.signals.serverError) as blocker:
+        client._handleConnectTimeout()
+    assert ['Connection timeout'] == blocker.args
+    assert 'Backoff' == client.getConnectionState()
+    assert client.disconnectServer()
+    assert 'Disconnected' == client.getConnectionState()
+    assert not client.backoffTimer.isActive()
+
+
+def test_requestNewNumber1(qtbot):
+    client = indiBase.Client()
+    client.connected = True
+    client.parser.feed(b'<defNumberVector device="CCD" name="TEMP" state="Idle" '
+                       b'perm="rw" timeout="10"><defNumber name="T" format="%f" '
+                       b'min="0" max="1" step="0">0.5</defNumber></defNumberVector>')
+    with mock.patch.object(client, '_sendCmd', return_value=True):
+        command = client.requestNewNumber(deviceName='CCD',
+                                          propertyName='TEMP',
+                                          elements='T',
+                                          number=0.2)
+    assert isinstance(command, indiBase.Command)
+    assert 10 == command.timeout
+    assert command.timer.isActive()
+    with qtbot.waitSignal(command.finished) as blocker:
+        client.parser.feed(b'<setNumberVector device="CCD" name="TEMP" state="Ok">'
+                           b'<oneNumber name="T">0.2</oneNumber></setNumberVector>')
+    assert ['Ok'] == blocker.args
+    assert 'Ok' == command.wait()
+    assert 0.2 == client.getDevice('CCD').getNumber('TEMP')['T']
+
+
+def test_requestNewNumber2(qtbot):
+    client = indiBase.Client()
+    client.connected = True
+    client.parser.feed(b'<defNumberVector device="CCD" name="TEMP" state="Idle" '
+                       b'perm="rw" timeout="0.05"><defNumber name="T" format="%f" '
+                       b'min="0" max="1" step="0">0.5</defNumber></defNumberVector>')
+    with mock.patch.object(client, '_sendCmd', return_value=True):
+        command = client.requestNewNumber(deviceName='CCD',
+                                          propertyName='TEMP',
+                                          elements='T',
+                                          number=0.2)
+    assert 'Timeout' == command.wait()
+    command = client.requestNewSwitch(deviceName='CCD',
+                                      propertyName='CONNECTION',
+                                      elements='CONNECT')
+    assert 'Failed' == command.wait()
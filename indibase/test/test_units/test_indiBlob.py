@@ -0,0 +1,272 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+# INDIBASE
+#
+# GUI with PyQT5 for python
+# Python  v3.7.4
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import base64
+import io
+import os
+import tempfile
+import threading
+import zlib
+# external packages
+import pytest
+# local import
+from indibase.indiBlob import BlobDecoder, BlobSpool, BlobMap, BlobInflater
+from indibase.indiBlob import FrameRing, FrameDecoder
+from indibase.indiBlob import blobSize, encodeBlob, sourceSize
+
+data = os.urandom(100000)
+text = base64.encodebytes(data)
+
+
+def test_BlobDecoder_1():
+    decoder = BlobDecoder(len(data))
+    decoder.feed(text)
+    assert data == decoder.finish()
+
+
+def test_BlobDecoder_2():
+    decoder = BlobDecoder(len(data))
+    for i in range(0, len(text), 997):
+        decoder.feed(text[i:i + 997])
+    assert data == decoder.finish()
+
+
+def test_BlobDecoder_3():
+    decoder = BlobDecoder(0)
+    for i in range(0, len(text), 1000):
+        decoder.feed(text[i:i + 1000])
+    assert data == decoder.finish()
+
+
+def test_BlobDecoder_4():
+    decoder = BlobDecoder(2 * len(data))
+    decoder.feed(text)
+    assert data == decoder.finish()
+
+
+def test_BlobDecoder_5():
+    decoder = BlobDecoder(2)
+    decoder.feed(b'QUI')
+    assert b'AB' == decoder.finish()
+
+
+def test_BlobDecoder_6():
+    decoder = BlobDecoder(2)
+    decoder.feed(b'QUJDR')
+    assert b'ABC' == decoder.finish()
+
+
+def test_blobSize():
+    assert 10 == blobSize({'size': '10'})
+    assert 0 == blobSize({'size': 'x'})
+    assert 0 == blobSize({})
+
+
+def test_BlobSpool_1(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    spool = BlobSpool()
+    for i in range(0, len(text), 997):
+        spool.feed(text[i:i + 997])
+    buffer = spool.finish()
+    assert isinstance(buffer, BlobMap)
+    assert data == buffer[:]
+    assert '' == buffer.path
+    assert [] == list(tmp_path.iterdir())
+    with pytest.raises(TypeError):
+        buffer[0] = 0
+
+
+def test_BlobSpool_2(tmp_path):
+    spool = BlobSpool(directory=str(tmp_path), suffix='.fits')
+    spool.feed(text)
+    buffer = spool.finish()
+    assert data == buffer[:]
+    assert buffer.path.endswith('.fits')
+    with open(buffer.path, 'rb') as file:
+        assert data == file.read()
+
+
+def test_BlobSpool_3(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    spool = BlobSpool()
+    assert b'' == spool.finish()
+    assert [] == list(tmp_path.iterdir())
+
+
+def test_BlobSpool_4(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    spool = BlobSpool()
+    spool.feed(text)
+    spool._discard()
+    assert spool.file.closed
+    assert [] == list(tmp_path.iterdir())
+
+
+def test_encodeBlob_1():
+    chunks = list(encodeBlob(data, chunkSize=3000))
+    assert 34 == len(chunks)
+    assert base64.b64encode(data) == b''.join(chunks)
+
+
+def test_encodeBlob_2():
+    chunks = list(encodeBlob(io.BytesIO(data), chunkSize=1000))
+    assert all(len(chunk) == 1332 for chunk in chunks[:-1])
+    assert base64.b64encode(data) == b''.join(chunks)
+
+
+def test_encodeBlob_3():
+    assert [] == list(encodeBlob(b''))
+    assert [] == list(encodeBlob(io.BytesIO()))
+
+
+class Stream(io.RawIOBase):
+    def readable(self):
+        return True
+
+
+class UnseekableFile(io.FileIO):
+    def seekable(self):
+        return False
+
+
+def test_sourceSize():
+    assert 100000 == sourceSize(data)
+    assert 100000 == sourceSize(memoryview(data))
+    source = io.BytesIO(data)
+    source.seek(1000)
+    assert 99000 == sourceSize(source)
+    assert 1000 == source.tell()
+    assert 0 == sourceSize(Stream())
+
+
+def test_sourceSize_2(tmp_path):
+    path = tmp_path / 'blob.fits'
+    path.write_bytes(data)
+    with UnseekableFile(path) as source:
+        assert 100000 == sourceSize(source)
+
+
+def test_BlobInflater_1():
+    compressed = base64.encodebytes(zlib.compress(data))
+    inflater = BlobInflater(BlobDecoder(len(data)))
+    for i in range(0, len(compressed), 997):
+        inflater.feed(compressed[i:i + 997])
+    assert data == inflater.finish()
+
+
+def test_BlobInflater_2():
+    attr = {'format': '.fits'}
+    inflater = BlobInflater(BlobDecoder(len(data)), attr=attr)
+    inflater.feed(text)
+    assert inflater.decompressor is None
+    assert data == inflater.finish()
+    assert '.fits.z' == attr['format']
+
+
+def test_BlobInflater_3(tmp_path):
+    compressed = zlib.compress(data)
+    attr = {'format': '.fits'}
+    spool = BlobSpool(directory=str(tmp_path), suffix='.fits')
+    inflater = BlobInflater(spool, attr=attr)
+    inflater.feed(base64.encodebytes(compressed[:-100]))
+    assert compressed[:-100] == inflater.finish()
+    assert '.fits.z' == attr['format']
+    assert [] == list(tmp_path.iterdir())
+
+
+def writeFrame(ring, frame):
+    decoder = FrameDecoder(ring=ring, size=len(frame))
+    decoder.feed(base64.encodebytes(frame))
+    return decoder.finish()
+
+
+def test_FrameRing_1():
+    ring = FrameRing(slots=3)
+    assert (None, None) == ring.read()
+    assert (None, None) == ring.latest()
+    for i in range(5):
+        assert bytes([i]) * 10 == writeFrame(ring, bytes([i]) * 10)
+    assert 3 == len(ring)
+    assert 2 == ring.dropped
+    sequence, frame = ring.read()
+    assert 2 == sequence
+    assert bytes([2]) * 10 == frame
+    sequence, frame = ring.latest()
+    assert 4 == sequence
+    assert bytes([4]) * 10 == frame
+    assert 3 == ring.dropped
+    assert 0 == len(ring)
+    assert (None, None) == ring.read()
+
+
+def test_FrameRing_2():
+    ring = FrameRing(slots=2)
+    for i in range(2):
+        writeFrame(ring, data)
+    buffers = [id(buffer) for buffer in ring.buffers]
+    for i in range(10):
+        writeFrame(ring, data[:1000 * i + 1])
+    assert buffers == [id(buffer) for buffer in ring.buffers]
+
+
+def test_FrameDecoder_1():
+    ring = FrameRing(slots=2, size=10)
+    frame = writeFrame(ring, data)
+    assert data == frame
+    writeFrame(ring, data)
+    frame = writeFrame(ring, b'test')
+    assert b'test' == frame
+    assert data == ring.read()[1]
+
+
+def test_FrameRing_3():
+    ring = FrameRing(slots=2)
+    writeFrame(ring, b'A' * 12)
+    writeFrame(ring, b'B' * 12)
+    decoder = FrameDecoder(ring=ring, size=12)
+    text = base64.encodebytes(b'C' * 12)
+    decoder.feed(text[:8])
+    assert 1 == ring.dropped
+    assert (1, b'B' * 12) == ring.read()
+    assert (None, None) == ring.read()
+    assert (1, b'B' * 12) == ring.latest()
+    decoder.feed(text[8:])
+    assert b'C' * 12 == decoder.finish()
+    assert (2, b'C' * 12) == ring.read()
+
+
+def test_FrameRing_4():
+    ring = FrameRing(slots=1)
+    writeFrame(ring, b'A' * 12)
+    FrameDecoder(ring=ring, size=12)
+    assert (None, None) == ring.latest()
+    assert (None, None) == ring.read()
+    assert 1 == ring.dropped
+
+
+def test_FrameRing_5():
+    lock = threading.RLock()
+    ring = FrameRing(slots=2, lock=lock)
+    assert isinstance(FrameRing().lock, type(lock))
+    result = []
+    with lock:
+        thread = threading.Thread(target=lambda: result.append(ring.read()))
+        thread.start()
+        thread.join(0.1)
+        assert not result
+        writeFrame(ring, b'A' * 12)
+    thread.join(1)
+    assert 0 == result[0][0]
+    assert b'A' * 12 == result[0][1]
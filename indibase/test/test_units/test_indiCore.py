@@ -0,0 +1,300 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+# INDIBASE
+#
+# GUI with PyQT5 for python
+# Python  v3.7.4
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import time
+# external packages
+# local import
+from indibase.indiCore import ClientCore, makeEvent
+from indibase.indiCore import ServerEvent, DisconnectEvent, DeviceEvent, PropertyEvent
+from indibase.indiCore import MessageEvent, CommandHandle
+
+defNumber = (b'<defNumberVector device="Mount" name="EQ" state="Idle" perm="rw">'
+             b'<defNumber name="RA" format="%10.6m" min="0" max="24" step="0">'
+             b'1.5</defNumber></defNumberVector>')
+setNumber = (b'<setNumberVector device="Mount" name="EQ" state="Ok">'
+             b'<oneNumber name="RA">2.5</oneNumber></setNumberVector>')
+message = b'<message device="Mount" timestamp="2019-01-01T00:00:00" message="test"/>'
+
+
+def makeCore(engine='etree'):
+    core = ClientCore(engine=engine)
+    core.connectionMade()
+    return core
+
+
+def test_makeEvent():
+    event = makeEvent('newNumber', 'Mount', 'EQ')
+    assert isinstance(event, PropertyEvent)
+    assert ('Mount', 'EQ') == event.args
+    assert 'EQ' == event.name
+    assert () == makeEvent('serverConnected').args
+    assert isinstance(makeEvent('newDevice', 'Mount'), DeviceEvent)
+    assert isinstance(makeEvent('serverDisconnected', {}), DisconnectEvent)
+
+
+def test_connectionMade():
+    core = ClientCore()
+    assert not core.isServerConnected()
+    assert core.connectionMade()
+    assert core.isServerConnected()
+    assert [ServerEvent('serverConnected')] == core.takeEvents()
+    assert [] == core.takeEvents()
+
+
+def test_receive1():
+    for engine in ['etree', 'direct']:
+        core = makeCore(engine)
+        core.takeEvents()
+        events = core.receive(defNumber[:50])
+        events += core.receive(defNumber[50:])
+        assert [DeviceEvent('newDevice', 'Mount'),
+                PropertyEvent('newProperty', 'Mount', 'EQ'),
+                PropertyEvent('defNumber', 'Mount', 'EQ'),
+                ] == events
+        assert [PropertyEvent('newNumber', 'Mount', 'EQ')] == core.receive(setNumber)
+        assert 2.5 == core.getDevice('Mount').getNumber('EQ')['RA']
+
+
+def test_receive2():
+    core = makeCore()
+    core.receive(defNumber)
+    events = core.receive(message)
+    assert [MessageEvent('newMessage', 'Mount', 'test')] == events
+
+
+def test_receive3():
+    core = ClientCore()
+    assert [] == core.receive(defNumber)
+    assert core.getDevice('Mount') is None
+
+
+def test_dataToSend1():
+    core = ClientCore()
+    assert not core.watchDevice('Mount')
+    assert b'' == core.dataToSend()
+    core.connectionMade()
+    assert core.watchDevice('Mount')
+    core.receive(defNumber)
+    assert core.sendNewNumber(deviceName='Mount', propertyName='EQ',
+                              elements='RA', number=2.5)
+    assert (b'<getProperties version="1.7" device="Mount" />\n'
+            b'<newNumberVector device="Mount" name="EQ">'
+            b'<oneNumber name="RA">2.5</oneNumber></newNumberVector>\n'
+            == core.dataToSend())
+    assert b'' == core.dataToSend()
+
+
+def test_connectionLost1():
+    core = makeCore()
+    core.receive(defNumber)
+    devices = core.devices
+    assert core.connectionLost()
+    assert not core.isServerConnected()
+    assert [DisconnectEvent('serverDisconnected', devices),
+            DeviceEvent('removeDevice', 'Mount'),
+            ] == core.takeEvents()
+    assert {} == core.devices
+
+
+def test_setConnectionTimeout():
+    core = ClientCore()
+    assert core.setConnectionTimeout(seconds=5)
+    assert 5000 == core.CONNECTION_TIMEOUT
+    assert core.setConnectionTimeout(seconds=0, microseconds=500000)
+    assert 500 == core.CONNECTION_TIMEOUT
+
+
+def test_watchedDevices():
+    core = makeCore()
+    assert core.watchDevice('Mount')
+    assert core.watchDevice('Mount')
+    assert core.watchDevice()
+    assert ['Mount', ''] == core.watchedDevices
+    core.dataToSend()
+    core.connectionLost()
+    core.connectionMade()
+    assert (b'<getProperties version="1.7" device="Mount" />\n'
+            b'<getProperties version="1.7" />\n'
+            == core.dataToSend())
+
+
+def test_commandTimeout():
+    core = makeCore()
+    assert 60 == core._commandTimeout('Mount', 'EQ')
+    core.receive(defNumber.replace(b'perm="rw"', b'perm="rw" timeout="5"'))
+    assert 5 == core._commandTimeout('Mount', 'EQ')
+    assert 60 == core._commandTimeout('Mount', 'AZ')
+
+
+def test_requestNewNumber1():
+    core = makeCore()
+    core.receive(defNumber)
+    commands = [core.requestNewNumber(deviceName='Mount',
+                                      propertyName='EQ',
+                                      elements='RA',
+                                      number=i) for i in range(2)]
+    assert isinstance(commands[0], CommandHandle)
+    assert not commands[0].done()
+    core.receive(setNumber.replace(b'state="Ok"', b'state="Busy"'))
+    assert not commands[0].done()
+    core.receive(setNumber)
+    assert 'Ok' == commands[0].state
+    assert not commands[1].done()
+    core.receive(setNumber.replace(b'state="Ok"', b'state="Alert"'))
+    assert 'Alert' == commands[1].state
+    assert not core.commands
+
+
+def test_requestNewNumber2():
+    core = makeCore()
+    core.receive(defNumber)
+    command = core.requestNewNumber(deviceName='Mount',
+                                    propertyName='EQ',
+                                    elements='RA',
+                                    number=1)
+    command._resolve('Timeout')
+    second = core.requestNewNumber(deviceName='Mount',
+                                   propertyName='EQ',
+                                   elements='RA',
+                                   number=2)
+    core.receive(setNumber)
+    assert 'Timeout' == command.state
+    assert 'Ok' == second.state
+    third = core.requestNewNumber(deviceName='Mount',
+                                  propertyName='EQ',
+                                  elements='RA',
+                                  number=3)
+    core.connectionLost()
+    assert 'Failed' == third.state
+    assert 'Failed' == core.requestNewSwitch(deviceName='Mount',
+                                             propertyName='EQ',
+                                             elements='RA').state
+
+
+def test_requestNewNumber3():
+    core = makeCore()
+    core.receive(defNumber)
+    command = core.requestNewNumber(deviceName='Mount',
+                                    propertyName='EQ',
+                                    elements='RA',
+                                    number=1)
+    command._handleTimeout()
+    assert 'Timeout' == command.state
+    assert not core.commands
+    second = core.requestNewNumber(deviceName='Mount',
+                                   propertyName='EQ',
+                                   elements='RA',
+                                   number=2.5)
+    core.receive(setNumber.replace(b'2.5', b'1'))
+    assert not second.done()
+    assert not core.lateCommands
+    core.receive(setNumber.replace(b'state="Ok"', b'state="Busy"'))
+    core.receive(setNumber)
+    assert 'Ok' == second.state
+    assert not core.commands
+    assert not core._dropCommand(second)
+
+
+def test_requestNewNumber4():
+    core = makeCore()
+    core.receive(defNumber)
+    command = core.requestNewNumber(deviceName='Mount',
+                                    propertyName='EQ',
+                                    elements='RA',
+                                    number=1)
+    command._handleTimeout()
+    second = core.requestNewNumber(deviceName='Mount',
+                                   propertyName='EQ',
+                                   elements={'RA': 2.5})
+    core.receive(setNumber)
+    assert 'Ok' == second.state
+    assert core.lateCommands
+    third = core.requestNewNumber(deviceName='Mount',
+                                  propertyName='EQ',
+                                  elements='RA',
+                                  number=3)
+    core.receive(setNumber.replace(b'2.5', b'x'))
+    assert 'Ok' == third.state
+
+
+def test_requestNewNumber5():
+    core = makeCore()
+    core.receive(defNumber)
+    command = core.requestNewNumber(deviceName='Mount',
+                                    propertyName='EQ',
+                                    elements='RA',
+                                    number=1)
+    command._handleTimeout()
+    core.receive(setNumber)
+    assert not core.lateCommands
+    second = core.requestNewNumber(deviceName='Mount',
+                                   propertyName='EQ',
+                                   elements='RA',
+                                   number=2)
+    core.receive(setNumber)
+    assert 'Ok' == second.state
+
+
+def test_requestNewSwitch():
+    core = makeCore()
+    core.receive(b'<defSwitchVector device="Mount" name="PARK" state="Idle" perm="rw" '
+                 b'rule="OneOfMany"><defSwitch name="PARK">Off</defSwitch>'
+                 b'<defSwitch name="UNPARK">On</defSwitch></defSwitchVector>')
+    park = (b'<setSwitchVector device="Mount" name="PARK" state="Ok">'
+            b'<oneSwitch name="PARK">On</oneSwitch>'
+            b'<oneSwitch name="UNPARK">Off</oneSwitch></setSwitchVector>')
+    unpark = (b'<setSwitchVector device="Mount" name="PARK" state="Ok">'
+              b'<oneSwitch name="PARK">Off</oneSwitch>'
+              b'<oneSwitch name="UNPARK">On</oneSwitch></setSwitchVector>')
+    command = core.requestNewSwitch(deviceName='Mount',
+                                    propertyName='PARK',
+                                    elements='PARK')
+    command._handleTimeout()
+    second = core.requestNewSwitch(deviceName='Mount',
+                                   propertyName='PARK',
+                                   elements={'PARK': 'Off', 'UNPARK': 'On'})
+    core.receive(park)
+    assert not second.done()
+    core.receive(unpark)
+    assert 'Ok' == second.state
+
+
+def test_requestNewNumber6():
+    core = makeCore()
+    core.receive(defNumber.replace(b'perm="rw"', b'perm="rw" timeout="0.01"'))
+    command = core.requestNewNumber(deviceName='Mount',
+                                    propertyName='EQ',
+                                    elements='RA',
+                                    number=1)
+    command._handleTimeout()
+    assert core.lateCommands
+    time.sleep(0.02)
+    second = core.requestNewNumber(deviceName='Mount',
+                                   propertyName='EQ',
+                                   elements='RA',
+                                   number=2)
+    second._handleTimeout()
+    assert [('Mount', 'EQ')] == list(core.lateCommands)
+    assert 1 == len(core.lateCommands[('Mount', 'EQ')])
+    core.connectionLost()
+    assert not core.lateCommands
+
+
+def test_deviceLock():
+    core = makeCore()
+    core.receive(defNumber)
+    assert core.getDevice('Mount').lock is core.storeLock
+    core.setBlobStream(deviceName='CCD', propertyName='CCD1')
+    assert core.getBlobStream(deviceName='CCD', propertyName='CCD1').lock is core.storeLock
@@ -0,0 +1,196 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+# INDIBASE
+#
+# GUI with PyQT5 for python
+# Python  v3.7.4
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import sys
+import threading
+# external packages
+import pytest
+# local import
+from indibase.indiDevice import Device, Property, Element
+from indibase.indiDevice import parseNumber, parseSexagesimal
+
+
+def makeDevice():
+    device = Device('Mount')
+    iProperty = Property()
+    iProperty.setAttributes({'name': 'EQ', 'state': 'Ok', 'unknown': 'x'})
+    iProperty.propertyType = 'defNumberVector'
+    for name, value in [('RA', '1.5'), ('DEC', '-2.5')]:
+        element = Element()
+        element.setAttributes({'name': name, 'format': '%10.6m'})
+        element.elementType = 'defNumber'
+        element.value = value
+        iProperty.elementList[name] = element
+    device.EQ = iProperty
+    return device
+
+
+def test_parseSexagesimal1():
+    assert 12.5 == parseSexagesimal('12:30:00')
+    assert 12.5 == parseSexagesimal(' 12 30 ')
+    assert -0.5 == parseSexagesimal('-0:30:00')
+    assert -12.5 == parseSexagesimal('-12.5')
+    assert abs(12.582416 - parseSexagesimal('12:34:56.7')) < 1e-6
+
+
+def test_parseSexagesimal2():
+    with pytest.raises(ValueError):
+        parseSexagesimal('')
+
+
+def test_parseNumber1():
+    assert 12.5 == parseNumber('12.5')
+    assert 12.5 == parseNumber('12.5', '%10.6m')
+    assert 12.5 == parseNumber('12:30', '%g')
+    assert 1e-5 == parseNumber('1e-5', '%g')
+
+
+def test_parseNumber2():
+    value = parseNumber('test', '%g')
+    assert value != value
+
+
+def test_Element_setNumber():
+    element = Element()
+    element.setAttributes({'name': 'RA', 'format': '%010.6m'})
+    element.setNumber('12:30:00')
+    assert 12.5 == element.value
+    assert '12:30:00' == element.text
+
+
+def test_Element_slots():
+    element = Element()
+    with pytest.raises(AttributeError):
+        element.test = 1
+
+
+def test_Element_mapping1():
+    element = Element()
+    element['value'] = 1
+    assert 1 == element['value']
+    assert 'value' in element
+    assert 'label' not in element
+    assert 'get' not in element
+    assert ['value'] == list(element)
+
+
+def test_Element_mapping2():
+    element = Element()
+    with pytest.raises(KeyError):
+        element['label']
+    with pytest.raises(KeyError):
+        element['get']
+    with pytest.raises(KeyError):
+        element['test'] = 1
+
+
+def test_Element_mapping3():
+    element = Element()
+    assert element.get('label') is None
+    assert 'x' == element.get('label', 'x')
+    assert 'x' == element.get('test', 'x')
+
+
+def test_Element_equal():
+    element1 = Element()
+    element2 = Element()
+    element1.value = '1'
+    assert element1 != element2
+    element2.value = '1'
+    assert element1 == element2
+    assert element1 != {'value': '1'}
+
+
+def test_Property_setAttributes():
+    iProperty = Property()
+    name = ''.join(['E', 'Q'])
+    iProperty.setAttributes({'name': name,
+                             'timestamp': '2019-01-01T00:00:00',
+                             'unknown': 'x'})
+    assert 'EQ' == iProperty.name
+    assert iProperty.name is sys.intern('EQ')
+    assert 'unknown' not in iProperty
+    assert {} == iProperty['elementList']
+
+
+def test_Device_getNumber1():
+    device = makeDevice()
+    assert {'RA': '1.5', 'DEC': '-2.5'} == device.getNumber('EQ')
+
+
+def test_Device_getNumber2():
+    device = makeDevice()
+    assert {} == device.getNumber('TEST')
+
+
+def test_Device_getNumber3():
+    device = makeDevice()
+    device.EQ.propertyType = 'defTextVector'
+    assert device.getNumber('EQ') is None
+
+
+def test_Device_getText():
+    device = makeDevice()
+    device.EQ.propertyType = 'setTextVector'
+    assert {'RA': '1.5', 'DEC': '-2.5'} == device.getText('EQ')
+
+
+def test_Device_getSwitch():
+    device = makeDevice()
+    device.EQ.propertyType = 'setSwitchVector'
+    assert {'RA': '1.5', 'DEC': '-2.5'} == device.getSwitch('EQ')
+
+
+def test_Device_getLight():
+    device = makeDevice()
+    device.EQ.propertyType = 'setLightVector'
+    assert {'RA': '1.5', 'DEC': '-2.5'} == device.getLight('EQ')
+
+
+def test_Device_getBlob():
+    device = makeDevice()
+    device.EQ.propertyType = 'setBLOBVector'
+    element = Element()
+    element.value = b'123'
+    device.EQ.elementList['EQ'] = element
+    assert b'123' == device.getBlob('EQ')['value']
+
+
+def test_Device_lock():
+    lock = threading.RLock()
+    device = Device('Mount', lock=lock)
+    device.EQ = makeDevice().EQ
+    assert isinstance(Device('Mount').lock, type(lock))
+    result = []
+    with lock:
+        thread = threading.Thread(target=lambda: result.append(device.getNumber('EQ')))
+        thread.start()
+        thread.join(0.1)
+        assert not result
+    thread.join(1)
+    assert [{'RA': '1.5', 'DEC': '-2.5'}] == result
+
+
+def test_Device_lock2():
+    lock = threading.RLock()
+    device = Device('Mount', lock=lock)
+    result = []
+    with lock:
+        thread = threading.Thread(target=lambda: result.append(device.getNumber('EQ')))
+        thread.start()
+        thread.join(0.1)
+        device.EQ = makeDevice().EQ
+    thread.join(1)
+    assert [{'RA': '1.5', 'DEC': '-2.5'}] == result
@@ -0,0 +1,108 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+# INDIBASE
+#
+# GUI with PyQT5 for python
+# Python  v3.7.4
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import mmap
+# external packages
+import numpy as np
+# local import
+from indibase.indiImage import parseFitsValue, readFitsHeader, fitsToArray
+
+
+def makeFits(data, bitpix, **keywords):
+    cards = [f'{"SIMPLE":8s}= {"T":>20s}',
+             f'{"BITPIX":8s}= {bitpix:20d}',
+             f'{"NAXIS":8s}= {data.ndim:20d}',
+             ]
+    for i, length in enumerate(reversed(data.shape)):
+        cards.append(f'{"NAXIS" + str(i + 1):8s}= {length:20d}')
+    for key, value in keywords.items():
+        cards.append(f'{key:8s}= {value:>20} / comment')
+    cards.append('COMMENT   no value')
+    cards.append('END')
+    header = ''.join(f'{card:80s}' for card in cards).encode()
+    header += b' ' * (-len(header) % 2880)
+    payload = data.tobytes()
+    return header + payload + b'\x00' * (-len(payload) % 2880)
+
+
+def test_parseFitsValue():
+    assert "O'Hara" == parseFitsValue("'O''Hara '  / comment")
+    assert 'a/b' == parseFitsValue("'a/b' / comment")
+    assert 16 == parseFitsValue('                  16 / bits')
+    assert parseFitsValue('T')
+    assert not parseFitsValue('F')
+    assert 150.0 == parseFitsValue('1.5D2')
+
+
+def test_readFitsHeader1():
+    data = np.zeros((2, 3), dtype='>i2')
+    header, offset = readFitsHeader(makeFits(data, 16, BZERO=32768, OBJECT="'M31'"))
+    assert 2880 == offset
+    assert 16 == header['BITPIX']
+    assert 3 == header['NAXIS1']
+    assert 2 == header['NAXIS2']
+    assert 32768 == header['BZERO']
+    assert 'M31' == header['OBJECT']
+    assert 'COMMENT' not in header
+
+
+def test_readFitsHeader2():
+    assert ({}, None) == readFitsHeader(b'no fits')
+    header, offset = readFitsHeader(b'SIMPLE  = ' + b'T'.rjust(70))
+    assert offset is None
+
+
+def test_fitsToArray1():
+    data = np.arange(12, dtype='>f4').reshape(3, 4)
+    buffer = bytearray(makeFits(data, -32))
+    image, header = fitsToArray(buffer)
+    assert (3, 4) == image.shape
+    assert np.dtype('>f4') == image.dtype
+    assert np.array_equal(data, image)
+    assert np.shares_memory(image, np.frombuffer(buffer, dtype='u1'))
+
+
+def test_fitsToArray2():
+    data = np.array([[0, 1000], [40000, 65535]], dtype=np.int64)
+    stored = (data - 32768).astype('>i2')
+    buffer = makeFits(stored, 16, BZERO=32768, BSCALE=1)
+    image, header = fitsToArray(buffer)
+    assert np.array_equal(stored, image)
+    image, header = fitsToArray(buffer, scale=True)
+    assert np.dtype('u2') == image.dtype
+    assert np.array_equal(data, image)
+
+
+def test_fitsToArray3():
+    data = np.array([[1, 2], [3, 4]], dtype='>i4')
+    image, header = fitsToArray(makeFits(data, 32, BZERO=10, BSCALE=0.5), scale=True)
+    assert np.array_equal(data * 0.5 + 10, image)
+
+
+def test_fitsToArray4():
+    data = np.arange(24, dtype='u1').reshape(2, 3, 4)
+    buffer = makeFits(data, 8)
+    memoryMap = mmap.mmap(-1, len(buffer))
+    memoryMap.write(buffer)
+    image, header = fitsToArray(memoryMap)
+    assert (2, 3, 4) == image.shape
+    assert np.array_equal(data, image)
+
+
+def test_fitsToArray5():
+    data = np.zeros((2, 2), dtype='>i2')
+    assert fitsToArray(makeFits(data, 16)[:2881])[0] is None
+    assert fitsToArray(makeFits(data, 12))[0] is None
+    assert fitsToArray(b'no fits')[0] is None
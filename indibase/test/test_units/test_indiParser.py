@@ -0,0 +1,365 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+# INDIBASE
+#
+# GUI with PyQT5 for python
+# Python  v3.7.4
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import base64
+import os
+import tracemalloc
+import zlib
+# external packages
+import PyQt5
+import PyQt5.QtWidgets
+# local import
+from indibase import indiBase
+from indibase.indiParser import ETreeParser
+from indibase.indiBlob import BlobMap
+
+app = PyQt5.QtWidgets.QApplication.instance() or PyQt5.QtWidgets.QApplication([])
+
+defNumber = (b'<defNumberVector device="Mount" name="EQ" state="Idle" perm="rw">'
+             b'<defNumber name="RA" format="%10.6m" min="0" max="24" step="0">'
+             b'1.5</defNumber>'
+             b'<defNumber name="DEC" format="%10.6m" min="-90" max="90" step="0">'
+             b'-2.5</defNumber>'
+             b'</defNumberVector>')
+setNumber = (b'<setNumberVector device="Mount" name="EQ" state="Ok" '
+             b'timestamp="2019-01-01T00:00:00">'
+             b'<oneNumber name="RA">12.3456</oneNumber>'
+             b'<oneNumber name="DEC">45.6789</oneNumber>'
+             b'</setNumberVector>\n')
+defSwitch = (b'<defSwitchVector device="CCD" name="CONNECTION" state="Ok" '
+             b'perm="rw" rule="OneOfMany">'
+             b'<defSwitch name="CONNECT">On</defSwitch>'
+             b'<defSwitch name="DISCONNECT">Off</defSwitch>'
+             b'</defSwitchVector>')
+defBlob = (b'<defBLOBVector device="CCD" name="CCD1" state="Idle" perm="ro">'
+           b'<defBLOB name="CCD1"/>'
+           b'</defBLOBVector>')
+
+
+def makeBlob(size, name='CCD1'):
+    data = os.urandom(size)
+    text = base64.standard_b64encode(data)
+    xml = (f'<setBLOBVector device="CCD" name="{name}" state="Ok">'
+           f'<oneBLOB name="{name}" size="{size}" format=".fits">\n'.encode() + text +
+           b'\n</oneBLOB></setBLOBVector>')
+    return data, xml
+
+
+def test_ETreeParser_blob1(makeClient):
+    data, xml = makeBlob(100000)
+    client = makeClient(indiBase.Client)
+    for i in range(0, len(xml), 333):
+        client.parser.feed(xml[i:i + 333])
+    blob = client.getDevice('CCD').getBlob('CCD1')
+    assert data == blob['value']
+    assert '.fits' == blob['format']
+    assert client.parser.blobDecoder is None
+
+
+def test_ETreeParser_blob2(makeClient):
+    xml = (b'<setBLOBVector device="CCD" name="CCD1" state="Ok">'
+           b'<oneBLOB name="CCD1" size="0" format=".fits"/>'
+           b'</setBLOBVector>'
+           b'<setBLOBVector device="CCD" name="CCD2" state="Ok">'
+           b'<oneBLOB name="CCD2" size="3" format=".fits">QUJD</oneBLOB>'
+           b'</setBLOBVector>')
+    client = makeClient(indiBase.Client)
+    client.parser.feed(xml)
+    assert b'' == client.getDevice('CCD').getBlob('CCD1')['value']
+    assert b'ABC' == client.getDevice('CCD').getBlob('CCD2')['value']
+
+
+def test_ETreeParser_blob3(makeClient):
+    size = 8000000
+    text = base64.standard_b64encode(os.urandom(size))
+    client = makeClient(indiBase.Client)
+    client.parser.feed(b'<setBLOBVector device="CCD" name="CCD1" state="Ok">'
+                       b'<oneBLOB name="CCD1" size="8000000" format=".fits">')
+    tracemalloc.start()
+    for i in range(0, len(text), 65536):
+        client.parser.feed(text[i:i + 65536])
+    client.parser.feed(b'</oneBLOB></setBLOBVector>')
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert size == len(client.getDevice('CCD').getBlob('CCD1')['value'])
+    assert peak < 1.5 * size
+
+
+def test_ETreeParser_splitPartialTag():
+    assert (b'<a>', b'<oneBL') == ETreeParser._splitPartialTag(b'<a><oneBL')
+    assert (b'<a><b', b'') == ETreeParser._splitPartialTag(b'<a><b')
+
+
+def test_ETreeParser_root1(makeClient):
+    client = makeClient(indiBase.Client)
+    client.parser.feed(setNumber + b'<message device="Mount" message="test"/>')
+    assert 0 == len(client.parser.root)
+    assert 0 == client.parser.depth
+
+
+def test_ETreeParser_root2(makeClient):
+    client = makeClient(indiBase.Client)
+    for _ in range(1000):
+        client.parser.feed(setNumber)
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    # 50000 messages are more than one hour of mount updates at 10 Hz
+    for _ in range(50000):
+        client.parser.feed(setNumber)
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert end - start < 50000
+
+
+def test_DirectParser_number(makeClient):
+    client = makeClient(indiBase.Client, engine='direct')
+    for i in range(0, len(defNumber + setNumber), 7):
+        client.parser.feed((defNumber + setNumber)[i:i + 7])
+    device = client.getDevice('Mount')
+    assert {'RA': 12.3456, 'DEC': 45.6789} == device.getNumber('EQ')
+    assert 'Ok' == device.EQ['state']
+    assert 'setNumberVector' == device.EQ['propertyType']
+
+
+def test_DirectParser_signals(qtbot, makeClient):
+    client = makeClient(indiBase.Client, engine='direct')
+    with qtbot.waitSignal(client.signals.newDevice) as blocker:
+        with qtbot.waitSignal(client.signals.defNumber):
+            client.parser.feed(defNumber)
+    assert ['Mount'] == blocker.args
+    with qtbot.waitSignal(client.signals.newNumber) as blocker:
+        client.parser.feed(setNumber)
+    assert ['Mount', 'EQ'] == blocker.args
+
+
+def test_DirectParser_connect(qtbot, makeClient):
+    client = makeClient(indiBase.Client, engine='direct')
+    with qtbot.waitSignal(client.signals.deviceConnected) as blocker:
+        client.parser.feed(defSwitch)
+    assert ['CCD'] == blocker.args
+
+
+def test_DirectParser_blob(makeClient):
+    data, xml = makeBlob(100000)
+    client = makeClient(indiBase.Client, engine='direct')
+    client.parser.feed(defBlob)
+    assert 'value' not in client.getDevice('CCD').getBlob('CCD1')
+    for i in range(0, len(xml), 333):
+        client.parser.feed(xml[i:i + 333])
+    blob = client.getDevice('CCD').getBlob('CCD1')
+    assert data == blob['value']
+    assert '.fits' == blob['format']
+
+
+def test_DirectParser_message(qtbot, makeClient):
+    client = makeClient(indiBase.Client, engine='direct')
+    with qtbot.waitSignal(client.signals.newMessage) as blocker:
+        client.parser.feed(b'<message device="Mount" message="test"/>')
+    assert ['Mount', 'test'] == blocker.args
+
+
+def test_DirectParser_delProperty(qtbot, makeClient):
+    client = makeClient(indiBase.Client, engine='direct')
+    client.parser.feed(defNumber)
+    with qtbot.waitSignal(client.signals.removeProperty) as blocker:
+        client.parser.feed(b'<delProperty device="Mount" name="EQ"/>')
+    assert ['Mount', 'EQ'] == blocker.args
+    assert not hasattr(client.getDevice('Mount'), 'EQ')
+
+
+def test_DirectParser_notConnected(makeClient):
+    client = makeClient(indiBase.Client, engine='direct')
+    client.connected = False
+    client.parser.feed(defNumber + setNumber)
+    assert not client.devices
+
+
+def test_DirectParser_same(makeClient):
+    xml = defNumber + setNumber + defSwitch + defBlob
+    client1 = makeClient(indiBase.Client, engine='etree')
+    client2 = makeClient(indiBase.Client, engine='direct')
+    client1.parser.feed(xml)
+    client2.parser.feed(xml)
+    for name in ['Mount', 'CCD']:
+        device1 = dict(vars(client1.getDevice(name)), lock=None)
+        device2 = dict(vars(client2.getDevice(name)), lock=None)
+        assert device1 == device2
+
+
+def test_setProperty_inPlace1(makeClient):
+    for engine in ['etree', 'direct']:
+        client = makeClient(indiBase.Client, engine=engine)
+        client.parser.feed(defNumber)
+        device = client.getDevice('Mount')
+        elementList = device.EQ['elementList']
+        element = elementList['RA']
+        client.parser.feed(setNumber)
+        assert elementList is device.EQ['elementList']
+        assert element is device.EQ['elementList']['RA']
+        assert 12.3456 == element['value']
+        assert '12.3456' == element['text']
+        assert '%10.6m' == element['format']
+        assert '0' == element['min']
+        assert '24' == element['max']
+        assert 'Ok' == device.EQ['state']
+        assert 'rw' == device.EQ['perm']
+        assert '2019-01-01T00:00:00' == device.EQ['timestamp']
+
+
+def test_setProperty_inPlace2(makeClient):
+    for engine in ['etree', 'direct']:
+        client = makeClient(indiBase.Client, engine=engine)
+        client.parser.feed(setNumber)
+        assert {'RA': 12.3456, 'DEC': 45.6789} == client.getDevice('Mount').getNumber('EQ')
+
+
+def test_setProperty_inPlace3(makeClient):
+    for engine in ['etree', 'direct']:
+        client = makeClient(indiBase.Client, engine=engine)
+        client.parser.feed(defNumber)
+        client.parser.feed(setNumber)
+        client.parser.feed(defNumber)
+        device = client.getDevice('Mount')
+        assert {'RA': 1.5, 'DEC': -2.5} == device.getNumber('EQ')
+        assert 'Idle' == device.EQ['state']
+
+
+def test_setProperty_number(makeClient):
+    xml = (b'<setNumberVector device="Mount" name="EQ" state="Ok">'
+           b'<oneNumber name="RA">12:30:36</oneNumber>'
+           b'<oneNumber name="DEC">-0:30</oneNumber>'
+           b'</setNumberVector>\n')
+    for engine in ['etree', 'direct']:
+        client = makeClient(indiBase.Client, engine=engine)
+        client.parser.feed(defNumber)
+        client.parser.feed(xml)
+        device = client.getDevice('Mount')
+        assert {'RA': 12.51, 'DEC': -0.5} == device.getNumber('EQ')
+        assert '12:30:36' == device.EQ.elementList['RA'].text
+
+
+def test_blobStorage1(makeClient):
+    data, xml = makeBlob(100000)
+    for engine in ['etree', 'direct']:
+        client = makeClient(indiBase.Client, engine=engine)
+        assert client.setBlobStorage(threshold=50000)
+        client.parser.feed(xml)
+        value = client.getDevice('CCD').getBlob('CCD1')['value']
+        assert isinstance(value, BlobMap)
+        assert data == value[:]
+
+
+def test_blobStorage2(makeClient):
+    data, xml = makeBlob(100000)
+    for engine in ['etree', 'direct']:
+        client = makeClient(indiBase.Client, engine=engine)
+        assert client.setBlobStorage(threshold=200000)
+        client.parser.feed(xml)
+        value = client.getDevice('CCD').getBlob('CCD1')['value']
+        assert isinstance(value, bytearray)
+
+
+def test_blobStorage3(tmp_path, makeClient):
+    data, xml = makeBlob(100000)
+    client = makeClient(indiBase.Client)
+    assert client.setBlobStorage(threshold=1, directory=str(tmp_path))
+    client.parser.feed(xml)
+    value = client.getDevice('CCD').getBlob('CCD1')['value']
+    assert [value.path] == [str(path) for path in tmp_path.iterdir()]
+
+
+def test_blobStorage4(tmp_path, makeClient):
+    client = makeClient(indiBase.Client)
+    assert not client.setBlobStorage(threshold=1, directory=str(tmp_path / 'test'))
+
+
+def makeCompressedBlob(data):
+    text = base64.standard_b64encode(zlib.compress(data))
+    return (f'<setBLOBVector device="CCD" name="CCD1" state="Ok">'
+            f'<oneBLOB name="CCD1" size="{len(data)}" format=".fits.z">\n'.encode() +
+            text + b'\n</oneBLOB></setBLOBVector>')
+
+
+def test_blobInflate1(makeClient):
+    data = os.urandom(1000) * 100
+    xml = makeCompressedBlob(data)
+    for engine in ['etree', 'direct']:
+        client = makeClient(indiBase.Client, engine=engine)
+        client.setBlobInflate(True)
+        for i in range(0, len(xml), 333):
+            client.parser.feed(xml[i:i + 333])
+        blob = client.getDevice('CCD').getBlob('CCD1')
+        assert data == blob['value']
+        assert '.fits' == blob['format']
+
+
+def test_blobInflate2(makeClient):
+    data = os.urandom(1000) * 100
+    client = makeClient(indiBase.Client, engine='direct')
+    client.setBlobInflate(True)
+    client.setBlobStorage(threshold=1000)
+    client.parser.feed(makeCompressedBlob(data))
+    blob = client.getDevice('CCD').getBlob('CCD1')
+    assert isinstance(blob['value'], BlobMap)
+    assert data == blob['value'][:]
+
+
+def test_blobInflate3(makeClient):
+    data = os.urandom(1000)
+    client = makeClient(indiBase.Client)
+    assert not client.blobInflate
+    client.parser.feed(makeCompressedBlob(data))
+    blob = client.getDevice('CCD').getBlob('CCD1')
+    assert zlib.compress(data) == blob['value']
+    assert '.fits.z' == blob['format']
+
+
+def test_blobInflate4(makeClient):
+    data = os.urandom(1000)
+    for engine in ['etree', 'direct']:
+        client = makeClient(indiBase.Client, engine=engine)
+        client.setBlobInflate(True)
+        compressed = zlib.compress(data)[:-10]
+        text = base64.standard_b64encode(zlib.compress(data))
+        client.parser.feed(makeCompressedBlob(data).replace(
+            text, base64.standard_b64encode(compressed)))
+        blob = client.getDevice('CCD').getBlob('CCD1')
+        assert compressed == blob['value']
+        assert '.fits.z' == blob['format']
+
+
+def test_blobStream1(makeClient):
+    for engine in ['etree', 'direct']:
+        client = makeClient(indiBase.Client, engine=engine)
+        assert client.setBlobStream(deviceName='CCD', propertyName='CCD1', slots=4)
+        ring = client.getBlobStream(deviceName='CCD', propertyName='CCD1')
+        for i in range(10):
+            data, xml = makeBlob(10000)
+            client.parser.feed(xml)
+        assert 10 == ring.sequence
+        assert 6 == ring.dropped
+        assert data == client.getDevice('CCD').getBlob('CCD1')['value']
+        assert (9, data) == ring.latest()
+
+
+def test_blobStream2(makeClient):
+    client = makeClient(indiBase.Client)
+    assert client.setBlobStream(deviceName='CCD', propertyName='CCD1')
+    assert client.setBlobStream(deviceName='CCD', propertyName='CCD1', slots=0)
+    assert not client.setBlobStream(deviceName='CCD', propertyName='CCD1', slots=0)
+    assert client.getBlobStream(deviceName='CCD', propertyName='CCD1') is None
+    data, xml = makeBlob(1000)
+    client.parser.feed(xml)
+    assert isinstance(client.getDevice('CCD').getBlob('CCD1')['value'], bytearray)
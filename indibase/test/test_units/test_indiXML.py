@@ -0,0 +1,123 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+# INDIBASE
+#
+# GUI with PyQT5 for python
+# Python  v3.7.4
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import concurrent.futures
+import copy
+import xml.etree.ElementTree as ETree
+# external packages
+# local import
+from indibase import indiXML
+
+
+def reference(vectorFn, elementFn, device, name, elements):
+    elementList = [elementFn(elements[element], indi_attr={'name': element})
+                   for element in elements]
+    cmd = vectorFn(elementList, indi_attr={'name': name, 'device': device})
+    return cmd.toXML()
+
+
+def test_serializeNumber1():
+    elements = {'RA': 12.5, 'DEC': -45, 'X': 1e-7}
+    cmd = indiXML.newNumberSerializer.serialize('Mount', 'EQ', elements)
+    ref = reference(indiXML.newNumberVector, indiXML.oneNumber, 'Mount', 'EQ', elements)
+    assert ref == cmd.toXML()
+
+
+def test_serializeNumber2():
+    cmd = indiXML.newNumberSerializer.serialize('Mount', 'EQ', {})
+    ref = reference(indiXML.newNumberVector, indiXML.oneNumber, 'Mount', 'EQ', {})
+    assert ref == cmd.toXML()
+
+
+def test_serializeSwitch():
+    elements = {'CONNECT': True, 'DISCONNECT': 'Off'}
+    cmd = indiXML.newSwitchSerializer.serialize('CCD', 'CONNECTION', elements)
+    ref = reference(indiXML.newSwitchVector, indiXML.oneSwitch, 'CCD', 'CONNECTION',
+                    elements)
+    assert ref == cmd.toXML()
+
+
+def test_serializeText1():
+    elements = {'T<1>': 'a<&>"b\'', 'EMPTY': '', 'UTF': 'Würtenberger'}
+    cmd = indiXML.newTextSerializer.serialize('C&D "1"', 'P<1>', elements)
+    ref = reference(indiXML.newTextVector, indiXML.oneText, 'C&D "1"', 'P<1>', elements)
+    assert ref == cmd.toXML()
+
+
+def test_serializeText2():
+    cmd1 = indiXML.newTextSerializer.serialize('CCD', 'FILE', {'PATH': '/tmp'})
+    cmd2 = indiXML.newTextSerializer.serialize('CCD', 'FILE', {'PATH': '/home'})
+    assert b'<newTextVector device="CCD" name="FILE">' in cmd2.toXML()
+    assert b'/home' in cmd2.toXML()
+    assert str(cmd1) == cmd1.toXML().decode()
+
+
+def test_makeINDIFn_spec():
+    spec = copy.deepcopy(indiXML.indi_spec['defNumber']['attributes'])
+    indiXML.defNumber(1.5, indi_attr={'name': 'RA',
+                                      'iformat': '%10.6m',
+                                      'imin': 0,
+                                      'imax': 24,
+                                      'step': 0})
+    assert spec == indiXML.indi_spec['defNumber']['attributes']
+    assert 'xml' not in indiXML.indi_spec['defNumber']
+
+
+def test_makeINDIFn_attributes():
+    cmd = indiXML.defNumber(1.5, indi_attr={'step': 0,
+                                            'imax': 24,
+                                            'imin': 0,
+                                            'iformat': '%10.6m',
+                                            'name': 'RA'})
+    assert ['name', 'format', 'min', 'max', 'step'] == list(cmd.attr)
+    assert b'<defNumber name="RA" format="%10.6m" min="0" max="24" step="0">1.5' \
+           b'</defNumber>' == cmd.toXML()
+
+
+def test_makeINDIFn_compiled():
+    compiled = indiXML.indi_compiled['defNumber']
+    assert frozenset(['name', 'iformat', 'imin', 'imax', 'step']) == compiled.required
+    assert 'format' == compiled.xml_names['iformat']
+    assert 'defNumber' == compiled.xml
+    assert 'getProperties' == indiXML.indi_compiled['clientGetProperties'].xml
+
+
+def test_makeINDIFn_threads():
+    def build(i):
+        cmd = indiXML.newNumberVector([indiXML.oneNumber(i, indi_attr={'name': 'RA'})],
+                                      indi_attr={'name': 'EQ', 'device': 'Mount'})
+        return cmd.toXML()
+
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(build, range(1000)))
+    assert build(999) == results[999]
+
+
+def test_parseETree():
+    etree = ETree.fromstring('<defSwitch name="CONNECT">On</defSwitch>')
+    cmd = indiXML.parseETree(etree)
+    assert isinstance(cmd, indiXML.DefSwitch)
+    assert 'On' == cmd.getValue()
+
+
+def test_BLOBSerializer():
+    serializer = indiXML.newBLOBSerializer
+    start = serializer.vectorStart('CCD', 'CCD1', '2019-01-01T00:00:00')
+    assert b'<newBLOBVector device="CCD" name="CCD1" timestamp="2019-01-01T00:00:00">' \
+           == start
+    assert b'<newBLOBVector device="CCD" name="CCD1">' \
+           == serializer.vectorStart('CCD', 'CCD1')
+    start = serializer.elementStart('CCD1', 100, '.fits')
+    assert b'<oneBLOB name="CCD1" size="100" format=".fits">' == start
@@ -0,0 +1,163 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+# INDIBASE
+#
+# GUI with PyQT5 for python
+# Python  v3.7.4
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import socket
+import threading
+from unittest import mock
+# external packages
+import PyQt5.QtWidgets
+# local import
+from indibase import multiIndiBase
+
+app = PyQt5.QtWidgets.QApplication.instance() or PyQt5.QtWidgets.QApplication([])
+hosts = ['mount', ('camera', 7625)]
+
+
+def defNumber(deviceName):
+    return (b'<defNumberVector device="%s" name="TEMP" state="Idle" perm="rw">'
+            b'<defNumber name="T" format="%%f" min="0" max="1" step="0">0.5'
+            b'</defNumber></defNumberVector>' % deviceName.encode())
+
+
+class StandInServer(threading.Thread):
+    """
+    StandInServer accepts one client and collects all data until the client closes
+    the connection.
+    """
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.server = socket.socket()
+        self.server.bind(('localhost', 0))
+        self.server.listen(1)
+        self.port = self.server.getsockname()[1]
+        self.data = bytearray()
+
+    def run(self):
+        conn, _ = self.server.accept()
+        with conn:
+            while True:
+                chunk = conn.recv(2 ** 16)
+                if not chunk:
+                    break
+                self.data += chunk
+        self.server.close()
+
+
+def test_addServer(makeClient):
+    client = makeClient(multiIndiBase.Client, hosts=hosts)
+    assert [('mount', 7624), ('camera', 7625)] == list(client.clients)
+    assert client.addServer('mount') is None
+    assert client.addServer('') is None
+    assert client.getClient('camera', 7625) is client.clients[('camera', 7625)]
+    assert client.removeServer('camera', 7625)
+    assert not client.removeServer('camera', 7625)
+
+
+def test_devices1(makeClient):
+    client = makeClient(multiIndiBase.Client, hosts=hosts)
+    received = []
+    client.signals.defNumber.connect(lambda *args: received.append(args))
+    client.getClient('mount').parser.feed(defNumber('Mount') + defNumber('CCD'))
+    client.getClient('camera', 7625).parser.feed(defNumber('CCD'))
+    assert ['Mount', 'CCD', 'CCD@camera:7625'] == list(client.devices)
+    assert [('Mount', 'TEMP'), ('CCD', 'TEMP'), ('CCD@camera:7625', 'TEMP')] == received
+    device = client.getClient('camera', 7625).getDevice('CCD')
+    assert device is client.getDevice('CCD@camera:7625')
+    assert ['Mount', 'CCD', 'CCD@camera:7625'] == client.getDevices()
+
+
+def test_devices2(makeClient):
+    client = makeClient(multiIndiBase.Client, hosts=hosts)
+    received = []
+    client.signals.removeDevice.connect(received.append)
+    client.getClient('mount').parser.feed(defNumber('CCD'))
+    client.getClient('camera', 7625).parser.feed(defNumber('CCD'))
+    client.getClient('mount').disconnectServer()
+    assert ['CCD'] == received
+    assert ['CCD@camera:7625'] == list(client.devices)
+    client.getClient('mount').connected = True
+    client.getClient('mount').parser.feed(defNumber('Focuser'))
+    assert ['CCD@camera:7625', 'Focuser'] == list(client.devices)
+
+
+def test_sendNewNumber(makeClient):
+    client = makeClient(multiIndiBase.Client, hosts=hosts)
+    client.getClient('mount').parser.feed(defNumber('CCD'))
+    client.getClient('camera', 7625).parser.feed(defNumber('CCD'))
+    camera = client.getClient('camera', 7625)
+    mount = client.getClient('mount')
+    with mock.patch.object(camera, '_sendCmd', return_value=True):
+        with mock.patch.object(mount, '_sendCmd', return_value=True):
+            assert client.sendNewNumber(deviceName='CCD@camera:7625',
+                                        propertyName='TEMP',
+                                        elements='T',
+                                        number=0.2)
+            assert not client.sendNewNumber(deviceName='Dome',
+                                            propertyName='TEMP',
+                                            elements='T',
+                                            number=0.2)
+            assert 0 == mount._sendCmd.call_count
+        assert 1 == camera._sendCmd.call_count
+        assert b'device="CCD"' in camera._sendCmd.call_args[0][0].toXML()
+
+
+def test_watchDevice(makeClient):
+    client = makeClient(multiIndiBase.Client, hosts=hosts)
+    client.getClient('mount').parser.feed(defNumber('Mount'))
+    camera = client.getClient('camera', 7625)
+    mount = client.getClient('mount')
+    with mock.patch.object(camera, '_sendCmd', return_value=True):
+        with mock.patch.object(mount, '_sendCmd', return_value=True):
+            assert client.watchDevice('Mount')
+            assert 0 == camera._sendCmd.call_count
+            assert client.watchDevice('Dome')
+            assert 1 == camera._sendCmd.call_count
+            assert 2 == mount._sendCmd.call_count
+
+
+def test_connectServer(qtbot):
+    servers = [StandInServer(), StandInServer()]
+    client = multiIndiBase.Client()
+    for server in servers:
+        server.start()
+        client.addServer(('localhost', server.port))
+    with qtbot.waitSignals([client.signals.serverConnected] * 2):
+        assert client.connectServer()
+        states = [server.getConnectionState() for server in client.clients.values()]
+        assert ['Connecting', 'Connecting'] == states
+    assert client.isServerConnected()
+    client.disconnectServer()
+    assert not client.isServerConnected()
+    for server in servers:
+        server.join(10)
+
+
+def test_requestNewNumber(makeClient):
+    client = makeClient(multiIndiBase.Client, hosts=hosts)
+    client.getClient('camera', 7625).parser.feed(defNumber('CCD'))
+    camera = client.getClient('camera', 7625)
+    with mock.patch.object(camera, '_sendCmd', return_value=True):
+        command = client.requestNewNumber(deviceName='CCD',
+                                          propertyName='TEMP',
+                                          elements='T',
+                                          number=0.2)
+    assert not command.done()
+    assert [command] == camera.commands[('CCD', 'TEMP')]
+    command = client.requestNewNumber(deviceName='Dome',
+                                      propertyName='TEMP',
+                                      elements='T',
+                                      number=0.2)
+    assert 'Failed' == command.state
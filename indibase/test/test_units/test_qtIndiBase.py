@@ -0,0 +1,168 @@
+############################################################
+# -*- coding: utf-8 -*-
+#
+# INDIBASE
+#
+# GUI with PyQT5 for python
+# Python  v3.7.4
+#
+# Michael Würtenberger
+# (c) 2019
+#
+# Licence APL2.0
+#
+###########################################################
+# standard libraries
+import base64
+import os
+import socket
+import threading
+import zlib
+# external packages
+import PyQt5.QtWidgets
+# local import
+from indibase import qtIndiBase
+
+app = PyQt5.QtWidgets.QApplication.instance() or PyQt5.QtWidgets.QApplication([])
+data = os.urandom(1000) * 100
+
+defBlob = (b'<defBLOBVector device="CCD" name="CCD1" state="Idle" perm="ro">'
+           b'<defBLOB name="CCD1"/></defBLOBVector>')
+
+
+def makeBlob(value, blobFormat):
+    text = base64.b64encode(value)
+    return (b'<setBLOBVector device="CCD" name="CCD1" state="Ok">'
+            b'<oneBLOB name="CCD1" size="%d" format="%s">%s</oneBLOB>'
+            b'</setBLOBVector>' % (len(data), blobFormat, text))
+
+
+def test_decompressBlobs1(qtbot, makeClient):
+    for engine in ['etree', 'direct']:
+        client = makeClient(qtIndiBase.Client, defBlob, engine=engine)
+        received = []
+        client.signals.newBLOB.connect(lambda *args: received.append(args))
+        with qtbot.waitSignal(client.signals.newBLOB):
+            client.parser.feed(makeBlob(zlib.compress(data), b'.fits.z'))
+            assert not received
+        blob = client.getDevice('CCD').getBlob('CCD1')
+        assert data == blob['value']
+        assert '.fits' == blob['format']
+        assert [('CCD', 'CCD1')] == received
+
+
+def test_decompressBlobs2(qtbot, makeClient):
+    client = makeClient(qtIndiBase.Client, defBlob)
+    client.setBlobDecompression(False)
+    with qtbot.waitSignal(client.signals.newBLOB, timeout=0, raising=False) as blocker:
+        client.parser.feed(makeBlob(zlib.compress(data), b'.fits.z'))
+    assert blocker.signal_triggered
+    blob = client.getDevice('CCD').getBlob('CCD1')
+    assert zlib.compress(data) == blob['value']
+    assert '.fits.z' == blob['format']
+
+
+def test_decompressBlobs3(qtbot, makeClient):
+    client = makeClient(qtIndiBase.Client, defBlob)
+    with qtbot.waitSignal(client.signals.newBLOB):
+        client.parser.feed(makeBlob(data, b'.z'))
+    blob = client.getDevice('CCD').getBlob('CCD1')
+    assert data == blob['value']
+    assert '.z' == blob['format']
+
+
+def test_decompressBlobs4(makeClient):
+    client = makeClient(qtIndiBase.Client, defBlob)
+    compressed = zlib.compress(data)
+    element = client.getDevice('CCD').getBlob('CCD1')
+    element.value = b'newer'
+    element.format = '.fits.z'
+    result = client.decompressBlobs('CCD', 'CCD1', [(element, compressed)])
+    assert data == result[2][0][2]
+    assert client.decompressBlobsResult(result)
+    assert b'newer' == element.value
+    assert '.fits.z' == element.format
+
+
+def test_setReceiveThread():
+    client = qtIndiBase.Client()
+    assert not client.blobInflate
+    assert client.setReceiveThread(True)
+    assert client.blobInflate
+    assert client.setReceiveThread(False)
+    assert not client.blobInflate
+
+
+class StandInServer(threading.Thread):
+    """
+    StandInServer accepts a number of clients one after the other and collects all
+    data of each connection until the client closes it.
+    """
+
+    def __init__(self, connections=1):
+        super().__init__(daemon=True)
+        self.server = socket.socket()
+        self.server.bind(('localhost', 0))
+        self.server.listen(connections)
+        self.port = self.server.getsockname()[1]
+        self.data = [bytearray() for _ in range(connections)]
+
+    def run(self):
+        for data in self.data:
+            conn, _ = self.server.accept()
+            with conn:
+                while True:
+                    chunk = conn.recv(2 ** 16)
+                    if not chunk:
+                        break
+                    data += chunk
+        self.server.close()
+
+
+def test_backoffDelay():
+    client = qtIndiBase.Client()
+    assert client.CONNECTION_BACKOFF == client._backoffDelay()
+    client.supervise = True
+    for attempt in range(10):
+        delay = min(client.RECONNECT_MAX, client.RECONNECT_MIN * 2 ** attempt)
+        assert delay / 2 <= client._backoffDelay() <= delay
+    assert 10 == client.reconnectAttempts
+
+
+def test_supervisor1(qtbot):
+    server = StandInServer(connections=2)
+    server.start()
+    client = qtIndiBase.Client(host=('localhost', server.port))
+    client.RECONNECT_MIN = 10
+    alive = []
+    client.signals.serverAlive.connect(alive.append)
+    with qtbot.waitSignal(client.signals.serverConnected):
+        client.startTimers()
+    assert client.watchDevice('CCD')
+    qtbot.waitUntil(lambda: not client.outgoing)
+    with qtbot.waitSignal(client.signals.serverConnected):
+        client.socket.disconnectFromHost()
+    qtbot.waitUntil(lambda: not client.outgoing)
+    client.stopTimers()
+    client.disconnectServer()
+    server.join(10)
+    watch = b'<getProperties version="1.7" device="CCD" />\n'
+    assert watch == bytes(server.data[0])
+    assert watch == bytes(server.data[1])
+    assert [True, False, True, False] == alive
+
+
+def test_supervisor2(qtbot):
+    server = socket.socket()
+    server.bind(('localhost', 0))
+    port = server.getsockname()[1]
+    server.close()
+    client = qtIndiBase.Client(host=('localhost', port))
+    client.RECONNECT_MIN = 10
+    with qtbot.waitSignal(client.signals.serverAlive) as blocker:
+        client.startTimers()
+    assert [False] == blocker.args
+    qtbot.waitUntil(lambda: client.reconnectAttempts >= 3)
+    client.stopTimers()
+    client.disconnectServer()
+    assert 'Disconnected' == client.getConnectionState()
@@ -26,7 +26,7 @@ setup(
     packages=[
         'indibase',
     ],
-    python_requires='>=3.6.0, <4.0',
+    python_requires='>=3.7.0, <4.0',
     install_requires=[
         'PyQt5>=5.14.1; platform_machine != "armv7l"',
         'numpy>=1.18.0',